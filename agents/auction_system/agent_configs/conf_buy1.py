@@ -0,0 +1,13 @@
+"""
+Config for buyer agent 1 (Lowie): analytical-conservative, 140,000 EUR budget.
+"""
+
+from agents.auction_system.buyer_agent import BuyerConfig
+from core.prompts.prompts import BUYER_AGENT1_PROMPT
+
+
+BUYER1_CONFIG = BuyerConfig(
+    name="Lowie",
+    budget=140_000,
+    prompt_template=BUYER_AGENT1_PROMPT,
+)
@@ -0,0 +1,13 @@
+"""
+Config for buyer agent 2 (Highie): aggressive-opportunistic, 200,000 EUR budget.
+"""
+
+from agents.auction_system.buyer_agent import BuyerConfig
+from core.prompts.prompts import BUYER_AGENT2_PROMPT
+
+
+BUYER2_CONFIG = BuyerConfig(
+    name="Highie",
+    budget=200_000,
+    prompt_template=BUYER_AGENT2_PROMPT,
+)
@@ -0,0 +1,8 @@
+"""
+Config for the auction orchestrator agent.
+"""
+
+from agents.auction_system.orchestrator_agent import OrchestratorConfig
+
+
+ORCHESTRATOR_CONFIG = OrchestratorConfig(model="gemini-2.5-flash")
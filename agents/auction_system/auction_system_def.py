@@ -10,16 +10,57 @@ The current implementation is a plain Python orchestration loop that is
 *LangGraph-ready*: each of the methods here can be plugged into LangGraph
 nodes later. For now, this gives you a working, testable auction system
 with explicit STATE passing.
+
+Rounds run in one of two modes (`OrchestratorConfig.round_mode`):
+- "sequential": buyers act one after another and see earlier bids of the
+  same round; round latency is the sum of the buyers' LLM latencies.
+- "sealed_bid": every eligible buyer decides concurrently on the same
+  round snapshot and bids are resolved at round end; round latency is
+  roughly that of the slowest buyer (bounded by `buyer_timeout_s`). Each
+  call works on a copy of the buyer's memory, merged back only when its
+  decision is counted, so a late reply never reaches the buyer's memory.
+
+With a `checkpoint_path`, every completed round is appended to a checkpoint
+file (see `checkpoint.py`) and `resume()` continues an interrupted auction
+from the last completed round.
+
+The listing's digest (`listing_parser.listing_digest`) is extracted once per
+auction into `AuctionState.property_digest`; buyers send it instead of the
+full listing unless their `context_mode` is "full".
+
+With an `EventBus` (`events=`), the auction publishes typed events as it
+runs (see `events.py`); `stream_auction()` yields them while the auction
+runs in the background.
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, Iterator, List, Optional, Union
 
 from agents.auction_system.buyer_agent import BuyerAgent, BuyerConfig
+from agents.auction_system.checkpoint import AuctionCheckpoint
+from agents.auction_system.events import (
+    AuctionClosed,
+    AuctionEvent,
+    AuctionStarted,
+    BuyerAction,
+    EventBus,
+    RoundClosed,
+)
 from agents.auction_system.orchestrator_agent import OrchestratorAgent
+from core.database.listing_parser import listing_digest
+from core.llm.accounting import get_ledger
+from core.llm.concurrency import submit_in_context
 from core.state.state import State
+from core.telemetry.metrics import span
+
+
+def _new_auction_id(property_id: Optional[str]) -> str:
+    return f"{property_id or 'auction'}#{uuid.uuid4().hex[:8]}"
 
 
 @dataclass
@@ -34,7 +75,10 @@ class AuctionState:
     buyer_states: Dict[str, State] = field(default_factory=dict)
 
     property_id: Optional[str] = None
+    # One per run (token accounting), so rerunning a lot starts afresh.
+    auction_id: Optional[str] = None
     property_text: Optional[str] = None
+    property_digest: Optional[str] = None
     round: int = 0
     status: str = "not_started"
 
@@ -43,6 +87,9 @@ class AuctionState:
 
     history: List[Dict[str, Any]] = field(default_factory=list)
 
+    # Tokens charged to this run, filled in when it ends.
+    tokens_used: int = 0
+
 
 class AuctionSystem:
     """
@@ -57,14 +104,25 @@ class AuctionSystem:
         orchestrator: OrchestratorAgent,
         buyers: Dict[str, BuyerAgent],
         state: Optional[AuctionState] = None,
+        checkpoint_path: Optional[str] = None,
+        events: Optional[EventBus] = None,
     ) -> None:
         self.orchestrator = orchestrator
         self.buyers = buyers
         self.state = state or AuctionState()
+        self.checkpoint = AuctionCheckpoint(checkpoint_path) if checkpoint_path else None
+        self.events = events
 
         for name in buyers.keys():
             self.state.buyer_states.setdefault(name, State())
 
+        # Sealed-bid mode only: the executor lives for one auction. A buyer
+        # whose call outlived the timeout stays in `_pending` until the call
+        # finishes (also into the next auction on this system), so it is
+        # never asked twice at once.
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Dict[str, Future] = {}
+
     def run_single_auction(self, property_id: str, property_text: str) -> AuctionState:
         """
         Run a full auction for a single property until completion.
@@ -75,7 +133,9 @@ class AuctionSystem:
         - Stops when the orchestrator determines the auction is closed
         """
         self.state.property_id = property_id
+        self.state.auction_id = _new_auction_id(property_id)
         self.state.property_text = property_text
+        self.state.property_digest = listing_digest(property_text)
         self.state.round = 0
         self.state.status = "not_started"
         self.state.current_highest_bid = None
@@ -83,35 +143,268 @@ class AuctionSystem:
         self.state.history.clear()
 
         self.orchestrator.start_auction(self.state)
+        if self.checkpoint is not None:
+            self.checkpoint.start(self.state, self._checkpointed_states())
+        self._emit(AuctionStarted, resumed=False)
+
+        return self._run_rounds()
 
-        while self.state.status == "in_progress":
-            self.state.round += 1
+    def stream_auction(
+        self,
+        property_id: str,
+        property_text: str,
+        *,
+        buffer: int = 256,
+    ) -> Iterator[AuctionEvent]:
+        """
+        Run the auction on a background thread and yield its events as they
+        happen, ending with `AuctionClosed` (errors are re-raised after it).
 
-            for buyer_name, buyer in self.buyers.items():
-                buyer_state = self.state.buyer_states[buyer_name]
-                action = buyer.decide_action(
-                    state=self.state,
-                    buyer_state=buyer_state,
+        Uses `self.events`, or a bus of its own. If the consumer stops
+        early, the auction still runs to completion in the background.
+        """
+        if self.events is None:
+            self.events = EventBus()
+        subscription = self.events.subscribe(buffer)
+        errors: List[BaseException] = []
+
+        def run() -> None:
+            try:
+                self.run_single_auction(property_id, property_text)
+            except BaseException as e:
+                errors.append(e)
+
+        worker = threading.Thread(target=run, name=f"auction-{property_id}", daemon=True)
+        worker.start()
+        try:
+            while True:
+                event = subscription.get(timeout=0.5)
+                if event is None:
+                    if not worker.is_alive() and not len(subscription):
+                        break
+                    continue
+                if event.property_id != property_id:
+                    continue
+                yield event
+                if isinstance(event, AuctionClosed):
+                    break
+        finally:
+            subscription.close()
+        worker.join()
+        if errors:
+            raise errors[0]
+
+    def resume(self, checkpoint: Union[str, AuctionCheckpoint]) -> AuctionState:
+        """
+        Continue an auction from the last round recorded in `checkpoint`
+        (a path or an `AuctionCheckpoint`).
+
+        The auction state, the orchestrator's and buyers' `State`s are rebuilt
+        from the file, and further rounds are appended to it. A closed auction
+        is returned as-is.
+        """
+        if isinstance(checkpoint, str):
+            checkpoint = AuctionCheckpoint(checkpoint)
+        if self.checkpoint is not None and self.checkpoint is not checkpoint:
+            self.checkpoint.close()
+        self.checkpoint = checkpoint
+
+        checkpoint.restore(self.state, self._checkpointed_states())
+        self.state.auction_id = _new_auction_id(self.state.property_id)
+        self.state.property_digest = listing_digest(self.state.property_text or "")
+        self._emit(AuctionStarted, resumed=True)
+        return self._run_rounds()
+
+    def _checkpointed_states(self) -> Dict[str, State]:
+        states = {"orchestrator": self.orchestrator.state}
+        for name, buyer_state in self.state.buyer_states.items():
+            states[f"buyer:{name}"] = buyer_state
+        return states
+
+    def _run_rounds(self) -> AuctionState:
+        """
+        Run bidding rounds until the orchestrator closes the auction.
+        """
+        sealed = self.orchestrator.config.round_mode == "sealed_bid"
+        run_round = self._run_sealed_bid_round if sealed else self._run_round
+        if sealed:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max(1, len(self.buyers)), thread_name_prefix="buyer"
+            )
+
+        try:
+            while self.state.status == "in_progress":
+                self.state.round += 1
+
+                with span("auction.round"):
+                    run_round()
+                    self.orchestrator.update_after_round(self.state)
+
+                if self.checkpoint is not None:
+                    with span("auction.checkpoint"):
+                        self.checkpoint.record_round(self.state, self._checkpointed_states())
+                self._emit(
+                    RoundClosed,
+                    highest_bid=self.state.current_highest_bid,
+                    highest_bidder=self.state.current_highest_bidder,
+                    status=self.state.status,
                 )
+        except BaseException as e:
+            self._emit_closed(error=f"{type(e).__name__}: {e}")
+            raise
+        else:
+            self._emit_closed()
+        finally:
+            if self._executor is not None:
+                # Do not block on buyers that timed out; their results are discarded.
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            self.state.tokens_used = get_ledger().release(auction=self.state.auction_id).total_tokens
+            if self.checkpoint is not None:
+                self.checkpoint.close()
+
+        return self.state
+
+    # ------------------------------------------------------------------
+    # Events
+    # ------------------------------------------------------------------
+
+    def _emit(self, event_type: type, **fields: Any) -> None:
+        if self.events is not None:
+            self.events.publish(
+                event_type(property_id=self.state.property_id, round=self.state.round, **fields)
+            )
+
+    def _emit_closed(self, error: Optional[str] = None) -> None:
+        self._emit(
+            AuctionClosed,
+            winner=self.state.current_highest_bidder,
+            price=self.state.current_highest_bid,
+            status="failed" if error else self.state.status,
+            error=error,
+        )
+
+    def _emit_action(self, record: Dict[str, Any], leading: bool) -> None:
+        self._emit(
+            BuyerAction,
+            buyer=record["buyer"],
+            action=record["action"],
+            amount=record["amount"],
+            reason=record["reason"],
+            leading=leading,
+        )
+
+    def _run_round(self) -> None:
+        """
+        Ask every buyer for an action in turn and apply valid bids.
+        """
+        for buyer_name, buyer in self.buyers.items():
+            buyer_state = self.state.buyer_states[buyer_name]
+            action = buyer.decide_action(
+                state=self.state,
+                buyer_state=buyer_state,
+            )
+
+            record: Dict[str, Any] = {
+                "round": self.state.round,
+                "buyer": buyer_name,
+                "action": action["action"],
+                "amount": action.get("amount"),
+                "reason": action.get("reason"),
+            }
+            self.state.history.append(record)
+
+            leading = False
+            if action["action"] == "BID" and action.get("amount") is not None:
+                amount = float(action["amount"])
+                if (
+                    self.state.current_highest_bid is None
+                    or amount > self.state.current_highest_bid
+                ):
+                    self.state.current_highest_bid = amount
+                    self.state.current_highest_bidder = buyer_name
+                    leading = True
+            self._emit_action(record, leading)
 
-                record: Dict[str, Any] = {
-                    "round": self.state.round,
-                    "buyer": buyer_name,
-                    "action": action["action"],
-                    "amount": action.get("amount"),
-                    "reason": action.get("reason"),
+    def _run_sealed_bid_round(self) -> None:
+        """
+        Ask all eligible buyers concurrently and resolve bids at round end.
+
+        - Every buyer sees the same snapshot of the auction as of round start.
+        - The current highest bidder sits the round out, as does a buyer whose
+          previous call is still running after a timeout.
+        - A buyer that does not answer within `buyer_timeout_s` counts as PASS;
+          its call ran on a copy of its memory, which is dropped.
+        - The highest valid bid wins; equal amounts go to the buyer listed
+          first in `self.buyers`, so the outcome does not depend on timing.
+        """
+        snapshot = replace(self.state, history=list(self.state.history))
+        timeout = self.orchestrator.config.buyer_timeout_s
+
+        futures: Dict[str, Future] = {}
+        memories: Dict[str, State] = {}
+        skipped: Dict[str, str] = {}
+        for buyer_name, buyer in self.buyers.items():
+            pending = self._pending.get(buyer_name)
+            if pending is not None and not pending.done():
+                skipped[buyer_name] = "Previous decision still pending."
+                continue
+            self._pending.pop(buyer_name, None)
+            if buyer_name == snapshot.current_highest_bidder:
+                skipped[buyer_name] = "Already the highest bidder."
+                continue
+            memories[buyer_name] = self.state.buyer_states[buyer_name].copy()
+            # In the caller's context, so LLM slot waits count for this auction.
+            futures[buyer_name] = submit_in_context(
+                self._executor,
+                buyer.decide_action,
+                state=snapshot,
+                buyer_state=memories[buyer_name],
+            )
+
+        wait(futures.values(), timeout=timeout)
+
+        best_amount: Optional[float] = None
+        best_buyer: Optional[str] = None
+        records: List[Dict[str, Any]] = []
+        for buyer_name in self.buyers:
+            future = futures.get(buyer_name)
+            if future is None:
+                action = {"action": "PASS", "amount": None, "reason": skipped[buyer_name]}
+            elif not future.done():
+                self._pending[buyer_name] = future
+                action = {
+                    "action": "PASS",
+                    "amount": None,
+                    "reason": f"No decision within {timeout}s.",
                 }
-                self.state.history.append(record)
+            else:
+                action = future.result()
+                self.state.buyer_states[buyer_name].set_state(
+                    memories[buyer_name].get_state()
+                )
 
-                if action["action"] == "BID" and action.get("amount") is not None:
-                    amount = float(action["amount"])
-                    if (
-                        self.state.current_highest_bid is None
-                        or amount > self.state.current_highest_bid
-                    ):
-                        self.state.current_highest_bid = amount
-                        self.state.current_highest_bidder = buyer_name
+            record = {
+                "round": self.state.round,
+                "buyer": buyer_name,
+                "action": action["action"],
+                "amount": action.get("amount"),
+                "reason": action.get("reason"),
+            }
+            self.state.history.append(record)
+            records.append(record)
 
-            self.orchestrator.update_after_round(self.state)
+            if action["action"] == "BID" and action.get("amount") is not None:
+                amount = float(action["amount"])
+                if (
+                    snapshot.current_highest_bid is None
+                    or amount > snapshot.current_highest_bid
+                ) and (best_amount is None or amount > best_amount):
+                    best_amount = amount
+                    best_buyer = buyer_name
 
-        return self.state
+        if best_buyer is not None:
+            self.state.current_highest_bid = best_amount
+            self.state.current_highest_bidder = best_buyer
+        for record in records:
+            self._emit_action(record, leading=record["buyer"] == best_buyer)
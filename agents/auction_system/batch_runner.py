@@ -0,0 +1,220 @@
+"""
+Parallel batch runner for auctions over many property listings.
+
+`AuctionSystem` keeps one mutable `AuctionState` (and the orchestrator keeps
+its own `State`), so a single system can only run one auction at a time.
+The batch runner instead builds a fresh system per lot via a factory, runs
+lots on a thread pool, and yields each `LotResult` as soon as its auction
+closes.
+
+A shared `ConcurrencyLimitedClient` caps the number of in-flight LLM calls
+across all running auctions; time spent waiting for a slot is subtracted
+from each lot's duration so the sequential estimate is not inflated by
+queueing.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from agents.auction_system.auction_system_def import AuctionState, AuctionSystem
+from agents.auction_system.buyer_agent import BuyerAgent, BuyerConfig
+from agents.auction_system.checkpoint import AuctionCheckpoint
+from agents.auction_system.events import EventBus
+from agents.auction_system.orchestrator_agent import OrchestratorAgent, OrchestratorConfig
+from core.database.listing_parser import read_listings
+from core.llm.concurrency import ConcurrencyLimitedClient
+from core.telemetry.profiling import profile
+
+
+@dataclass
+class Lot:
+    property_id: str
+    property_text: str
+
+
+@dataclass
+class LotResult:
+    property_id: str
+    state: Optional[AuctionState]
+    duration_s: float
+    wait_s: float = 0.0
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def active_s(self) -> float:
+        """
+        Duration minus time spent queueing for an LLM slot.
+        """
+        return max(0.0, self.duration_s - self.wait_s)
+
+    def to_dict(self) -> Dict[str, Any]:
+        state = self.state
+        return {
+            "property_id": self.property_id,
+            "ok": self.ok,
+            "error": repr(self.error) if self.error else None,
+            "winner": state.current_highest_bidder if state else None,
+            "price": state.current_highest_bid if state else None,
+            "rounds": state.round if state else None,
+            "duration_s": self.duration_s,
+            "wait_s": self.wait_s,
+            "tokens": state.tokens_used if state else None,
+        }
+
+
+@dataclass
+class BatchReport:
+    results: List[LotResult] = field(default_factory=list)
+    wall_clock_s: float = 0.0
+    workers: int = 1
+    measured_sequential_s: Optional[float] = None
+
+    @property
+    def sequential_estimate_s(self) -> float:
+        """
+        What running the same lots one after another would take: the sum of
+        per-lot durations without slot queueing.
+        """
+        return sum(r.active_s for r in self.results)
+
+    def summary(self) -> Dict[str, Any]:
+        baseline = self.measured_sequential_s or self.sequential_estimate_s
+        return {
+            "lots": len(self.results),
+            "failed": sum(1 for r in self.results if not r.ok),
+            "workers": self.workers,
+            "wall_clock_s": self.wall_clock_s,
+            "sequential_baseline_s": baseline,
+            "sequential_baseline_kind": "measured" if self.measured_sequential_s else "estimated",
+            "speedup": baseline / self.wall_clock_s if self.wall_clock_s else None,
+        }
+
+
+SystemFactory = Callable[[], AuctionSystem]
+
+
+def make_system_factory(
+    client: Any,
+    buyer_configs: Iterable[BuyerConfig],
+    orchestrator_config: Optional[OrchestratorConfig] = None,
+    events: Optional[EventBus] = None,
+) -> SystemFactory:
+    """
+    Factory building an isolated `AuctionSystem` (fresh orchestrator state,
+    fresh `AuctionState`) that shares `client` and, if given, publishes to
+    the shared `events` bus.
+    """
+    buyer_configs = list(buyer_configs)
+
+    def factory() -> AuctionSystem:
+        return AuctionSystem(
+            orchestrator=OrchestratorAgent(client, config=orchestrator_config),
+            buyers={cfg.name: BuyerAgent(client, cfg) for cfg in buyer_configs},
+            events=events,
+        )
+
+    return factory
+
+
+def load_lots(directory_path: str) -> List[Lot]:
+    """
+    One lot per `.txt` listing in the directory, sorted by file name.
+    """
+    return [
+        Lot(property_id=file_name, property_text=text)
+        for file_name, text in read_listings(directory_path)
+    ]
+
+
+class BatchAuctionRunner:
+    """
+    Runs one isolated auction per lot on a thread pool.
+
+    `limiter` is the `ConcurrencyLimitedClient` shared by the systems the
+    factory builds (optional; used only to account for queueing time).
+
+    With `checkpoint_dir`, each lot checkpoints to `<dir>/<property_id>.jsonl`
+    and an existing checkpoint is resumed instead of restarting the lot.
+    """
+
+    def __init__(
+        self,
+        system_factory: SystemFactory,
+        *,
+        max_workers: int = 8,
+        limiter: Optional[ConcurrencyLimitedClient] = None,
+        checkpoint_dir: Optional[str] = None,
+    ) -> None:
+        if max_workers < 1:
+            raise ValueError("max_workers must be >= 1")
+        self.system_factory = system_factory
+        self.max_workers = max_workers
+        self.limiter = limiter
+        self.checkpoint_dir = checkpoint_dir
+
+    def _checkpoint_path(self, lot: Lot) -> Optional[str]:
+        if self.checkpoint_dir is None:
+            return None
+        return os.path.join(self.checkpoint_dir, f"{lot.property_id}.jsonl")
+
+    def _run_lot(self, lot: Lot) -> LotResult:
+        if self.limiter is not None:
+            self.limiter.reset_wait()
+        start = time.perf_counter()
+        state: Optional[AuctionState] = None
+        error: Optional[BaseException] = None
+        try:
+            with profile(f"auction-{lot.property_id}"):
+                state = self._auction(lot)
+        except Exception as exc:  # one failed lot must not stop the batch
+            error = exc
+        duration = time.perf_counter() - start
+        wait = self.limiter.reset_wait() if self.limiter is not None else 0.0
+        return LotResult(lot.property_id, state, duration, wait, error)
+
+    def _auction(self, lot: Lot) -> AuctionState:
+        system = self.system_factory()
+        checkpoint_path = self._checkpoint_path(lot)
+        if checkpoint_path is not None and os.path.exists(checkpoint_path):
+            return system.resume(checkpoint_path)
+        if checkpoint_path is not None:
+            system.checkpoint = AuctionCheckpoint(checkpoint_path)
+        return system.run_single_auction(lot.property_id, lot.property_text)
+
+    def stream(self, lots: Iterable[Lot]) -> Iterator[LotResult]:
+        """
+        Yield results in completion order, as each auction closes.
+        """
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="auction"
+        ) as pool:
+            futures = [pool.submit(self._run_lot, lot) for lot in lots]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def run(
+        self,
+        lots: Iterable[Lot],
+        on_result: Optional[Callable[[LotResult], None]] = None,
+    ) -> BatchReport:
+        """
+        Run every lot and return a `BatchReport`; `on_result` is called for
+        each result as it streams in.
+        """
+        report = BatchReport(workers=self.max_workers)
+        start = time.perf_counter()
+        for result in self.stream(lots):
+            report.results.append(result)
+            if on_result is not None:
+                on_result(result)
+        report.wall_clock_s = time.perf_counter() - start
+        return report
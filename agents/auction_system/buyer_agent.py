@@ -5,6 +5,11 @@ Each buyer agent:
 - Has its own STATE memory
 - Has a budget and preferences (encoded in its config + prompt)
 - Receives the current auction state and decides whether to BID or PASS
+  (PASS when the LLM call misses its deadline, see `core.llm.call_policy`)
+- Sees the listing's digest (`AuctionState.property_digest`) by default, or
+  the full listing with `context_mode="full"` (or when there is no digest)
+- Is charged to the token ledger under its auction; PASSes when the
+  auction's token budget rejects the call (see `core.llm.accounting`)
 """
 
 from __future__ import annotations
@@ -12,11 +17,15 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any, Dict
 
-from google import genai 
-
+from core.llm.accounting import BudgetExceeded, get_ledger
+from core.llm.call_policy import CallTimeout
 from core.prompts.prompts import BUYER_AGENT1_PROMPT, BUYER_AGENT2_PROMPT
 from core.prompts.prompt_builder import PromptBuilder
 from core.state.state import State
+from core.telemetry.metrics import record_usage, span
+
+
+CONTEXT_MODES = ("digest", "full")
 
 
 @dataclass
@@ -24,6 +33,11 @@ class BuyerConfig:
     name: str
     budget: float
     prompt_template: str
+    context_mode: str = "digest"
+
+    def __post_init__(self) -> None:
+        if self.context_mode not in CONTEXT_MODES:
+            raise ValueError(f"context_mode must be one of {CONTEXT_MODES}")
 
 
 class BuyerAgent:
@@ -56,7 +70,11 @@ class BuyerAgent:
             f"Property ID: {prop_id}.",
         ]
 
-        if auction_state.property_text:
+        digest = auction_state.property_digest
+        if digest and self.config.context_mode == "digest":
+            lines.append("Property summary:")
+            lines.append(digest.strip())
+        elif auction_state.property_text:
             lines.append("Property description:")
             lines.append(auction_state.property_text.strip())
 
@@ -92,10 +110,33 @@ class BuyerAgent:
 
         prompt = self.prompt_builder.build(state=state_text, question=question)
 
-        response = self.client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt,
-        )
+        try:
+            with get_ledger().admit(
+                prompt,
+                agent=f"buyer:{self.config.name}",
+                model="gemini-2.5-flash",
+                auction=state.auction_id,
+            ) as admission:
+                with span("llm.generate_content", agent="buyer", buyer=self.config.name):
+                    response = self.client.models.generate_content(
+                        model=admission.model,
+                        contents=prompt,
+                        **admission.kwargs,
+                    )
+                admission.settle(response)
+        except CallTimeout as e:
+            return {
+                "action": "PASS",
+                "amount": None,
+                "reason": f"No decision within {e.elapsed_s:.1f}s (LLM call timed out).",
+            }
+        except BudgetExceeded as e:
+            return {
+                "action": "PASS",
+                "amount": None,
+                "reason": f"Token budget exhausted ({e.scope}: {e.used}/{e.limit}).",
+            }
+        record_usage(response, agent="buyer", buyer=self.config.name, model=admission.model)
         text = getattr(response, "text", "").strip()
 
         action = "PASS"
@@ -0,0 +1,206 @@
+"""
+Round-level checkpoints for auctions.
+
+A checkpoint is an append-only JSONL file:
+- one "start" record with the property and the buyer names
+- one "round" record per completed round, holding only what changed in that
+  round: the new history entries, the new messages of each `State`, and the
+  scalar auction fields (round, status, highest bid and bidder)
+
+Each record is written as one line with a single `write`, then flushed and
+(optionally) fsynced, so a crash can at worst leave a torn last line. Torn
+lines are ignored on load, which makes every record atomic: a resumed
+auction continues from the last round that was fully written.
+
+Writing a round costs one small JSON line instead of re-serializing the whole
+auction, so checkpoint time does not grow with the number of rounds.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import IO, Any, Dict, List, Optional
+
+from core.state.state import State
+
+CHECKPOINT_VERSION = 1
+
+_SCALAR_FIELDS = ("round", "status", "current_highest_bid", "current_highest_bidder")
+
+
+class CheckpointError(RuntimeError):
+    pass
+
+
+def _state_extra(state: State) -> Dict[str, Any]:
+    return {k: v for k, v in state.get_state().items() if k != "messages"}
+
+
+class AuctionCheckpoint:
+    """
+    Append-only checkpoint file for one auction.
+
+    The checkpoint tracks, per `State`, how many messages it has already
+    written, so `record_round` only serializes new ones.
+    """
+
+    def __init__(self, path: str, *, fsync: bool = True) -> None:
+        self.path = path
+        self.fsync = fsync
+        self._file: Optional[IO[str]] = None
+        self._history_written = 0
+        self._messages_written: Dict[str, int] = {}
+        self._extra_written: Dict[str, Dict[str, Any]] = {}
+
+    # -------------------------
+    # Writing
+    # -------------------------
+
+    def start(self, auction_state: Any, states: Dict[str, State]) -> None:
+        """
+        Truncate the file and write the "start" record plus the state as of
+        the auction start (round 0).
+
+        `states` maps a stable key (e.g. "orchestrator", "buyer:Lowie") to
+        each `State` that should be checkpointed.
+        """
+        self.close()
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._history_written = 0
+        self._messages_written = {key: 0 for key in states}
+        self._extra_written = {key: {} for key in states}
+
+        self._append(
+            {
+                "type": "start",
+                "version": CHECKPOINT_VERSION,
+                "property_id": auction_state.property_id,
+                "property_text": auction_state.property_text,
+                "states": sorted(states),
+            }
+        )
+        self.record_round(auction_state, states)
+
+    def record_round(self, auction_state: Any, states: Dict[str, State]) -> None:
+        """
+        Append what changed since the previous record.
+        """
+        if self._file is None:
+            raise CheckpointError("checkpoint is not open; call start() or restore() first")
+
+        record: Dict[str, Any] = {"type": "round"}
+        for name in _SCALAR_FIELDS:
+            record[name] = getattr(auction_state, name)
+
+        history = auction_state.history
+        record["history"] = history[self._history_written:]
+        self._history_written = len(history)
+
+        messages: Dict[str, List[Dict[str, str]]] = {}
+        extra: Dict[str, Dict[str, Any]] = {}
+        for key, state in states.items():
+            state_messages = state.get_state().get("messages", [])
+            written = self._messages_written.get(key, 0)
+            if len(state_messages) > written:
+                messages[key] = state_messages[written:]
+                self._messages_written[key] = len(state_messages)
+
+            state_extra = _state_extra(state)
+            if state_extra != self._extra_written.get(key, {}):
+                extra[key] = state_extra
+                self._extra_written[key] = state_extra
+
+        if messages:
+            record["messages"] = messages
+        if extra:
+            record["extra"] = extra
+
+        self._append(record)
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        self._file.write(line)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    # -------------------------
+    # Reading
+    # -------------------------
+
+    def read_records(self) -> List[Dict[str, Any]]:
+        """
+        Parse all complete records; a torn trailing line is dropped.
+        """
+        records: List[Dict[str, Any]] = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+        for index, line in enumerate(lines):
+            if not line.endswith("\n"):
+                break  # torn last line from an interrupted write
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                if index == len(lines) - 1:
+                    break
+                raise CheckpointError(f"corrupt checkpoint record at line {index + 1}")
+
+        if not records or records[0].get("type") != "start":
+            raise CheckpointError(f"{self.path} is not an auction checkpoint")
+        if records[0].get("version") != CHECKPOINT_VERSION:
+            raise CheckpointError(
+                f"unsupported checkpoint version {records[0].get('version')!r}"
+            )
+        return records
+
+    def restore(self, auction_state: Any, states: Dict[str, State]) -> None:
+        """
+        Rebuild `auction_state` and `states` from the file, then reopen it so
+        later rounds are appended after the last complete record.
+        """
+        records = self.read_records()
+        header = records[0]
+        missing = set(header["states"]) - set(states)
+        if missing:
+            raise CheckpointError(f"checkpoint has states not present here: {sorted(missing)}")
+
+        auction_state.property_id = header["property_id"]
+        auction_state.property_text = header["property_text"]
+        auction_state.history.clear()
+        for state in states.values():
+            state.set_state({"messages": []})
+
+        for record in records[1:]:
+            for name in _SCALAR_FIELDS:
+                setattr(auction_state, name, record[name])
+            auction_state.history.extend(record["history"])
+            for key, new_messages in record.get("messages", {}).items():
+                states[key].get_state()["messages"].extend(new_messages)
+            for key, state_extra in record.get("extra", {}).items():
+                messages = states[key].get_state()["messages"]
+                states[key].set_state({**state_extra, "messages": messages})
+
+        self._history_written = len(auction_state.history)
+        self._messages_written = {
+            key: len(state.get_state()["messages"]) for key, state in states.items()
+        }
+        self._extra_written = {key: _state_extra(state) for key, state in states.items()}
+
+        # Rewrite without a torn tail (if any) before appending again.
+        self.close()
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
@@ -0,0 +1,235 @@
+"""
+Live event stream for auctions.
+
+`AuctionSystem.run_single_auction` only returns the final `AuctionState`.
+With an `EventBus` (`AuctionSystem(..., events=bus)`) the auction also
+publishes typed events as they happen:
+
+- `AuctionStarted`: the orchestrator opened the auction (or it was resumed
+  from a checkpoint)
+- `BuyerAction`: a buyer bid or passed (sequential rounds: right after the
+  buyer's LLM call; sealed-bid rounds: when the round is resolved)
+- `RoundClosed`: a round ended, with the highest bid so far
+- `AuctionClosed`: the auction ended (also when it failed), always the last
+  event of an auction
+
+Each subscriber gets its own bounded buffer. Publishing never blocks the
+bidding loop: when a subscriber's buffer is full, its oldest event is
+dropped and counted (`Subscription.dropped`), so a slow consumer sees a gap
+instead of stalling the auction. The newest event is never dropped.
+
+    bus = EventBus()
+    events = bus.subscribe()
+    threading.Thread(target=system.run_single_auction, args=(pid, text)).start()
+    for event in events:              # or `async for event in events`
+        print(event.to_dict())
+        if isinstance(event, AuctionClosed):
+            break
+
+`AuctionSystem.stream_auction` wraps exactly that. One bus can be shared
+by many auctions (e.g. `BatchAuctionRunner`); events carry `property_id`.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, ClassVar, Deque, Dict, Iterator, List, Optional
+
+from core.telemetry.metrics import count
+
+EVENTS_DROPPED_METRIC = "telehelper_auction_events_dropped_total"
+
+
+# ----------------------------------------------------------------------
+# Events
+# ----------------------------------------------------------------------
+
+
+@dataclass(frozen=True, kw_only=True)
+class AuctionEvent:
+    property_id: Optional[str]
+    round: int
+    at: float = field(default_factory=time.time)
+
+    kind: ClassVar[str] = "event"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": self.kind, **asdict(self)}
+
+
+@dataclass(frozen=True, kw_only=True)
+class AuctionStarted(AuctionEvent):
+    resumed: bool = False
+
+    kind: ClassVar[str] = "auction_started"
+
+
+@dataclass(frozen=True, kw_only=True)
+class BuyerAction(AuctionEvent):
+    buyer: str
+    action: str
+    amount: Optional[float] = None
+    reason: Optional[str] = None
+    # The bid is now the highest one.
+    leading: bool = False
+
+    kind: ClassVar[str] = "buyer_action"
+
+
+@dataclass(frozen=True, kw_only=True)
+class RoundClosed(AuctionEvent):
+    highest_bid: Optional[float]
+    highest_bidder: Optional[str]
+    status: str
+
+    kind: ClassVar[str] = "round_closed"
+
+
+@dataclass(frozen=True, kw_only=True)
+class AuctionClosed(AuctionEvent):
+    winner: Optional[str]
+    price: Optional[float]
+    status: str
+    error: Optional[str] = None
+
+    kind: ClassVar[str] = "auction_closed"
+
+
+# ----------------------------------------------------------------------
+# Subscriptions
+# ----------------------------------------------------------------------
+
+
+class Subscription:
+    """
+    One consumer's bounded view of an `EventBus`.
+
+    Iterate it (blocking) or `async for` over it; iteration ends when the
+    bus is closed and the buffer is drained. `close()` unsubscribes.
+    """
+
+    def __init__(self, bus: "EventBus", maxsize: int) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be >= 1")
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._bus = bus
+        self._events: Deque[AuctionEvent] = deque()
+        self._cond = threading.Condition()
+        self._ended = False
+
+    def _put(self, event: AuctionEvent) -> None:
+        with self._cond:
+            if self._ended:
+                return
+            if len(self._events) >= self.maxsize:
+                self._events.popleft()
+                self.dropped += 1
+                count(EVENTS_DROPPED_METRIC)
+            self._events.append(event)
+            self._cond.notify()
+
+    def _end(self) -> None:
+        with self._cond:
+            self._ended = True
+            self._cond.notify_all()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[AuctionEvent]:
+        """
+        The next event; None on timeout, or once the stream has ended and
+        every buffered event was read.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._events or self._ended, timeout)
+            return self._events.popleft() if self._events else None
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def __iter__(self) -> Iterator[AuctionEvent]:
+        while True:
+            event = self.get()
+            if event is None:
+                return
+            yield event
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> AuctionEvent:
+        import asyncio
+
+        # Waits on a worker thread, so the event loop is never blocked.
+        event = await asyncio.to_thread(self.get)
+        if event is None:
+            raise StopAsyncIteration
+        return event
+
+    def close(self) -> None:
+        self._bus._unsubscribe(self)
+        with self._cond:
+            self._events.clear()
+        self._end()
+
+
+class EventBus:
+    """
+    Fan-out of auction events to any number of subscriptions.
+
+    `history` keeps the last N events so a late subscriber can ask for
+    them with `subscribe(replay=True)`.
+    """
+
+    def __init__(self, history: int = 0) -> None:
+        self._subscriptions: List[Subscription] = []
+        self._history: Deque[AuctionEvent] = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._closed = False
+        self.published = 0
+
+    def subscribe(self, maxsize: int = 256, *, replay: bool = False) -> Subscription:
+        subscription = Subscription(self, maxsize)
+        with self._lock:
+            if replay:
+                for event in self._history:
+                    subscription._put(event)
+            if self._closed:
+                subscription._end()
+            else:
+                self._subscriptions.append(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscriptions)
+
+    def publish(self, event: AuctionEvent) -> None:
+        """
+        Hand `event` to every subscription; never blocks on consumers.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self.published += 1
+            self._history.append(event)
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription._put(event)
+
+    def close(self) -> None:
+        """
+        End the stream: subscriptions finish once drained.
+        """
+        with self._lock:
+            self._closed = True
+            subscriptions, self._subscriptions = self._subscriptions, []
+        for subscription in subscriptions:
+            subscription._end()
@@ -10,17 +10,46 @@ The orchestrator:
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any
+from typing import TYPE_CHECKING, Any, Optional
 
+from core.llm.accounting import BudgetExceeded, get_ledger
+from core.llm.call_policy import CallTimeout
 from core.prompts.prompts import ORCHESTRATOR_AGENT_PROMPT
 from core.prompts.prompt_builder import PromptBuilder
 from core.state.state import State
-from agents.auction_system.auction_system_def import AuctionState
+from core.telemetry.metrics import record_usage, span
+
+if TYPE_CHECKING:
+    # Only needed for annotations; importing at runtime would be circular
+    # because `auction_system_def` imports this module.
+    from agents.auction_system.auction_system_def import AuctionState
+
+
+ROUND_MODES = ("sequential", "sealed_bid")
 
 
 @dataclass
 class OrchestratorConfig:
+    """
+    Auction rules.
+
+    - round_mode: "sequential" asks buyers one after another, each seeing the
+      bids placed before it; "sealed_bid" asks all eligible buyers
+      concurrently on the same round snapshot and resolves bids at round end.
+    - buyer_timeout_s: sealed-bid only; a buyer that has not answered within
+      this many seconds is recorded as PASS for the round.
+    """
+
     model: str = "gemini-2.5-flash"
+    max_rounds: int = 10
+    round_mode: str = "sequential"
+    buyer_timeout_s: Optional[float] = None
+
+    def __post_init__(self) -> None:
+        if self.round_mode not in ROUND_MODES:
+            raise ValueError(
+                f"round_mode must be one of {ROUND_MODES}, got {self.round_mode!r}"
+            )
 
 
 class OrchestratorAgent:
@@ -66,7 +95,7 @@ class OrchestratorAgent:
 
         state_text = self.state.conversation_text(max_messages=8)
 
-        if had_bid and last_round < 10:
+        if had_bid and last_round < self.config.max_rounds:
             auction_state.status = "in_progress"
             summary = (
                 f"Round {last_round} completed. "
@@ -90,11 +119,26 @@ class OrchestratorAgent:
         question = summary
         prompt = self.prompt_builder.build(state=state_text, question=question)
 
-        response = self.client.models.generate_content(
-            model=self.config.model,
-            contents=prompt,
-        )
-        text = getattr(response, "text", "").strip()
+        try:
+            with get_ledger().admit(
+                prompt,
+                agent="orchestrator",
+                model=self.config.model,
+                auction=auction_state.auction_id,
+            ) as admission:
+                with span("llm.generate_content", agent="orchestrator"):
+                    response = self.client.models.generate_content(
+                        model=admission.model,
+                        contents=prompt,
+                        **admission.kwargs,
+                    )
+                admission.settle(response)
+        except (CallTimeout, BudgetExceeded):
+            # The decision above is rule-based; only the commentary is lost.
+            text = ""
+        else:
+            record_usage(response, agent="orchestrator", model=admission.model)
+            text = getattr(response, "text", "").strip()
 
         self.state.add_message("user", question)
         self.state.add_message("assistant", text or summary)
@@ -0,0 +1,370 @@
+"""
+Vectorized Monte Carlo auction simulator.
+
+`AuctionSystem` asks an LLM for every buyer decision, which is far too slow
+and expensive to explore strategies or tune budgets. This module replays the
+same auction rules with rule-based buyers, for many auctions at once:
+
+- Rounds follow `AuctionSystem` / `OrchestratorAgent`: buyers act in order
+  within a round, a bid must beat the current highest bid and stay within the
+  buyer's budget, and the auction closes after a round without bids or after
+  `max_rounds` rounds.
+- Buyers are `SimBuyer`s: a `BuyerConfig` (name + budget), the preferences
+  from their prompt, and a parametric `StrategyParams` policy. The two presets
+  mirror `BUYER_AGENT1_PROMPT` (analytical-conservative) and
+  `BUYER_AGENT2_PROMPT` (aggressive-opportunistic).
+- Each auction is one row of NumPy arrays, so tens of thousands of auctions
+  across all listings run in a few vectorized steps per round.
+
+Differences from `AuctionSystem` with LLM buyers:
+
+- The current highest bidder never bids against itself. Sealed-bid rounds
+  skip the leader too; in sequential rounds an LLM leader is still asked and
+  may raise its own bid.
+- A rule-based buyer only says BID when its bid is valid (higher than the
+  current one and within its ceiling), so "a round without bids" means a
+  round without valid bids. The orchestrator counts every BID action, so an
+  LLM buyer's losing bid keeps the auction open for another round.
+
+Usage:
+
+    sim = AuctionSimulator.from_directory("documents/properties")
+    result = sim.run(n_per_listing=10_000, seed=7)
+    print(result.report())
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from agents.auction_system.buyer_agent import BuyerConfig
+from core.database.listing_parser import ListingFacts, load_listings
+
+
+@dataclass
+class BuyerPreferences:
+    """
+    What a buyer is looking for, as described in its prompt.
+    """
+
+    districts: Tuple[str, ...] = ()
+    min_bedrooms: int = 1
+    max_bedrooms: int = 10
+    min_area_sqm: float = 0.0
+    max_area_sqm: float = float("inf")
+    wants_parking: bool = False
+    wants_gas_heating: bool = False
+    good_energy_classes: Tuple[str, ...] = ("A", "B", "C")
+
+
+@dataclass
+class StrategyParams:
+    """
+    Parametric bidding policy.
+
+    - `fair_value` = asking price * (`base_value` + `match_premium` * match)
+      * lognormal noise with sigma `valuation_noise`
+    - first bid: `open_ratio` * fair value
+    - later bids: current highest bid * (1 + `increment_ratio`)
+    - internal maximum: min(fair value * `max_over_fair`,
+      budget * `budget_margin`); the buyer walks away above it
+    - buyers never bid on listings whose match score < `match_threshold`
+    """
+
+    open_ratio: float
+    increment_ratio: float
+    max_over_fair: float
+    budget_margin: float
+    match_threshold: float
+    base_value: float = 0.85
+    match_premium: float = 0.30
+    valuation_noise: float = 0.05
+
+
+CONSERVATIVE = StrategyParams(
+    open_ratio=0.80,
+    increment_ratio=0.02,
+    max_over_fair=1.00,
+    budget_margin=0.95,
+    match_threshold=0.50,
+    valuation_noise=0.04,
+)
+
+AGGRESSIVE = StrategyParams(
+    open_ratio=0.95,
+    increment_ratio=0.06,
+    max_over_fair=1.15,
+    budget_margin=1.00,
+    match_threshold=0.40,
+    valuation_noise=0.08,
+)
+
+
+# Preferences transcribed from BUYER_AGENT1_PROMPT / BUYER_AGENT2_PROMPT.
+LOWIE_PREFERENCES = BuyerPreferences(
+    districts=("Lozenets", "Center"),
+    min_bedrooms=2,
+    max_bedrooms=2,
+    min_area_sqm=70,
+    max_area_sqm=100,
+    wants_parking=True,
+    wants_gas_heating=True,
+)
+
+HIGHIE_PREFERENCES = BuyerPreferences(
+    districts=("Lozenets", "Center", "Iztok"),
+    min_bedrooms=2,
+    max_bedrooms=10,
+    min_area_sqm=90,
+    max_area_sqm=140,
+    wants_parking=True,
+)
+
+
+@dataclass
+class SimBuyer:
+    config: BuyerConfig
+    preferences: BuyerPreferences
+    strategy: StrategyParams
+
+    def match_score(self, listing: ListingFacts) -> float:
+        """
+        Score in [0, 1] of how well `listing` fits this buyer's preferences.
+        """
+        prefs = self.preferences
+        checks: List[Tuple[float, bool]] = [
+            (0.30, bool(listing.district) and any(
+                d.lower() in listing.district.lower() for d in prefs.districts
+            )),
+            (0.25, listing.bedrooms is not None
+                and prefs.min_bedrooms <= listing.bedrooms <= prefs.max_bedrooms),
+            (0.20, listing.area_sqm is not None
+                and prefs.min_area_sqm <= listing.area_sqm <= prefs.max_area_sqm),
+            (0.10, listing.has_parking or not prefs.wants_parking),
+            (0.10, listing.has_gas_heating or not prefs.wants_gas_heating),
+            (0.05, (listing.energy_class or "").strip()[:1] in prefs.good_energy_classes),
+        ]
+        return sum(weight for weight, ok in checks if ok)
+
+
+def default_buyers() -> List[SimBuyer]:
+    """
+    The two buyers of the auction system, with budgets from their configs.
+    """
+    from agents.auction_system.agent_configs.conf_buy1 import BUYER1_CONFIG
+    from agents.auction_system.agent_configs.conf_buy2 import BUYER2_CONFIG
+
+    return [
+        SimBuyer(BUYER1_CONFIG, LOWIE_PREFERENCES, CONSERVATIVE),
+        SimBuyer(BUYER2_CONFIG, HIGHIE_PREFERENCES, AGGRESSIVE),
+    ]
+
+
+@dataclass
+class SimulationResult:
+    """
+    Per-auction outcomes (one entry per simulated auction).
+    """
+
+    listing_ids: List[str]
+    buyer_names: List[str]
+    listing_index: np.ndarray  # (n,) index into listing_ids
+    winner: np.ndarray  # (n,) index into buyer_names, -1 = no sale
+    price: np.ndarray  # (n,) clearing price, NaN = no sale
+    rounds: np.ndarray  # (n,) rounds played
+    bids: np.ndarray  # (n, n_buyers) number of bids placed
+    elapsed_s: float = 0.0
+
+    @property
+    def n_auctions(self) -> int:
+        return int(self.winner.shape[0])
+
+    def report(self, per_listing: bool = False) -> Dict[str, Any]:
+        """
+        Aggregate win rates, clearing prices and round counts.
+        """
+        sold = self.winner >= 0
+        prices = self.price[sold]
+
+        def price_stats(values: np.ndarray) -> Dict[str, Optional[float]]:
+            if values.size == 0:
+                return {"mean": None, "median": None, "p5": None, "p95": None}
+            p5, p50, p95 = np.percentile(values, [5, 50, 95])
+            return {"mean": float(values.mean()), "median": float(p50),
+                    "p5": float(p5), "p95": float(p95)}
+
+        report: Dict[str, Any] = {
+            "auctions": self.n_auctions,
+            "elapsed_s": self.elapsed_s,
+            "no_sale_rate": float(1.0 - sold.mean()) if self.n_auctions else 0.0,
+            "win_rate": {
+                name: float((self.winner == i).mean()) for i, name in enumerate(self.buyer_names)
+            },
+            "mean_bids_per_auction": {
+                name: float(self.bids[:, i].mean()) for i, name in enumerate(self.buyer_names)
+            },
+            "clearing_price": price_stats(prices),
+            "rounds": {
+                "mean": float(self.rounds.mean()),
+                "max": int(self.rounds.max()) if self.n_auctions else 0,
+                "histogram": {
+                    int(r): int(c) for r, c in zip(*np.unique(self.rounds, return_counts=True))
+                },
+            },
+        }
+
+        if per_listing:
+            listings: Dict[str, Any] = {}
+            for idx, listing_id in enumerate(self.listing_ids):
+                mask = self.listing_index == idx
+                lot_sold = sold & mask
+                listings[listing_id] = {
+                    "no_sale_rate": float(1.0 - lot_sold.sum() / max(1, mask.sum())),
+                    "win_rate": {
+                        name: float((self.winner[mask] == i).mean())
+                        for i, name in enumerate(self.buyer_names)
+                    },
+                    "median_price": float(np.median(self.price[lot_sold])) if lot_sold.any() else None,
+                    "mean_rounds": float(self.rounds[mask].mean()),
+                }
+            report["listings"] = listings
+
+        return report
+
+
+class AuctionSimulator:
+    """
+    Runs many rule-based auctions per listing in vectorized batches.
+    """
+
+    def __init__(
+        self,
+        listings: Sequence[Tuple[str, ListingFacts]],
+        buyers: Optional[Sequence[SimBuyer]] = None,
+        *,
+        max_rounds: int = 10,
+        bid_step: float = 500.0,
+    ) -> None:
+        self.listings = [(lid, facts) for lid, facts in listings if facts.price_eur]
+        if not self.listings:
+            raise ValueError("no listings with a parsable asking price")
+        self.buyers = list(buyers) if buyers is not None else default_buyers()
+        self.max_rounds = max_rounds
+        self.bid_step = bid_step
+
+        self._asking = np.array([facts.price_eur for _, facts in self.listings], dtype=np.float64)
+        # (n_listings, n_buyers)
+        self._match = np.array(
+            [[b.match_score(facts) for b in self.buyers] for _, facts in self.listings],
+            dtype=np.float64,
+        )
+
+    @classmethod
+    def from_directory(
+        cls,
+        directory_path: str,
+        buyers: Optional[Sequence[SimBuyer]] = None,
+        **kwargs: Any,
+    ) -> "AuctionSimulator":
+        return cls(load_listings(directory_path), buyers, **kwargs)
+
+    def run(
+        self,
+        n_per_listing: int,
+        *,
+        seed: Optional[int] = None,
+        batch_size: int = 250_000,
+    ) -> SimulationResult:
+        """
+        Simulate `n_per_listing` auctions for every listing.
+        """
+        if n_per_listing < 1:
+            raise ValueError("n_per_listing must be >= 1")
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        start = time.perf_counter()
+        rng = np.random.default_rng(seed)
+        listing_index = np.repeat(np.arange(len(self.listings)), n_per_listing)
+
+        parts = [
+            self._run_batch(listing_index[i: i + batch_size], rng)
+            for i in range(0, listing_index.size, batch_size)
+        ]
+        winner, price, rounds, bids = (np.concatenate(p) for p in zip(*parts))
+
+        return SimulationResult(
+            listing_ids=[lid for lid, _ in self.listings],
+            buyer_names=[b.config.name for b in self.buyers],
+            listing_index=listing_index,
+            winner=winner,
+            price=price,
+            rounds=rounds,
+            bids=bids,
+            elapsed_s=time.perf_counter() - start,
+        )
+
+    def _run_batch(
+        self,
+        listing_index: np.ndarray,
+        rng: np.random.Generator,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        n = listing_index.size
+        n_buyers = len(self.buyers)
+        step = self.bid_step
+
+        asking = self._asking[listing_index]
+        match = self._match[listing_index]  # (n, n_buyers)
+
+        open_bid = np.empty((n, n_buyers))
+        ceiling = np.empty((n, n_buyers))
+        interested = np.empty((n, n_buyers), dtype=bool)
+        increment = np.array([b.strategy.increment_ratio for b in self.buyers])
+
+        for j, buyer in enumerate(self.buyers):
+            s = buyer.strategy
+            noise = rng.lognormal(mean=0.0, sigma=s.valuation_noise, size=n)
+            fair = asking * (s.base_value + s.match_premium * match[:, j]) * noise
+            open_bid[:, j] = np.ceil(fair * s.open_ratio / step) * step
+            cap = np.minimum(fair * s.max_over_fair, buyer.config.budget * s.budget_margin)
+            ceiling[:, j] = np.floor(np.minimum(cap, buyer.config.budget) / step) * step
+            interested[:, j] = match[:, j] >= s.match_threshold
+
+        highest = np.full(n, np.nan)
+        bidder = np.full(n, -1, dtype=np.int64)
+        rounds = np.zeros(n, dtype=np.int64)
+        bids = np.zeros((n, n_buyers), dtype=np.int64)
+        active = np.ones(n, dtype=bool)
+
+        for _ in range(self.max_rounds):
+            if not active.any():
+                break
+            rounds[active] += 1
+            had_bid = np.zeros(n, dtype=bool)
+
+            for j in range(n_buyers):
+                no_bid_yet = np.isnan(highest)
+                raised = np.ceil(np.nan_to_num(highest) * (1.0 + increment[j]) / step) * step
+                proposal = np.where(no_bid_yet, open_bid[:, j], raised)
+                proposal = np.minimum(proposal, ceiling[:, j])
+
+                place = (
+                    active
+                    & interested[:, j]
+                    & (bidder != j)
+                    & (no_bid_yet | (proposal > np.nan_to_num(highest)))
+                    & (proposal > 0)
+                )
+                highest = np.where(place, proposal, highest)
+                bidder = np.where(place, j, bidder)
+                bids[:, j] += place
+                had_bid |= place
+
+            # Orchestrator rule: close after a round without bids.
+            active &= had_bid
+
+        price = np.where(bidder >= 0, highest, np.nan)
+        return bidder, price, rounds, bids
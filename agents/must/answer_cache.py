@@ -0,0 +1,248 @@
+"""
+Semantic answer cache for the Must agent.
+
+Paraphrased questions ("cheapest flat in Lozenets?" / "what's the lowest
+priced Lozenets apartment?") usually retrieve the same listings and get the
+same answer, yet each costs a full `generate_content` call.
+`SemanticAnswerCache` returns the stored answer instead when a new question:
+
+- retrieves the same set of documents (ids and content hashes, see
+  `document_signature`), and
+- has a query embedding within `similarity_threshold` (cosine) of a cached
+  question with that document set
+
+Entries expire after `ttl_s` and the least recently used are evicted beyond
+`max_entries`. Because the signature includes each document's content hash,
+an edited, added or removed listing changes what a question retrieves and
+the old answer is simply no longer matched; `invalidate()` also drops
+entries explicitly (the REPL calls it after a `--watch` re-index).
+
+The agent only consults the cache on turns that retrieved afresh: follow-up
+questions depend on the conversation and are always sent to the model.
+
+The cache is off unless `TELEHELPER_ANSWER_CACHE=1`. The default threshold
+was only checked against the benchmark's hashed fake embeddings; with real
+embeddings, questions that differ in one word ("cheapest" / "most
+expensive") can score above it over the same listings, so calibrate
+`TELEHELPER_ANSWER_CACHE_THRESHOLD` on real question pairs before enabling.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from core.database.vectorstore.prop_retriever import RetrievedProperty
+
+ANSWER_CACHE_METRIC = "telehelper_answer_cache_total"
+
+
+@dataclass
+class AnswerCacheConfig:
+    """
+    - similarity_threshold: minimum cosine similarity between the question
+      embeddings for a hit.
+    - ttl_s: seconds an answer stays valid.
+    - max_entries: answers kept before the least recently used is evicted.
+    """
+
+    similarity_threshold: float = 0.93
+    ttl_s: float = 3600.0
+    max_entries: int = 1024
+
+    def __post_init__(self) -> None:
+        if not -1.0 <= self.similarity_threshold <= 1.0:
+            raise ValueError("similarity_threshold must be between -1 and 1")
+        if self.max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+
+    @classmethod
+    def from_env(cls) -> "AnswerCacheConfig":
+        return cls(
+            similarity_threshold=float(os.getenv("TELEHELPER_ANSWER_CACHE_THRESHOLD", "0.93")),
+            ttl_s=float(os.getenv("TELEHELPER_ANSWER_CACHE_TTL", "3600")),
+            max_entries=int(os.getenv("TELEHELPER_ANSWER_CACHE_SIZE", "1024")),
+        )
+
+
+def answer_cache_enabled() -> bool:
+    return os.getenv("TELEHELPER_ANSWER_CACHE", "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _document_id(item: "RetrievedProperty") -> str:
+    meta = item.metadata or {}
+    return str(meta.get("filename") or meta.get("source") or item.group_id or "")
+
+
+def document_signature(retrieved: Iterable["RetrievedProperty"]) -> Tuple[str, ...]:
+    """
+    Order-independent key of a retrieval: `id:content_hash` per document.
+
+    Collections vectorized before `content_hash` existed fall back to hashing
+    the retrieved text.
+    """
+    parts = []
+    for item in retrieved:
+        meta = item.metadata or {}
+        digest = meta.get("content_hash") or hashlib.sha1(item.text.encode("utf-8")).hexdigest()
+        parts.append(f"{_document_id(item)}:{digest}")
+    return tuple(sorted(parts))
+
+
+@dataclass
+class _Entry:
+    question: str
+    vector: Any
+    signature: Tuple[str, ...]
+    document_ids: FrozenSet[str]
+    answer: str
+    expires_at: float
+    hits: int = 0
+
+
+@dataclass
+class CacheHit:
+    answer: str
+    question: str
+    similarity: float
+
+
+class SemanticAnswerCache:
+    """
+    Thread-safe; one cache can be shared by several agents that use the same
+    model and prompt.
+    """
+
+    def __init__(
+        self,
+        config: Optional[AnswerCacheConfig] = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.config = config or AnswerCacheConfig()
+        self._clock = clock
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._by_signature: Dict[Tuple[str, ...], List[int]] = {}
+        self._next_key = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> Optional[float]:
+        total = self.hits + self.misses
+        return self.hits / total if total else None
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    def lookup(self, query_vector: Any, signature: Tuple[str, ...]) -> Optional[CacheHit]:
+        """
+        Best cached answer for `signature` whose question is similar enough.
+        """
+        import numpy as np
+
+        query = np.asarray(query_vector, dtype=np.float32)
+        now = self._clock()
+        with self._lock:
+            best: Optional[Tuple[float, int]] = None
+            for key in list(self._by_signature.get(signature, ())):
+                entry = self._entries[key]
+                if entry.expires_at <= now:
+                    self._remove(key)
+                    self.expirations += 1
+                    continue
+                similarity = float(np.dot(query, entry.vector))
+                if best is None or similarity > best[0]:
+                    best = (similarity, key)
+
+            if best is None or best[0] < self.config.similarity_threshold:
+                self.misses += 1
+                return None
+
+            similarity, key = best
+            entry = self._entries[key]
+            self._entries.move_to_end(key)
+            entry.hits += 1
+            self.hits += 1
+            return CacheHit(entry.answer, entry.question, similarity)
+
+    def store(
+        self,
+        question: str,
+        query_vector: Any,
+        retrieved: List["RetrievedProperty"],
+        answer: str,
+        signature: Optional[Tuple[str, ...]] = None,
+    ) -> None:
+        import numpy as np
+
+        signature = signature if signature is not None else document_signature(retrieved)
+        entry = _Entry(
+            question=question,
+            vector=np.asarray(query_vector, dtype=np.float32),
+            signature=signature,
+            document_ids=frozenset(_document_id(item) for item in retrieved),
+            answer=answer,
+            expires_at=self._clock() + self.config.ttl_s,
+        )
+        with self._lock:
+            key = self._next_key
+            self._next_key += 1
+            self._entries[key] = entry
+            self._by_signature.setdefault(signature, []).append(key)
+            while len(self._entries) > self.config.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    # ------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------
+
+    def invalidate(self, document_ids: Optional[Iterable[str]] = None) -> int:
+        """
+        Drop answers built on any of `document_ids` (filenames), or every
+        answer when None. Returns the number dropped.
+        """
+        with self._lock:
+            if document_ids is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+                self._by_signature.clear()
+                return dropped
+            changed = set(document_ids)
+            stale = [k for k, e in self._entries.items() if e.document_ids & changed]
+            for key in stale:
+                self._remove(key)
+            return len(stale)
+
+    def _remove(self, key: int) -> None:
+        entry = self._entries.pop(key)
+        keys = self._by_signature.get(entry.signature)
+        if keys is not None:
+            keys.remove(key)
+            if not keys:
+                del self._by_signature[entry.signature]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
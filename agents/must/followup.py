@@ -0,0 +1,138 @@
+"""
+Follow-up detection for the Must agent.
+
+When the user asks about properties that are already in context ("how big is
+its balcony?", "does the second one have parking?"), running retrieval again
+costs an embedding call plus a Chroma query, and may even swap in different
+listings. `FollowUpDetector` decides, without any model call, whether the
+previous turn's retrieved properties can be reused.
+
+Signals (summed into a confidence score):
+- references to something already discussed: pronouns ("it", "its",
+  "this one"), ordinals ("the second one", "property 2")
+- lexical overlap with the previous query and a short question
+- names, REF codes and prices that already appear in the cached context
+- against reuse: new-search phrasing ("another", "show me", "find") and
+  names / REF codes that are not in the cached context
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Set
+
+_WORD_RE = re.compile(r"[\w'-]+", re.UNICODE)
+_REF_RE = re.compile(r"\b[A-Z]{2}-[A-Z]{3}-\d+\b")
+_ORDINAL_RE = re.compile(
+    r"\b(first|second|third|fourth|fifth|last|former|latter)\b"
+    r"|\b(property|listing|option|apartment|flat|house)\s*(#|no\.?\s*)?\d\b"
+    r"|#\d\b",
+    re.IGNORECASE,
+)
+
+_REFERENCE_WORDS = {
+    "it", "its", "it's", "this", "that", "these", "those", "they", "them",
+    "their", "there", "same", "both", "one", "ones", "former", "latter",
+}
+_NEW_SEARCH_WORDS = {
+    "another", "other", "others", "different", "else", "instead", "alternative",
+    "alternatives", "find", "search", "recommend", "suggest", "looking", "any",
+}
+_NEW_SEARCH_PHRASES = ("show me", "are there", "is there any", "do you have")
+_STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "in", "on", "at", "to", "for", "with",
+    "is", "are", "was", "be", "do", "does", "did", "has", "have", "how", "what",
+    "which", "who", "where", "when", "why", "can", "could", "would", "i", "me",
+    "my", "you", "your", "we", "our", "please", "about", "much", "many", "there",
+} | _REFERENCE_WORDS
+
+
+def _words(text: str) -> List[str]:
+    return _WORD_RE.findall(text)
+
+
+def _content_tokens(text: str) -> Set[str]:
+    return {w.lower() for w in _words(text) if w.lower() not in _STOPWORDS and len(w) > 1}
+
+
+def _entities(text: str) -> Set[str]:
+    """
+    Names (capitalized words not starting a sentence) and REF codes.
+    """
+    entities = set(_REF_RE.findall(text))
+    for sentence in re.split(r"[.?!]\s+", text):
+        words = _words(sentence)
+        for word in words[1:]:
+            if word[:1].isupper() and word.lower() not in _STOPWORDS:
+                entities.add(word)
+    return entities
+
+
+@dataclass
+class FollowUpDecision:
+    reuse: bool
+    confidence: float
+    reason: str
+
+
+class FollowUpDetector:
+    """
+    Cheap lexical classifier: is `question` a follow-up on the cached context?
+    """
+
+    def __init__(self, threshold: float = 0.5) -> None:
+        self.threshold = threshold
+
+    def decide(
+        self,
+        question: str,
+        previous_query: Optional[str],
+        context_texts: Iterable[str],
+    ) -> FollowUpDecision:
+        if previous_query is None:
+            return FollowUpDecision(False, 0.0, "no cached context")
+
+        lowered = question.lower()
+        words = {w.lower() for w in _words(question)}
+        context = "\n".join(context_texts)
+        score = 0.0
+        reasons: List[str] = []
+
+        if words & _REFERENCE_WORDS:
+            score += 0.6
+            reasons.append("reference word")
+        if _ORDINAL_RE.search(question):
+            score += 0.6
+            reasons.append("ordinal reference")
+
+        tokens = _content_tokens(question)
+        previous = _content_tokens(previous_query)
+        if tokens and previous:
+            overlap = len(tokens & previous) / len(tokens | previous)
+            if overlap >= 0.3:
+                score += min(0.4, overlap)
+                reasons.append(f"overlap {overlap:.2f}")
+        if len(tokens) <= 6:
+            score += 0.15
+
+        entities = _entities(question)
+        if entities:
+            unknown = {e for e in entities if e.lower() not in context.lower()}
+            if unknown:
+                score -= 0.6
+                reasons.append(f"new entity {sorted(unknown)[0]}")
+            else:
+                score += 0.2
+                reasons.append("entities in context")
+
+        if words & _NEW_SEARCH_WORDS or any(p in lowered for p in _NEW_SEARCH_PHRASES):
+            score -= 0.7
+            reasons.append("new-search phrasing")
+
+        confidence = max(0.0, min(1.0, score))
+        return FollowUpDecision(
+            reuse=confidence >= self.threshold,
+            confidence=confidence,
+            reason=", ".join(reasons) or "no follow-up signal",
+        )
@@ -5,16 +5,62 @@ This agent wires together:
 - Gemini client (`google.genai.Client` optionally wrapped by LangSmith)
 - Prompt template + builder
 - Simple in-memory State (conversation history)
+
+The last retrieval (query + `RetrievedProperty` list) is kept in the State
+under `LAST_RETRIEVAL_KEY`. Follow-up questions about those properties reuse
+it instead of retrieving again (see `followup.py`); `reuse_rate` reports how
+often that happened.
+
+With a `SemanticAnswerCache` (see `answer_cache.py`), a freshly retrieved
+question that paraphrases an earlier one and retrieves the same documents is
+answered from the cache without calling the model.
+
+If the model call misses its deadline (`core.llm.call_policy.CallTimeout`),
+the agent answers with `MustAgentConfig.timeout_reply` and the turn is not
+added to the conversation, so the user can simply ask again.
+
+With `context_mode="digest"` (the default) the prompt carries each
+property's ingest-time digest (price, size, location, key features; see
+`listing_parser.listing_digest`) instead of the full listing. When those are
+not enough, the model replies `NEED_DETAILS <property numbers>` and is asked
+once more with the full text of those properties. If it still asks, every
+property is sent in full; a model that asks even then gets no answer cached
+or recorded, and the user gets `details_reply`. Properties indexed before
+digests existed are always sent in full.
+
+Every model call is admitted and charged to the token ledger
+(`core.llm.accounting`) under the agent's `session_id`. A call rejected by
+a budget is not sent: the agent answers `budget_reply` (or `timeout_reply`
+for the per-minute budget) and the turn is not recorded.
 """
 
 from __future__ import annotations
 
+import re
+import uuid
 from dataclasses import dataclass
-from typing import Optional, Any, List
+from typing import Optional, Any, List, Set, Tuple
 
+from agents.must.answer_cache import ANSWER_CACHE_METRIC, SemanticAnswerCache, document_signature
+from agents.must.followup import FollowUpDetector
 from core.database.vectorstore.prop_retriever import PropertyRetriever, RetrievedProperty
+from core.llm.accounting import BudgetExceeded, Usage, get_ledger
+from core.llm.call_policy import CallTimeout
 from core.prompts.prompt_builder import make_must_agent_prompt
 from core.state.state import State
+from core.telemetry.metrics import count, record_usage, span
+from core.telemetry.profiling import profile
+
+LAST_RETRIEVAL_KEY = "last_retrieval"
+CONTEXT_REUSE_METRIC = "telehelper_context_reuse_total"
+CONTEXT_EXPANSION_METRIC = "telehelper_context_expansions_total"
+CONTEXT_MODES = ("digest", "full")
+
+_DETAILS_REQUEST_RE = re.compile(r"^\W*NEED_DETAILS\b([\d,\s]*)", re.IGNORECASE)
+_DETAILS_INSTRUCTION = (
+    "These are summaries. If you need a property's full listing to answer, "
+    "reply with only NEED_DETAILS and the property numbers (e.g. NEED_DETAILS 1, 3)."
+)
 
 
 @dataclass
@@ -23,6 +69,30 @@ class MustAgentConfig:
     max_state_messages: int = 6
     use_rag: bool = True
     rag_top_k: int = 3
+    # Follow-up questions reuse the previous turn's retrieved properties.
+    reuse_context: bool = True
+    followup_threshold: float = 0.5
+    # Retrieve again after this many reuses in a row, even for follow-ups.
+    max_context_reuse: int = 3
+    # Returned when the model call times out.
+    timeout_reply: str = (
+        "Sorry, I could not get an answer in time. Please ask again in a moment."
+    )
+    # "digest": property digests, full listings only when the model asks;
+    # "full": always the full listings.
+    context_mode: str = "digest"
+    # Returned when the session's token budget is used up.
+    budget_reply: str = (
+        "This conversation has reached its usage limit. Please start a new session."
+    )
+    # Returned when the model asks for details even with every listing in full.
+    details_reply: str = (
+        "Sorry, I could not find an answer in the listings. Please rephrase the question."
+    )
+
+    def __post_init__(self) -> None:
+        if self.context_mode not in CONTEXT_MODES:
+            raise ValueError(f"context_mode must be one of {CONTEXT_MODES}")
 
 
 class MustAgent:
@@ -33,55 +103,237 @@ class MustAgent:
         state: Optional[State] = None,
         retriever: Optional[PropertyRetriever] = None,
         config: Optional[MustAgentConfig] = None,
+        answer_cache: Optional[SemanticAnswerCache] = None,
+        session_id: Optional[str] = None,
     ) -> None:
         """
         `client` is expected to be a Gemini client (or a LangSmith-wrapped client)
         that exposes `client.models.generate_content(...)`.
+
+        `answer_cache` may be shared between agents using the same model.
+        `session_id` identifies the conversation for token accounting.
         """
         self.client = client
+        self.session_id = session_id or uuid.uuid4().hex[:12]
         self.state = state or State()
         self.retriever = retriever
+        self.answer_cache = answer_cache
         self.config = config or MustAgentConfig()
+        self.followup_detector = FollowUpDetector(self.config.followup_threshold)
+        self.retrievals = 0
+        self.reuses = 0
+        self.timeouts = 0
+        self.expansions = 0
+        self.rejections = 0
+        self.details_failures = 0
+        self._reuse_streak = 0
 
-    def ask(self, question: str) -> str:
+    @property
+    def reuse_rate(self) -> Optional[float]:
+        """
+        Share of RAG turns answered from the cached context (None before the
+        first RAG turn).
+        """
+        total = self.retrievals + self.reuses
+        return self.reuses / total if total else None
+
+    def ask(self, question: str, query_vector: Optional[Any] = None) -> str:
         """
         Ask the agent a question and update state with this interaction.
+
+        `query_vector` is the question's embedding when the caller already
+        has it (batch mode embeds many questions per call); it is used if
+        the turn retrieves.
         """
         question = (question or "").strip()
         if not question:
             raise ValueError("question must be a non-empty string")
 
+        with span("must_agent.ask"), profile("must_agent.ask"):
+            return self._ask(question, query_vector)
+
+    def _ask(self, question: str, query_vector: Optional[Any] = None) -> str:
         state_text = self.state.conversation_text(
             max_messages=self.config.max_state_messages
         )
 
+        signature = None
+        retrieved: List[RetrievedProperty] = []
         if self.retriever and self.config.use_rag:
-            retrieved: List[RetrievedProperty] = self.retriever.retrieve(
-                query=question,
-                n_results=self.config.rag_top_k,
-            )
-            if retrieved:
-                lines = ["Relevant property documents:"]
-                for idx, item in enumerate(retrieved, start=1):
-                    meta = item.metadata or {}
-                    src = meta.get("filename") or meta.get("source") or "unknown source"
-                    header = f"[Property {idx}] (source: {src})"
-                    lines.append(header)
-                    lines.append(item.text.strip())
-                    lines.append("")
-                context_block = "\n".join(lines).strip()
-                state_text = f"{state_text}\n\n{context_block}"
+            retrieved, query_vector = self._context_for(question, query_vector)
+            if query_vector is not None and self.answer_cache is not None and retrieved:
+                signature = document_signature(retrieved)
+                hit = self.answer_cache.lookup(query_vector, signature)
+                count(ANSWER_CACHE_METRIC, result="hit" if hit else "miss")
+                if hit is not None:
+                    return self._remember(question, hit.answer)
+
+        full: Set[int] = set()
+        if self.config.context_mode == "full":
+            full = set(range(len(retrieved)))
+        everything = set(range(len(retrieved)))
+        try:
+            answer = self._generate(state_text, question, retrieved, full, allow_details=True)
+            # The properties the model asked for, then (if it asks again, or
+            # asked only for ones it already had) all of them in full.
+            for attempt in range(2):
+                request = _DETAILS_REQUEST_RE.match(answer) if answer is not None else None
+                if request is None or full == everything:
+                    break
+                expanded = full | self._requested(request.group(1), len(retrieved))
+                full = everything if attempt or expanded == full else expanded
+                self.expansions += 1
+                count(CONTEXT_EXPANSION_METRIC)
+                answer = self._generate(state_text, question, retrieved, full, allow_details=False)
+        except BudgetExceeded as e:
+            self.rejections += 1
+            return self.config.timeout_reply if e.scope == "minute" else self.config.budget_reply
+        if answer is None:
+            self.timeouts += 1
+            return self.config.timeout_reply
+        if _DETAILS_REQUEST_RE.match(answer):
+            # Not an answer: neither cached nor added to the conversation.
+            self.details_failures += 1
+            return self.config.details_reply
+
+        if signature is not None:
+            self.answer_cache.store(question, query_vector, retrieved, answer, signature)
+
+        return self._remember(question, answer)
+
+    def _generate(
+        self,
+        state_text: str,
+        question: str,
+        retrieved: List[RetrievedProperty],
+        full: Set[int],
+        *,
+        allow_details: bool,
+    ) -> Optional[str]:
+        """
+        One model call; None if it timed out. Raises `BudgetExceeded`
+        (before sending) when the token budget does not admit it.
+        """
+        if retrieved:
+            context_block = self._context_block(retrieved, full, allow_details)
+            state_text = f"{state_text}\n\n{context_block}"
         prompt = make_must_agent_prompt(state=state_text, question=question)
 
-        response = self.client.models.generate_content(
-            model=self.config.model,
-            contents=prompt,
+        admission = get_ledger().admit(
+            prompt, agent="must", model=self.config.model, session=self.session_id
         )
+        try:
+            with admission:
+                with span("llm.generate_content", agent="must"):
+                    response = self.client.models.generate_content(
+                        model=admission.model,
+                        contents=prompt,
+                        **admission.kwargs,
+                    )
+                admission.settle(response)
+        except CallTimeout:
+            return None
+        record_usage(response, agent="must", model=admission.model)
+        return getattr(response, "text", None) or str(response)
 
-        answer = getattr(response, "text", None) or str(response)
+    @staticmethod
+    def _context_block(
+        retrieved: List[RetrievedProperty],
+        full: Set[int],
+        allow_details: bool,
+    ) -> str:
+        """
+        Digest or full text per property (index in `full`, or no digest).
+        """
+        lines = ["Relevant property documents:"]
+        summarized = False
+        for idx, item in enumerate(retrieved, start=1):
+            meta = item.metadata or {}
+            src = meta.get("filename") or meta.get("source") or "unknown source"
+            digest = item.digest
+            if idx - 1 in full or not digest:
+                lines.append(f"[Property {idx}] (source: {src})")
+                lines.append(item.text.strip())
+            else:
+                summarized = True
+                lines.append(f"[Property {idx}] (source: {src}, summary)")
+                lines.append(digest.strip())
+            lines.append("")
+        if summarized and allow_details:
+            lines.append(_DETAILS_INSTRUCTION)
+        return "\n".join(lines).strip()
 
+    @staticmethod
+    def _requested(numbers: str, available: int) -> Set[int]:
+        """
+        Indexes of the properties named in a NEED_DETAILS reply (all of
+        them if none is named or recognised).
+        """
+        wanted = {int(n) - 1 for n in re.findall(r"\d+", numbers)}
+        wanted = {i for i in wanted if 0 <= i < available}
+        return wanted or set(range(available))
+
+    def end_session(self) -> Usage:
+        """
+        Release the session's token totals in the ledger and return them
+        (call when the conversation is over).
+        """
+        return get_ledger().release(session=self.session_id)
+
+    def restore_retrieval(self, query: str, reused: int = 0) -> None:
+        """
+        Rebuild the last-retrieval context of a replayed conversation (batch
+        resume): retrieve `query` again, as the turn that asked it did, and
+        continue its streak of `reused` follow-ups.
+        """
+        if not (self.retriever and self.config.use_rag):
+            return
+        retrieved = self.retriever.retrieve(query=query, n_results=self.config.rag_top_k)
+        self.state.set(LAST_RETRIEVAL_KEY, {"query": query, "results": retrieved})
+        self._reuse_streak = reused
+
+    def _remember(self, question: str, answer: str) -> str:
         self.state.add_message("user", question)
         self.state.add_message("assistant", answer)
-
         return answer
 
+    def _context_for(
+        self,
+        question: str,
+        query_vector: Optional[Any] = None,
+    ) -> Tuple[List[RetrievedProperty], Optional[Any]]:
+        """
+        Reuse the cached retrieval for follow-ups, otherwise retrieve.
+
+        Returns the properties and, for a fresh retrieval, the question's
+        embedding if it is known (given, or embedded for the answer cache).
+        """
+        cached = self.state.get(LAST_RETRIEVAL_KEY)
+        if (
+            cached
+            and self.config.reuse_context
+            and self._reuse_streak < self.config.max_context_reuse
+        ):
+            decision = self.followup_detector.decide(
+                question,
+                previous_query=cached["query"],
+                context_texts=(item.text for item in cached["results"]),
+            )
+            if decision.reuse:
+                self.reuses += 1
+                self._reuse_streak += 1
+                count(CONTEXT_REUSE_METRIC, decision="reused")
+                return cached["results"], None
+
+        if query_vector is None and self.answer_cache is not None:
+            query_vector = self.retriever.embed_query(question)
+        retrieved: List[RetrievedProperty] = self.retriever.retrieve(
+            query=question,
+            n_results=self.config.rag_top_k,
+            query_vector=query_vector,
+        )
+        self.retrievals += 1
+        self._reuse_streak = 0
+        count(CONTEXT_REUSE_METRIC, decision="retrieved")
+        self.state.set(LAST_RETRIEVAL_KEY, {"query": question, "results": retrieved})
+        return retrieved, query_vector
@@ -0,0 +1,176 @@
+"""
+Near-duplicate detection for listing documents (MinHash + LSH).
+
+Listing feeds often contain re-posted or lightly edited copies of the same
+description. Before embedding, documents are grouped by estimated Jaccard
+similarity of their word shingles:
+
+- each document becomes a set of `shingle_size`-word shingles
+- a MinHash signature of `num_perm` values estimates Jaccard similarity
+- LSH banding proposes candidate pairs without comparing every pair
+- candidates at or above `threshold` are merged into one group
+
+The first document of each group (in input order) is its canonical
+document; the others point to it. Only canonical documents need an
+embedding.
+"""
+
+from __future__ import annotations
+
+import re
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+
+# Odd multipliers combining the token hashes of one shingle (position-aware).
+_SHINGLE_MULTIPLIERS = np.array(
+    [0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0x27D4EB2F165667C5,
+     0x94D049BB133111EB, 0xBF58476D1CE4E5B9, 0xD6E8FEB86659FD93, 0xFF51AFD7ED558CCD],
+    dtype=np.uint64,
+)
+
+
+def shingle_hashes(text: str, size: int = 5) -> np.ndarray:
+    """
+    64-bit hashes of the lower-cased `size`-word shingles of `text`.
+
+    Each distinct token is hashed once (crc32) and shingle hashes are combined from
+    the token hashes with NumPy, instead of hashing every shingle string.
+    Texts shorter than `size` words yield a single shingle.
+    """
+    if size > len(_SHINGLE_MULTIPLIERS):
+        raise ValueError(f"shingle size must be <= {len(_SHINGLE_MULTIPLIERS)}")
+    tokens = _TOKEN_RE.findall(text.lower())
+    if not tokens:
+        return np.zeros(0, dtype=np.uint64)
+    vocabulary = {t: zlib.crc32(t.encode("utf-8")) for t in set(tokens)}
+    token_hashes = np.fromiter(
+        (vocabulary[t] for t in tokens), dtype=np.uint64, count=len(tokens)
+    )
+    width = min(size, len(tokens))
+    count = len(tokens) - width + 1
+    combined = np.zeros(count, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for j in range(width):
+            combined += token_hashes[j:j + count] * _SHINGLE_MULTIPLIERS[j]
+    return np.unique(combined)
+
+
+@dataclass
+class DuplicateGroups:
+    """
+    Result of `find_near_duplicates`: `canonical[i]` is the index of the
+    canonical document for document `i` (itself if it is canonical).
+    """
+
+    canonical: List[int]
+    similarity: Dict[int, float] = field(default_factory=dict)
+
+    @property
+    def canonical_indices(self) -> List[int]:
+        return [i for i, c in enumerate(self.canonical) if c == i]
+
+    @property
+    def duplicate_count(self) -> int:
+        return sum(1 for i, c in enumerate(self.canonical) if c != i)
+
+    def groups(self) -> Dict[int, List[int]]:
+        out: Dict[int, List[int]] = {}
+        for i, c in enumerate(self.canonical):
+            out.setdefault(c, []).append(i)
+        return out
+
+
+class MinHasher:
+    """
+    MinHash signatures plus LSH banding for candidate pairs.
+
+    `num_perm` must be divisible by `bands`; more bands find pairs at lower
+    similarity (more candidates to verify), fewer bands are stricter.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 128,
+        bands: int = 32,
+        shingle_size: int = 5,
+        seed: int = 1,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # One hash function per permutation: (a * x + b) mod 2**64, keeping
+        # the top 32 bits (multiply-shift).
+        self._a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        values = shingle_hashes(text, self.shingle_size)
+        if len(values) == 0:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            hashed = (values[:, None] * self._a + self._b) >> np.uint64(32)
+        return hashed.min(axis=0)
+
+    def signatures(self, texts: Sequence[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.num_perm), dtype=np.uint64)
+        return np.stack([self.signature(t) for t in texts])
+
+    def candidate_pairs(self, signatures: np.ndarray) -> List[tuple]:
+        pairs = set()
+        for band in range(self.bands):
+            buckets: Dict[bytes, List[int]] = {}
+            block = signatures[:, band * self.rows:(band + 1) * self.rows]
+            for i, row in enumerate(block):
+                buckets.setdefault(row.tobytes(), []).append(i)
+            for members in buckets.values():
+                for x in range(len(members)):
+                    for y in range(x + 1, len(members)):
+                        pairs.add((members[x], members[y]))
+        return sorted(pairs)
+
+
+def find_near_duplicates(
+    texts: Sequence[str],
+    threshold: float = 0.85,
+    hasher: MinHasher | None = None,
+) -> DuplicateGroups:
+    """
+    Group texts whose estimated Jaccard similarity is at least `threshold`.
+    """
+    hasher = hasher or MinHasher()
+    signatures = hasher.signatures(texts)
+    parent = list(range(len(texts)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    best: Dict[int, float] = {}
+    for i, j in hasher.candidate_pairs(signatures):
+        similarity = float(np.mean(signatures[i] == signatures[j]))
+        if similarity < threshold:
+            continue
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            # The earlier document stays canonical.
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+        best[j] = max(best.get(j, 0.0), similarity)
+
+    canonical = [find(i) for i in range(len(texts))]
+    similarity = {i: best.get(i, 1.0) for i, c in enumerate(canonical) if c != i}
+    return DuplicateGroups(canonical=canonical, similarity=similarity)
@@ -1,33 +1,100 @@
 """
 This is an embedding module that can turn one or more text strings into
 numerical embeddings using Google's Gemini text-embedding model.
+
+Vectors are returned as one NumPy float32 matrix (one row per text), which
+Chroma accepts directly. `gemini-embedding-001` is a Matryoshka model, so
+`output_dimensionality` (e.g. 768 or 1536 instead of 3072) keeps most of the
+quality at a fraction of the size; truncated vectors are re-normalized to
+unit length.
+
+Every `embed_content` call is charged to the token ledger
+(`core.llm.accounting`) under the "embedder" agent.
 """
 
-from typing import Iterable, List
-import os
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Iterable, List, Optional
 import time
 
-from google import genai
-from google.genai import errors as genai_errors
-from dotenv import load_dotenv
+from core.llm.accounting import get_ledger
+from core.resources.registry import get_registry
+from core.telemetry.metrics import span
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+def truncate_and_normalize(vectors: Any, output_dimensionality: Optional[int] = None) -> "np.ndarray":
+    """
+    Convert `vectors` to a float32 matrix, keep the first
+    `output_dimensionality` components (if given) and L2-normalize each row.
+    """
+    # numpy is imported on first use, like genai, to keep startup fast.
+    import numpy as np
+
+    if len(vectors) == 0:
+        return np.zeros((0, output_dimensionality or 0), dtype=np.float32)
+    if isinstance(vectors, list) and isinstance(vectors[0], (list, tuple)):
+        # API responses are lists of Python floats; converting row by row
+        # (and only the kept prefix) is the cheapest way into float32.
+        matrix = np.vstack(
+            [
+                np.fromiter(row[:output_dimensionality], dtype=np.float32)
+                for row in vectors
+            ]
+        )
+    else:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+    if output_dimensionality is not None:
+        matrix = matrix[:, :output_dimensionality]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(matrix / norms, dtype=np.float32)
 
 
 class Embedder:
-    def __init__(self, model: str = "gemini-embedding-001") -> None:
-        load_dotenv()
-        api_key = os.getenv("GOOGLE_API_KEY")
-        if not api_key:
-            raise RuntimeError("GOOGLE_API_KEY environment variable is not set.")
+    def __init__(
+        self,
+        model: str = "gemini-embedding-001",
+        client: Optional[Any] = None,
+        output_dimensionality: Optional[int] = None,
+    ) -> None:
+        """
+        `client` can be provided from outside (any object exposing
+        `client.models.embed_content(...)`); if omitted, a pooled
+        `genai.Client` for `GOOGLE_API_KEY` is taken from the shared
+        resource registry.
 
-        self._client = genai.Client(api_key=api_key)
+        `output_dimensionality` truncates vectors to that many dimensions
+        (requested from the API and enforced locally); `None` keeps the
+        model's full size. Documents and queries must use the same value.
+        """
+        self._client = client or get_registry().genai_client()
         self.model = model
+        self.output_dimensionality = output_dimensionality
+        self._config = (
+            {"output_dimensionality": output_dimensionality}
+            if output_dimensionality is not None
+            else None
+        )
 
-    def embed_texts(self, texts: Iterable[str]) -> List[List[float]]:
+    def embed_texts(self, texts: Iterable[str]) -> "np.ndarray":
         """
-        Embed a sequence of plain text strings, returning one vector per string.
+        Embed a sequence of plain text strings, returning a float32 matrix
+        with one unit-length row per string.
         Sends all texts in a single API call. Falls back to smaller chunks
         with retries if rate-limited.
         """
+        with span("embedder.embed_texts"):
+            vectors = self._embed_texts(texts)
+            return truncate_and_normalize(vectors, self.output_dimensionality)
+
+    def _embed_texts(self, texts: Iterable[str]) -> List[List[float]]:
+        from google.genai import errors as genai_errors
+
         clean_texts = [t for t in texts if t and t.strip()]
         if not clean_texts:
             return []
@@ -36,7 +103,9 @@ class Embedder:
             result = self._client.models.embed_content(
                 model=self.model,
                 contents=clean_texts,
+                config=self._config,
             )
+            get_ledger().record_embedding(result, clean_texts)
             return [getattr(emb, "values", emb) for emb in result.embeddings]
 
         except genai_errors.ClientError as e:
@@ -63,7 +132,9 @@ class Embedder:
                     result = self._client.models.embed_content(
                         model=self.model,
                         contents=chunk,
+                        config=self._config,
                     )
+                    get_ledger().record_embedding(result, chunk)
                     all_vectors.extend(
                         getattr(emb, "values", emb) for emb in result.embeddings
                     )
@@ -0,0 +1,166 @@
+"""
+Deterministic parsing of property listing documents.
+
+Every listing in `documents/properties` ends with a "Summary Card" markdown
+table (Reference ID, Location, Price, Total Area, Bedrooms, ...). This module
+turns that table, plus the title line, into a `ListingFacts` record so other
+components can work with structured values instead of the full text.
+
+`listing_digest` renders the same facts as a short plain-text digest (about
+a tenth of a listing's length). It is stored in the Chroma metadata at
+ingest and sent to the model instead of the full listing by default.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+
+_REF_RE = re.compile(r"REF:\s*([A-Z]{2}-[A-Z]{3}-\d+)")
+_ROW_RE = re.compile(r"^\|\s*([^|]+?)\s*\|\s*([^|]*?)\s*\|\s*$")
+_NUMBER_RE = re.compile(r"\d[\d,\.]*")
+
+
+def _to_number(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    m = _NUMBER_RE.search(value)
+    if not m:
+        return None
+    try:
+        return float(m.group(0).replace(",", ""))
+    except ValueError:
+        return None
+
+
+@dataclass
+class ListingFacts:
+    """
+    Structured facts about one listing. Missing fields stay `None`.
+    """
+
+    ref: Optional[str] = None
+    title: Optional[str] = None
+    district: Optional[str] = None
+    city: Optional[str] = None
+    price_eur: Optional[float] = None
+    area_sqm: Optional[float] = None
+    bedrooms: Optional[int] = None
+    floor: Optional[str] = None
+    year_built: Optional[str] = None
+    energy_class: Optional[str] = None
+    heating: Optional[str] = None
+    parking: Optional[str] = None
+    furnished: Optional[str] = None
+    metro: Optional[str] = None
+    summary: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def has_parking(self) -> bool:
+        return bool(self.parking) and not self.parking.lower().startswith(("none", "no "))
+
+    @property
+    def has_gas_heating(self) -> bool:
+        return bool(self.heating) and "gas" in self.heating.lower()
+
+
+def parse_summary_card(text: str) -> Dict[str, str]:
+    """
+    Return the "Summary Card" table as a {field: value} dict.
+    """
+    start = text.find("### Summary Card")
+    if start < 0:
+        return {}
+    card: Dict[str, str] = {}
+    for line in text[start:].splitlines():
+        m = _ROW_RE.match(line.strip())
+        if not m:
+            continue
+        key, value = m.group(1), m.group(2)
+        if key.lower() == "field" or set(key) <= {"-"}:
+            continue
+        card[key] = value
+    return card
+
+
+def parse_listing(text: str) -> ListingFacts:
+    """
+    Extract `ListingFacts` from the raw text of a listing document.
+    """
+    card = parse_summary_card(text)
+    facts = ListingFacts(summary=card)
+
+    ref_match = _REF_RE.search(text)
+    facts.ref = card.get("Reference ID") or (ref_match.group(1) if ref_match else None)
+
+    for line in text.splitlines():
+        if line.startswith("## "):
+            facts.title = line[3:].strip()
+            break
+
+    location = card.get("Location")
+    if location:
+        # "Lozenets, Sofia, Bulgaria" or "Sofia Center, Bulgaria"
+        parts = [p.strip() for p in location.split(",") if p.strip()]
+        if len(parts) > 1 and parts[-1].lower() == "bulgaria":
+            parts = parts[:-1]
+        if len(parts) >= 2:
+            facts.district, facts.city = parts[0], parts[1]
+        elif parts:
+            city, _, district = parts[0].partition(" ")
+            facts.city, facts.district = city, district or None
+
+    facts.price_eur = _to_number(card.get("Price"))
+    facts.area_sqm = _to_number(card.get("Total Area"))
+    bedrooms = _to_number(card.get("Bedrooms"))
+    facts.bedrooms = int(bedrooms) if bedrooms is not None else None
+    facts.floor = card.get("Floor / Total Floors")
+    facts.year_built = card.get("Year Built")
+    facts.energy_class = card.get("Energy Class")
+    facts.heating = card.get("Heating")
+    facts.parking = card.get("Parking")
+    facts.furnished = card.get("Furnished")
+    facts.metro = card.get("Metro Distance")
+    return facts
+
+
+def listing_digest(text: str) -> Optional[str]:
+    """
+    Compact prompt context for a listing: the title line and the Summary
+    Card as `Field: Value` lines. None if the listing has no Summary Card.
+    """
+    facts = parse_listing(text)
+    if not facts.summary:
+        return None
+    heading = " - ".join(part for part in (facts.ref, facts.title) if part)
+    lines = [heading] if heading else []
+    lines.extend(
+        f"{key}: {value}"
+        for key, value in facts.summary.items()
+        if key != "Reference ID" and value
+    )
+    return "\n".join(lines)
+
+
+def read_listings(directory_path: str) -> List[Tuple[str, str]]:
+    """
+    `(file name, text)` of every `.txt` listing in a directory, sorted by
+    file name.
+    """
+    listings: List[Tuple[str, str]] = []
+    for file_name in sorted(os.listdir(directory_path)):
+        if not file_name.lower().endswith(".txt"):
+            continue
+        with open(os.path.join(directory_path, file_name), "r", encoding="utf-8") as f:
+            listings.append((file_name, f.read()))
+    return listings
+
+
+def load_listings(directory_path: str) -> List[Tuple[str, ListingFacts]]:
+    """
+    Parse every `.txt` listing in a directory, sorted by file name.
+    """
+    return [(file_name, parse_listing(text)) for file_name, text in read_listings(directory_path)]
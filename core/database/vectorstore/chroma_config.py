@@ -0,0 +1,104 @@
+"""
+Chroma location / collection settings for the property store.
+
+Kept in a dependency-free module so entrypoints can read them without
+importing `chromadb` or the vectorization pipeline.
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+
+# Use raw string to avoid invalid escape sequences on Windows paths.
+# CHROMA_LOCATION can be overridden from the environment (e.g. in Docker).
+CHROMA_LOCATION = os.getenv(
+    "CHROMA_LOCATION",
+    r"D:\Codes\Projects\TelelinkAiProject\TelelinkAiProject\persist_gemini\properties",
+)
+CHROMA_COLLECTION_NAME = os.getenv("CHROMA_COLLECTION_NAME", "properties")
+
+
+@dataclass(frozen=True)
+class IndexConfig:
+    """
+    HNSW index settings applied when a collection is created.
+
+    - space: distance function ("cosine", "l2" or "ip").
+    - M: graph degree (Chroma's `max_neighbors`); higher = better recall,
+      more memory and slower inserts.
+    - construction_ef: candidate list size while building the graph.
+    - search_ef: candidate list size at query time; the main recall/latency
+      knob, and the only one that can be changed on an existing collection.
+
+    `None` leaves Chroma's default (l2 for `space`, which is what the
+    bundled store was built with). Settings of an existing collection are not
+    changed by `get_or_create`; the collection has to be rebuilt.
+    """
+
+    space: Optional[str] = None
+    M: Optional[int] = None
+    construction_ef: Optional[int] = None
+    search_ef: Optional[int] = None
+
+    def to_configuration(self) -> Dict[str, Any]:
+        """
+        The `configuration=` argument for Chroma's collection creation.
+        """
+        hnsw = {
+            "space": self.space,
+            "max_neighbors": self.M,
+            "ef_construction": self.construction_ef,
+            "ef_search": self.search_ef,
+        }
+        return {"hnsw": {k: v for k, v in hnsw.items() if v is not None}}
+
+    @classmethod
+    def from_settings(cls, hnsw: Dict[str, Any]) -> "IndexConfig":
+        """
+        The config matching an existing collection's HNSW settings
+        (`ChromaOperator.index_settings()`).
+        """
+        return cls(
+            space=hnsw.get("space"),
+            M=hnsw.get("max_neighbors"),
+            construction_ef=hnsw.get("ef_construction"),
+            search_ef=hnsw.get("ef_search"),
+        )
+
+
+def _env_int(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+CHROMA_INDEX_CONFIG = IndexConfig(
+    space=os.getenv("CHROMA_SPACE") or None,
+    M=_env_int("CHROMA_HNSW_M"),
+    construction_ef=_env_int("CHROMA_HNSW_CONSTRUCTION_EF"),
+    search_ef=_env_int("CHROMA_HNSW_SEARCH_EF"),
+)
+
+
+# Embedding size stored in the collection (Matryoshka truncation, e.g. 768 or
+# 1536); unset keeps the model's full 3072. Indexing and querying must agree,
+# so changing it requires re-vectorizing.
+EMBEDDING_DIM = _env_int("EMBEDDING_DIM")
+
+# Optional quantized sidecar (see `quantized_index.py`): "int8", "float16" or
+# unset to query Chroma directly.
+SIDECAR_DTYPE = os.getenv("CHROMA_SIDECAR_DTYPE") or None
+
+# Near-duplicate threshold (estimated Jaccard similarity of word shingles)
+# used at ingest; documents at or above it reuse their canonical document's
+# embedding. Set to 0 to disable.
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.85"))
+
+# Store listings in one collection per region (`<collection>_<region>`, the
+# region taken from the REF code, e.g. BG-SOF-001 -> `properties_sof`) and
+# route queries to the regions they name. Off by default.
+SHARD_BY_REGION = os.getenv("CHROMA_SHARD_BY_REGION", "").lower() in ("1", "true", "yes")
+
+# Retrieve ids / metadata / distances only and read listing texts on demand
+# from the memory-mapped document store written at ingest (`doc_store.py`).
+LAZY_TEXT = os.getenv("CHROMA_LAZY_TEXT", "").lower() in ("1", "true", "yes")
@@ -0,0 +1,221 @@
+"""
+Memory-mapped document store for lazy retrieval.
+
+Chroma returns the full listing text of every hit when `documents` are
+included, and each query then holds its own copy. The document store keeps
+the texts of a collection in one file, written at ingest next to the Chroma
+data, `<location>/docstore/<collection>.docs`:
+
+- a first line with the JSON index, `{"version": 1, "ids": {id: [offset, length]}}`
+- the UTF-8 texts, back to back (offsets count from the end of that line)
+
+The file is opened with `mmap` once per process (through the
+resource registry) and shared by every retriever and session. A retriever
+with `lazy_text=True` asks Chroma for ids, metadata and distances only;
+`RetrievedProperty.text` is decoded from the map the first time it is read,
+so hits that are never shown (answer-cache hits, collapsed duplicates) are
+never loaded.
+
+The file is replaced atomically (`os.replace`) when the collection is
+written again. Windows cannot replace or delete a file that is mapped, so a
+store that is already open closes its map first and, after a replace, maps
+the new file. Reads that race the swap wait for it and read the new map;
+after a delete the store is empty.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from core.resources.registry import get_registry
+
+DOCSTORE_DIR = "docstore"
+
+_open_stores: "weakref.WeakValueDictionary[str, DocumentStore]" = weakref.WeakValueDictionary()
+_open_lock = threading.Lock()
+
+
+def docstore_path(location: str, collection_name: str) -> str:
+    return os.path.join(location, DOCSTORE_DIR, f"{collection_name}.docs")
+
+
+class DocumentStore:
+    """
+    Read-only, memory-mapped view of a `.docs` file.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        # Held by writers while the file is unmapped and replaced.
+        self._lock = threading.Lock()
+        self._view: Tuple[Optional[mmap.mmap], int, Dict[str, List[int]]] = (None, 0, {})
+        self.reload()
+
+    def reload(self) -> None:
+        """
+        Map the current file.
+        """
+        with self._lock:
+            self._map()
+
+    def _map(self) -> None:
+        with open(self.path, "rb") as f:
+            header = f.readline()
+            index: Dict[str, List[int]] = json.loads(header)["ids"]
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # One tuple, so a reader never pairs a new index with an old map.
+        self._view = (data, len(header), index)
+
+    def _unmap(self) -> None:
+        data = self._view[0]
+        self._view = (None, 0, {})
+        if data is not None:
+            data.close()
+
+    def get(self, doc_id: str) -> Optional[str]:
+        view = self._view
+        if view[0] is None or view[0].closed:
+            # A writer is replacing the file: wait for the new map.
+            with self._lock:
+                view = self._view
+        try:
+            return self._read(view, doc_id)
+        except ValueError:
+            # The map was closed mid-read by a writer; read the new one.
+            with self._lock:
+                return self._read(self._view, doc_id)
+
+    @staticmethod
+    def _read(view: Tuple[Optional[mmap.mmap], int, Dict[str, List[int]]], doc_id: str) -> Optional[str]:
+        data, start, index = view
+        span = index.get(doc_id)
+        if span is None or data is None:
+            return None
+        offset, length = span
+        return data[start + offset : start + offset + length].decode("utf-8")
+
+    def get_many(self, doc_ids: Iterable[str]) -> List[Optional[str]]:
+        return [self.get(doc_id) for doc_id in doc_ids]
+
+    def __contains__(self, doc_id: object) -> bool:
+        return doc_id in self._view[2]
+
+    def __len__(self) -> int:
+        return len(self._view[2])
+
+    def close(self) -> None:
+        with self._lock:
+            self._unmap()
+
+
+@contextmanager
+def _unmapped(path: str) -> Iterator[Optional[DocumentStore]]:
+    """
+    Close the open store of `path` (if any) for the duration of the block,
+    so the file can be replaced or removed. Readers wait until it ends.
+    """
+    with _open_lock:
+        store = _open_stores.get(os.path.abspath(path))
+    if store is None:
+        yield None
+        return
+    with store._lock:
+        store._unmap()
+        try:
+            yield store
+        finally:
+            # The new file after a replace, or the old one if it failed.
+            if os.path.exists(path):
+                store._map()
+
+
+# ----------------------------------------------------------------------
+# Writing
+# ----------------------------------------------------------------------
+
+
+def _read_all(path: str) -> Dict[str, str]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "rb") as f:
+        index = json.loads(f.readline())["ids"]
+        blob = f.read()
+    return {
+        doc_id: blob[offset : offset + length].decode("utf-8")
+        for doc_id, (offset, length) in index.items()
+    }
+
+
+def write_document_store(
+    location: str,
+    collection_name: str,
+    ids: List[str],
+    documents: List[str],
+    *,
+    replace: bool = False,
+) -> str:
+    """
+    Store `documents` under `ids` for `collection_name`, keeping the other
+    documents already stored there unless `replace`. Returns the path.
+    """
+    path = docstore_path(location, collection_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    texts = {} if replace else _read_all(path)
+    texts.update(zip(ids, documents))
+
+    index: Dict[str, List[int]] = {}
+    chunks: List[bytes] = []
+    offset = 0
+    for doc_id, text in texts.items():
+        raw = text.encode("utf-8")
+        chunks.append(raw)
+        index[doc_id] = [offset, len(raw)]
+        offset += len(raw)
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        # json.dumps escapes newlines, so the header is exactly one line.
+        f.write(json.dumps({"version": 1, "ids": index}).encode("utf-8") + b"\n")
+        f.writelines(chunks)
+    with _unmapped(path):
+        os.replace(tmp, path)
+    return path
+
+
+def delete_document_store(location: str, collection_name: str) -> None:
+    path = docstore_path(location, collection_name)
+    with _unmapped(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+# ----------------------------------------------------------------------
+# Process-wide handles
+# ----------------------------------------------------------------------
+
+
+def open_document_store(location: str, collection_name: str) -> Optional[DocumentStore]:
+    """
+    The shared store of `collection_name`, or None if it was never written
+    (collections vectorized before the store existed).
+    """
+    path = os.path.abspath(docstore_path(location, collection_name))
+    if not os.path.exists(path):
+        return None
+
+    def build() -> DocumentStore:
+        store = DocumentStore(path)
+        with _open_lock:
+            _open_stores[path] = store
+        return store
+
+    return get_registry().shared(f"docstore:{os.path.normcase(path)}", build)
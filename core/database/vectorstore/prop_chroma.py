@@ -3,11 +3,27 @@ This file's purpose is to define the ChromaDB vector store that will be used
 for the properties (and others if needed).
 """
 
-from typing import Any, Dict, Iterable, List, Optional
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from core.database.vectorstore.chroma_config import CHROMA_INDEX_CONFIG, IndexConfig
+from core.resources.registry import get_registry
 
-import chromadb
 # from sentence_transformers import SentenceTransformer  # Kept for future use
 
+if TYPE_CHECKING:
+    import chromadb
+
+
+def _persistent_client(path: str) -> "chromadb.Client":
+    # `chromadb` is imported on first use only; it is slow to import and
+    # entrypoints should not pay for it before they actually need the store.
+    import chromadb
+
+    return chromadb.PersistentClient(path=path)
+
 
 class ChromaOperator:
     """
@@ -15,8 +31,11 @@ class ChromaOperator:
 
     - `location` controls where ChromaDB persists data on disk.
     - `collection_name` is the name of the collection this operator manages.
-    - `client` can be provided from outside; if omitted, a PersistentClient
-      will be created automatically using `location`.
+    - `client` can be provided from outside; if omitted, the shared
+      PersistentClient for `location` is taken from the resource registry
+      (and the collection handle is cached there too).
+    - `index_config` sets the distance space and HNSW parameters used when
+      the collection is created (defaults to `CHROMA_INDEX_CONFIG`).
     """
 
     def __init__(
@@ -24,13 +43,15 @@ class ChromaOperator:
         location: str,
         collection_name: str,
         client: Optional[chromadb.Client] = None,
+        index_config: Optional[IndexConfig] = None,
     ) -> None:
         self.location = location
         self.collection_name = collection_name
-        self.client: chromadb.Client = client or chromadb.PersistentClient(
-            path=self.location
-        )
+        self.index_config = index_config or CHROMA_INDEX_CONFIG
+        self._shared = client is None
+        self.client: chromadb.Client = client or get_registry().chroma_client(self.location)
         self._collection: Optional[chromadb.Collection] = None
+        self._max_batch_size: Optional[int] = None
 
     # ------------------------------------------------------------------
     # Client / collection helpers
@@ -42,27 +63,40 @@ class ChromaOperator:
         Normally you don't need to call this explicitly, because the client
         is created in `__init__`, but it's here if you want to reset it.
         """
-        self.client = chromadb.PersistentClient(path=self.location)
+        self.client = _persistent_client(self.location)
+        self._shared = False
         # Reset cached collection because the underlying client changed.
         self._collection = None
+        self._max_batch_size = None
         return self.client
 
+    @property
+    def max_batch_size(self) -> int:
+        """
+        Largest number of records Chroma accepts in a single write.
+        """
+        if self._max_batch_size is None:
+            self._max_batch_size = self.client.get_max_batch_size()
+        return self._max_batch_size
+
     @property
     def collection(self) -> chromadb.Collection:
         """
         Lazily get or create the managed collection using self props.
         """
         if self._collection is None:
-            self._collection = self.client.get_or_create_collection(
-                name=self.collection_name
-            )
+            self._collection = self.get_or_create_collection()
         return self._collection
 
     def create_collection(self) -> chromadb.Collection:
         """
         Explicitly create a new collection and cache it on `self`.
         """
-        self._collection = self.client.create_collection(name=self.collection_name)
+        self._forget_shared()
+        self._collection = self.client.create_collection(
+            name=self.collection_name,
+            configuration=self.index_config.to_configuration(),
+        )
         return self._collection
 
     def get_collection(self) -> chromadb.Collection:
@@ -79,11 +113,32 @@ class ChromaOperator:
         """
         Get or create the collection and cache it on `self`.
         """
-        self._collection = self.client.get_or_create_collection(
-            name=self.collection_name
-        )
+        if self._shared:
+            self._collection = get_registry().chroma_collection(
+                self.location,
+                self.collection_name,
+                configuration=self.index_config.to_configuration(),
+            )
+        else:
+            self._collection = self.client.get_or_create_collection(
+                name=self.collection_name,
+                configuration=self.index_config.to_configuration(),
+            )
         return self._collection
 
+    def index_settings(self) -> Dict[str, Any]:
+        """
+        HNSW settings the collection actually uses (they may differ from
+        `index_config` if the collection existed before).
+        """
+        return dict(self.collection.configuration.get("hnsw") or {})
+
+    def set_search_ef(self, search_ef: int) -> None:
+        """
+        Change the query-time candidate list size of the existing collection.
+        """
+        self.collection.modify(configuration={"hnsw": {"ef_search": search_ef}})
+
     def list_collections(self) -> List[chromadb.Collection]:
         """
         List all collections known to this client.
@@ -95,15 +150,89 @@ class ChromaOperator:
         Delete this operator's collection (if it exists) and clear cache.
         """
         self.client.delete_collection(name=self.collection_name)
+        self._forget_shared()
         self._collection = None
 
+    def _forget_shared(self) -> None:
+        if self._shared:
+            get_registry().forget_collection(self.location, self.collection_name)
+
+    # ------------------------------------------------------------------
+    # Region shards
+    # ------------------------------------------------------------------
+
+    def sibling(
+        self,
+        collection_name: str,
+        index_config: Optional[IndexConfig] = None,
+    ) -> "ChromaOperator":
+        """
+        Operator for another collection on the same client and settings
+        (`index_config` overrides the settings it is created with).
+        """
+        return ChromaOperator(
+            self.location,
+            collection_name,
+            client=None if self._shared else self.client,
+            index_config=index_config or self.index_config,
+        )
+
+    def shard(self, region: str) -> "ChromaOperator":
+        """
+        Operator for the `region` shard of this collection
+        (`<collection_name>_<region>`).
+        """
+        from core.database.vectorstore.regions import shard_name
+
+        return self.sibling(shard_name(self.collection_name, region))
+
+    def shards(self) -> Dict[str, "ChromaOperator"]:
+        """
+        Existing region shards of this collection, by region code.
+        """
+        prefix = f"{self.collection_name}_"
+        found: Dict[str, ChromaOperator] = {}
+        for collection in self.list_collections():
+            name = getattr(collection, "name", collection)
+            region = name[len(prefix):]
+            if name.startswith(prefix) and region.isalpha():
+                found[region.upper()] = self.shard(region)
+        return dict(sorted(found.items()))
+
     # ------------------------------------------------------------------
     # Vector helpers
     # ------------------------------------------------------------------
 
+    def iter_vectors(
+        self,
+        page_size: int = 500,
+        include: Sequence[str] = ("documents", "embeddings", "metadatas"),
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the collection page by page (`limit`/`offset`), each page in
+        the shape of `collection.get(...)`. Only one page is held in memory
+        at a time; embeddings come back as a float32 NumPy matrix.
+        """
+        import numpy as np
+
+        collection = self.collection
+        offset = 0
+        while True:
+            page = collection.get(limit=page_size, offset=offset, include=list(include))
+            if not page["ids"]:
+                return
+            if page.get("embeddings") is not None:
+                page["embeddings"] = np.asarray(page["embeddings"], dtype=np.float32)
+            yield page
+            if len(page["ids"]) < page_size:
+                return
+            offset += len(page["ids"])
+
     def view_all_vectors(self) -> Dict[str, List[Any]]:
         """
         Return all documents, metadatas and embeddings in the collection.
+
+        Loads everything at once; use `iter_vectors` for large collections.
         """
         collection = self.collection
         results = collection.get(include=["documents", "embeddings", "metadatas"])
@@ -144,17 +273,49 @@ class ChromaOperator:
         documents: Optional[List[str]] = None,
         embeddings: Optional[List[List[float]]] = None,
         metadatas: Optional[List[Dict[str, Any]]] = None,
+        *,
+        batch_size: Optional[int] = None,
+        max_workers: int = 1,
     ) -> None:
         """
         Add or update vectors in the collection.
+
+        Inputs longer than `batch_size` (default: Chroma's max batch size)
+        are split into chunks. With `max_workers > 1` the chunks are
+        submitted from a thread pool; this pays off with a remote (HTTP)
+        Chroma server, while the embedded PersistentClient serializes writes.
         """
         collection = self.collection
-        collection.upsert(
-            ids=ids,
-            documents=documents,
-            embeddings=embeddings,
-            metadatas=metadatas,
-        )
+        limit = min(batch_size or self.max_batch_size, self.max_batch_size)
+        if len(ids) <= limit:
+            collection.upsert(
+                ids=ids,
+                documents=documents,
+                embeddings=embeddings,
+                metadatas=metadatas,
+            )
+            return
+
+        def chunk(values: Optional[Sequence[Any]], start: int) -> Optional[Sequence[Any]]:
+            return None if values is None else values[start:start + limit]
+
+        def upsert_chunk(start: int) -> None:
+            collection.upsert(
+                ids=ids[start:start + limit],
+                documents=chunk(documents, start),
+                embeddings=chunk(embeddings, start),
+                metadatas=chunk(metadatas, start),
+            )
+
+        starts = range(0, len(ids), limit)
+        if max_workers <= 1:
+            for start in starts:
+                upsert_chunk(start)
+            return
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="chroma-upsert") as pool:
+            # list() re-raises the first failed chunk.
+            list(pool.map(upsert_chunk, starts))
 
     def delete_vectors_by_id(self, ids: Iterable[str]) -> None:
         """
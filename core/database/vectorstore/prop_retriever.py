@@ -4,6 +4,23 @@ Retriever for property documents stored in Chroma.
 This module connects:
 - `Embedder` (to embed the user's query)
 - `ChromaOperator` (to query the persistent Chroma collection)
+- optionally a `QuantizedIndex` sidecar: candidates come from the compact
+  in-memory copy and are re-scored with the full vectors from Chroma
+
+With region `shards` (see `regions.py`), a router picks the shards a query
+needs: the regions pinned by the `where` filter, else the regions the query
+names (REF codes, place names), else all of them. Several shards are
+queried in parallel and their hits merged by distance.
+
+Near-duplicate listings (linked at ingest through `canonical_id` metadata)
+share one vector, so they would fill several of the top-N slots with the
+same property. Results are collapsed to one hit per duplicate group; the
+other members are listed in `RetrievedProperty.duplicates`.
+
+With `lazy_text=True`, Chroma returns ids, metadata and distances only, and
+`RetrievedProperty.text` is read on first access from the collection's
+memory-mapped document store (see `doc_store.py`). Hits the store does not
+hold get their text from Chroma instead.
 
 It is intended to be used by higher-level agents (e.g. the Must agent) as the
 R in a simple RAG pipeline.
@@ -11,23 +28,122 @@ R in a simple RAG pipeline.
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 from core.database.embedder import Embedder
+from core.database.vectorstore.chroma_config import EMBEDDING_DIM
+from core.database.vectorstore.doc_store import DocumentStore, open_document_store
 from core.database.vectorstore.prop_chroma import ChromaOperator
+from core.database.vectorstore.regions import regions_in, regions_in_where
+from core.telemetry.metrics import count, span
+
+if TYPE_CHECKING:
+    from core.database.vectorstore.quantized_index import QuantizedIndex
 
 
 @dataclass
 class RetrievedProperty:
-    text: str
     metadata: Dict[str, Any]
     score: Optional[float]
+    duplicates: List[str] = field(default_factory=list)
+    doc_id: Optional[str] = None
+    store: Optional[DocumentStore] = field(default=None, repr=False, compare=False)
+    # Lazy hits: None until `text` is first read from `store`. Left out of
+    # repr() and == so neither reads the store.
+    _text: Optional[str] = field(default=None, repr=False, compare=False)
+
+    def __init__(
+        self,
+        text: Optional[str],
+        metadata: Dict[str, Any],
+        score: Optional[float],
+        duplicates: Optional[List[str]] = None,
+        doc_id: Optional[str] = None,
+        store: Optional[DocumentStore] = None,
+    ) -> None:
+        """
+        `text` is the listing text, or None for a lazy hit that reads it
+        from `store` by `doc_id` on first access.
+        """
+        self._text = text
+        self.metadata = metadata
+        self.score = score
+        self.duplicates = list(duplicates or [])
+        self.doc_id = doc_id
+        self.store = store
+
+    @property
+    def text(self) -> str:
+        if self._text is None and self.store is not None and self.doc_id is not None:
+            self._text = self.store.get(self.doc_id)
+        return self._text or ""
+
+    @text.setter
+    def text(self, text: Optional[str]) -> None:
+        self._text = text
+
+    @property
+    def group_id(self) -> Optional[str]:
+        return self.metadata.get("canonical_id") or self.metadata.get("filename")
+
+    @property
+    def loaded(self) -> bool:
+        return self._text is not None
+
+    @property
+    def digest(self) -> Optional[str]:
+        """
+        The ingest-time digest (`listing_parser.listing_digest`), if stored.
+        """
+        return self.metadata.get("digest")
+
+
+def collapse_duplicates(items: List[RetrievedProperty], n_results: int) -> List[RetrievedProperty]:
+    """
+    Keep the best-ranked hit of each duplicate group, up to `n_results`.
+    """
+    kept: Dict[Any, RetrievedProperty] = {}
+    for item in items:
+        key = item.group_id
+        if key is None:
+            key = id(item)
+        if key in kept:
+            name = item.metadata.get("filename")
+            if name:
+                kept[key].duplicates.append(name)
+        elif len(kept) < n_results:
+            kept[key] = item
+    return list(kept.values())
+
+
+def _fill_missing_texts(
+    chroma: ChromaOperator, store: DocumentStore, items: List[RetrievedProperty]
+) -> None:
+    """
+    Load the texts of lazy hits that `store` does not hold (documents added
+    by `vectorize_file` to a collection indexed before the store existed,
+    or a partial write) from the documents stored in Chroma.
+    """
+    missing = [item for item in items if item.doc_id is not None and item.doc_id not in store]
+    if not missing:
+        return
+    count("telehelper_retriever_docstore_misses_total", len(missing))
+    found = chroma.collection.get(ids=[item.doc_id for item in missing], include=["documents"])
+    texts = dict(zip(found.get("ids") or [], found.get("documents") or []))
+    for item in missing:
+        item.text = texts.get(item.doc_id)
 
 
 class PropertyRetriever:
     """
     Thin wrapper around `Embedder` + `ChromaOperator` for property RAG.
+
+    `shards` maps region codes to the operators of a region-sharded
+    collection (`ChromaOperator.shards()`); when set, it replaces `chroma`
+    for queries. The sidecar only covers the unsharded collection and is not
+    used together with shards.
     """
 
     def __init__(
@@ -37,42 +153,214 @@ class PropertyRetriever:
         collection_name: str,
         embedder: Optional[Embedder] = None,
         chroma: Optional[ChromaOperator] = None,
+        sidecar: Optional[QuantizedIndex] = None,
+        oversample: int = 4,
+        collapse_duplicates: bool = True,
+        duplicate_overfetch: int = 2,
+        shards: Optional[Dict[str, ChromaOperator]] = None,
+        max_shard_workers: int = 8,
+        lazy_text: bool = False,
     ) -> None:
-        self.embedder = embedder or Embedder("gemini-embedding-001")
-        self.chroma = chroma or ChromaOperator(location=location, collection_name=collection_name)
+        self.embedder = embedder or Embedder(
+            "gemini-embedding-001", output_dimensionality=EMBEDDING_DIM
+        )
+        # The collection and its sidecar are read together from one tuple, so
+        # `swap()` replaces both at once for queries that start afterwards.
+        self._live: Tuple[ChromaOperator, Optional[QuantizedIndex]] = (
+            chroma or ChromaOperator(location=location, collection_name=collection_name),
+            sidecar,
+        )
+        self.oversample = oversample
+        self.collapse_duplicates = collapse_duplicates
+        self.duplicate_overfetch = max(1, duplicate_overfetch)
+        self.shards: Dict[str, ChromaOperator] = dict(shards or {})
+        self.max_shard_workers = max_shard_workers
+        self.lazy_text = lazy_text
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def chroma(self) -> ChromaOperator:
+        return self._live[0]
+
+    def close(self) -> None:
+        """
+        Stop the shard fan-out threads, if any were started.
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    @chroma.setter
+    def chroma(self, chroma: ChromaOperator) -> None:
+        self._live = (chroma, self._live[1])
+
+    @property
+    def sidecar(self) -> Optional[QuantizedIndex]:
+        return self._live[1]
+
+    @sidecar.setter
+    def sidecar(self, sidecar: Optional[QuantizedIndex]) -> None:
+        self._live = (self._live[0], sidecar)
+
+    def swap(
+        self,
+        chroma: ChromaOperator,
+        sidecar: Optional[QuantizedIndex] = None,
+    ) -> ChromaOperator:
+        """
+        Point new queries at `chroma` (and its sidecar) in one step; queries
+        already running finish on the previous collection. Returns it.
+        """
+        previous = self._live[0]
+        self._live = (chroma, sidecar)
+        return previous
 
-    def retrieve(self, query: str, n_results: int = 5) -> List[RetrievedProperty]:
+    def embed_query(self, query: str) -> Optional[Any]:
+        """
+        The query's (normalized) embedding, or None for an empty query.
+
+        Callers that need the vector themselves (e.g. the Must agent's answer
+        cache) embed once and pass it to `retrieve(query_vector=...)`.
+        """
+        query = (query or "").strip()
+        if not query:
+            return None
+        query_vectors = self.embedder.embed_texts([query])
+        if len(query_vectors) == 0:
+            return None
+        return query_vectors[0]
+
+    def embed_queries(self, queries: List[str]) -> Any:
+        """
+        Embeddings of many queries (one row each) from one `embed_texts`
+        call; keep batches within the API's limit (100 texts for Gemini).
+        """
+        queries = [(q or "").strip() for q in queries]
+        if not all(queries):
+            raise ValueError("queries must be non-empty strings")
+        with span("retriever.embed_queries"):
+            return self.embedder.embed_texts(queries)
+
+    def retrieve(
+        self,
+        query: str,
+        n_results: int = 5,
+        where: Optional[Dict[str, Any]] = None,
+        query_vector: Optional[Any] = None,
+    ) -> List[RetrievedProperty]:
         """
         Embed the query string and retrieve the top-N most similar properties.
+
+        `where` is a Chroma metadata filter (e.g. `{"region": "SOF"}`).
+        `query_vector` skips embedding when the caller already has it (see
+        `embed_query`).
+        """
+        with span("retriever.retrieve"):
+            if not self.collapse_duplicates:
+                return self._retrieve(query, n_results, where, query_vector)
+            # Fetch extra hits so collapsing groups still leaves N results.
+            hits = self._retrieve(
+                query, n_results * self.duplicate_overfetch, where, query_vector
+            )
+            return collapse_duplicates(hits, n_results)
+
+    def route(self, query: str, where: Optional[Dict[str, Any]] = None) -> Dict[str, ChromaOperator]:
         """
+        Shards to search for `query`: the regions pinned by `where` (only
+        those, even if none exist), else the existing regions named in the
+        query, else every shard.
+        """
+        pinned = regions_in_where(where)
+        if pinned:
+            return {r: self.shards[r] for r in pinned if r in self.shards}
+        named = {r: self.shards[r] for r in regions_in(query) if r in self.shards}
+        return named or dict(self.shards)
+
+    def _retrieve(
+        self,
+        query: str,
+        n_results: int,
+        where: Optional[Dict[str, Any]] = None,
+        query_vector: Optional[Any] = None,
+    ) -> List[RetrievedProperty]:
         query = (query or "").strip()
         if not query:
             return []
 
-        query_vectors = self.embedder.embed_texts([query])
-        if not query_vectors:
+        if query_vector is None:
+            query_vector = self.embed_query(query)
+            if query_vector is None:
+                return []
+        query_vectors = [query_vector]
+
+        if self.shards:
+            return self._retrieve_from_shards(query, query_vectors, n_results, where)
+
+        chroma, sidecar = self._live
+        if sidecar is not None and where is None:
+            return self._retrieve_with_sidecar(chroma, sidecar, query_vectors[0], n_results)
+
+        return self._query_collection(chroma, query_vectors, n_results, where)
+
+    def _retrieve_from_shards(
+        self,
+        query: str,
+        query_vectors: Any,
+        n_results: int,
+        where: Optional[Dict[str, Any]],
+    ) -> List[RetrievedProperty]:
+        targets = list(self.route(query, where).values())
+        count("telehelper_retriever_shard_queries_total", len(targets))
+        if not targets:
             return []
+        if len(targets) == 1:
+            return self._query_collection(targets[0], query_vectors, n_results, where)
 
-        collection = self.chroma.collection
-        results = collection.query(
-            query_embeddings=query_vectors,
-            n_results=n_results,
-            include=["documents", "metadatas", "distances"],
-        )
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_shard_workers, thread_name_prefix="shard-query"
+            )
+        with span("retriever.fan_out"):
+            futures = [
+                self._pool.submit(self._query_collection, shard, query_vectors, n_results, where)
+                for shard in targets
+            ]
+            merged = [item for future in futures for item in future.result()]
+        merged.sort(key=lambda item: float("inf") if item.score is None else item.score)
+        return merged[:n_results]
 
-        docs_lists = results.get("documents", [])
-        metas_lists = results.get("metadatas", [])
-        dists_lists = results.get("distances", [])
+    def _query_collection(
+        self,
+        chroma: ChromaOperator,
+        query_vectors: Any,
+        n_results: int,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> List[RetrievedProperty]:
+        collection = chroma.collection
+        store = self._store_for(chroma)
+        include = ["metadatas", "distances"] if store else ["documents", "metadatas", "distances"]
+        with span("retriever.chroma_query"):
+            results = collection.query(
+                query_embeddings=query_vectors,
+                n_results=n_results,
+                where=where,
+                include=include,
+            )
 
-        if not docs_lists:
+        ids_lists = results.get("ids") or []
+        if not ids_lists:
             return []
 
-        docs = docs_lists[0]
-        metas = metas_lists[0] if metas_lists else [{} for _ in docs]
-        dists = dists_lists[0] if dists_lists else [None for _ in docs]
+        ids = ids_lists[0]
+        docs_lists = results.get("documents") or []
+        metas_lists = results.get("metadatas") or []
+        dists_lists = results.get("distances") or []
+        docs = docs_lists[0] if docs_lists else [None for _ in ids]
+        metas = metas_lists[0] if metas_lists else [{} for _ in ids]
+        dists = dists_lists[0] if dists_lists else [None for _ in ids]
 
         retrieved: List[RetrievedProperty] = []
-        for text, meta, dist in zip(docs, metas, dists):
+        for doc_id, text, meta, dist in zip(ids, docs, metas, dists):
             score: Optional[float]
             try:
                 score = float(dist) if dist is not None else None
@@ -84,8 +372,58 @@ class PropertyRetriever:
                     text=text,
                     metadata=meta or {},
                     score=score,
+                    doc_id=doc_id,
+                    store=store,
                 )
             )
 
+        if store is not None:
+            _fill_missing_texts(chroma, store, retrieved)
         return retrieved
 
+    def _store_for(self, chroma: ChromaOperator) -> Optional[DocumentStore]:
+        """
+        The document store to read texts from lazily, or None to have Chroma
+        return them (lazy mode off, or no store written for the collection).
+        """
+        if not self.lazy_text:
+            return None
+        return open_document_store(chroma.location, chroma.collection_name)
+
+    def _retrieve_with_sidecar(
+        self,
+        chroma: ChromaOperator,
+        sidecar: QuantizedIndex,
+        query_vector: Any,
+        n_results: int,
+    ) -> List[RetrievedProperty]:
+        from core.database.vectorstore.quantized_index import rescore
+
+        with span("retriever.sidecar_search"):
+            candidate_ids = sidecar.candidates(query_vector, n_results, self.oversample)
+        if not candidate_ids:
+            return []
+
+        store = self._store_for(chroma)
+        include = ["metadatas", "embeddings"] if store else ["documents", "metadatas", "embeddings"]
+        with span("retriever.rescore"):
+            found = chroma.collection.get(ids=candidate_ids, include=include)
+            # Chroma's default space is l2; score like a plain query would.
+            space = chroma.index_settings().get("space") or "l2"
+            best = rescore(query_vector, found["ids"], found["embeddings"], n_results, space)
+
+        docs = found.get("documents") or []
+        metas = found.get("metadatas") or []
+        retrieved = [
+            RetrievedProperty(
+                text=docs[i] if docs else None,
+                metadata=(metas[i] if i < len(metas) else None) or {},
+                score=distance,
+                doc_id=found["ids"][i],
+                store=store,
+            )
+            for i, distance in best
+        ]
+        if store is not None:
+            _fill_missing_texts(chroma, store, retrieved)
+        return retrieved
@@ -4,30 +4,73 @@ Vectorization of the property documents is done in this file.
 The documents are plain `.txt` files. We simply:
 
 - read the raw text from each file,
+- group near-duplicate texts (re-posted listings) so each group is
+  embedded once; duplicates reuse the canonical document's vector and carry
+  its id in `canonical_id` metadata,
 - get an embedding vector for that text via `Embedder`,
-- store it in Chroma via `ChromaOperator`.
+- store it in Chroma via `ChromaOperator`: in one collection, or with
+  `shard_by_region` in one collection per region of the listing's REF code
+  (see `regions.py`); every document carries its `region` in metadata,
+- write the texts to the collection's memory-mapped document store too
+  (`doc_store.py`), for retrievers that load texts lazily,
+- store a compact digest of each listing (`listing_parser.listing_digest`)
+  in its `digest` metadata, which the agents send instead of the full text.
 
 You can test Chroma persistence with either a single file or an entire
-directory of property files.
+directory of property files. The command line can also export the
+collection to a snapshot and import it again without embedding calls
+(see `snapshot.py`).
 """
 
 import argparse
+import hashlib
 import os
-from typing import List
+from typing import Any, Dict, List, Optional
 
+import numpy as np
+
+from core.database.dedup import DuplicateGroups, find_near_duplicates
 from core.database.embedder import Embedder
+from core.database.listing_parser import listing_digest
+from core.database.vectorstore.chroma_config import (
+    CHROMA_COLLECTION_NAME,
+    CHROMA_LOCATION,
+    DEDUP_THRESHOLD,
+    EMBEDDING_DIM,
+    SHARD_BY_REGION,
+)
+from core.database.vectorstore.doc_store import write_document_store
 from core.database.vectorstore.prop_chroma import ChromaOperator
+from core.database.vectorstore.regions import region_of
+from core.database.vectorstore.watcher import read_live_collection
+from core.telemetry.profiling import add_profile_arguments, configure_from_args, profile
 
 
-# Use raw string to avoid invalid escape sequences on Windows paths
-CHROMA_LOCATION = r"D:\Codes\Projects\TelelinkAiProject\TelelinkAiProject\persist_gemini\properties"
-CHROMA_COLLECTION_NAME = "properties"
+def live_chroma() -> ChromaOperator:
+    """
+    The collection the Must agent reads: the generation recorded by the
+    watcher (`read_live_collection`), or `CHROMA_COLLECTION_NAME`.
+    """
+    return ChromaOperator(
+        location=CHROMA_LOCATION,
+        collection_name=read_live_collection(CHROMA_LOCATION, CHROMA_COLLECTION_NAME),
+    )
 
 
-def vectorize_file(file_path: str) -> None:
+def vectorize_file(
+    file_path: str,
+    *,
+    embedder: Optional[Embedder] = None,
+    chroma: Optional[ChromaOperator] = None,
+    shard_by_region: bool = SHARD_BY_REGION,
+) -> None:
     """
     Read a single .txt file as raw text, embed it, and upsert into Chroma.
     One Chroma document = one file.
+
+    `embedder` / `chroma` can be injected (e.g. by benchmarks); by default
+    they are built from the module constants, and `chroma` is the live
+    collection (`live_chroma`).
     """
     with open(file_path, "r", encoding="utf-8") as f:
         text = f.read()
@@ -35,48 +78,55 @@ def vectorize_file(file_path: str) -> None:
     if not text.strip():
         return
 
-    embedder = Embedder("gemini-embedding-001")
-    chroma = ChromaOperator(
-        location=CHROMA_LOCATION,
-        collection_name=CHROMA_COLLECTION_NAME,
-    )
+    embedder = embedder or Embedder("gemini-embedding-001", output_dimensionality=EMBEDDING_DIM)
+    chroma = chroma or live_chroma()
 
     file_id = os.path.basename(file_path)
     ids: List[str] = [file_id]
     documents: List[str] = [text]
-    metadatas: List[dict] = [
-        {
-            "source": file_path,
-            "filename": file_id,
-        }
-    ]
+    metadatas: List[dict] = [_metadata(file_path, file_id, text)]
 
     embeddings = embedder.embed_texts(documents)
 
-    chroma.upsert_vectors(
-        ids=ids,
-        documents=documents,
-        embeddings=embeddings,
-        metadatas=metadatas,
-    )
+    _upsert(chroma, ids, documents, embeddings, metadatas, shard_by_region)
 
 
-def vectorize_directory(directory_path: str) -> None:
+def vectorize_directory(
+    directory_path: str,
+    *,
+    embedder: Optional[Embedder] = None,
+    chroma: Optional[ChromaOperator] = None,
+    dedup_threshold: Optional[float] = DEDUP_THRESHOLD,
+    shard_by_region: bool = SHARD_BY_REGION,
+    reuse_from: Optional[ChromaOperator] = None,
+) -> int:
     """
     Read all `.txt` files in a directory, embed each whole file, and upsert
-    them into Chroma. One Chroma document per file.
+    them into Chroma. One Chroma document per file. Returns the number of
+    texts sent to the embedder.
+
+    Files whose text is a near-duplicate (MinHash similarity >=
+    `dedup_threshold`) of an earlier file are not embedded; they are stored
+    with the earlier file's vector and `canonical_id`. `None` or 0 disables
+    the check. Duplicates are only detected within this directory.
+
+    With `shard_by_region` each document goes to its region's shard
+    (`chroma.shard(region)`) instead of `chroma`'s own collection.
+
+    `reuse_from` is an existing (unsharded) collection: files whose id and
+    `content_hash` match a document there (or whose text matches the stored
+    document, for collections indexed before `content_hash` existed) take
+    its vector instead of being embedded again (used to rebuild a
+    collection after a few files change).
     """
-    embedder = Embedder("gemini-embedding-001")
-    chroma = ChromaOperator(
-        location=CHROMA_LOCATION,
-        collection_name=CHROMA_COLLECTION_NAME,
-    )
+    embedder = embedder or Embedder("gemini-embedding-001", output_dimensionality=EMBEDDING_DIM)
+    chroma = chroma or live_chroma()
 
     ids: List[str] = []
     documents: List[str] = []
     metadatas: List[dict] = []
 
-    for file_name in os.listdir(directory_path):
+    for file_name in sorted(os.listdir(directory_path)):
         if not file_name.lower().endswith(".txt"):
             continue
         full_path = os.path.join(directory_path, file_name)
@@ -89,47 +139,194 @@ def vectorize_directory(directory_path: str) -> None:
 
         ids.append(file_name)
         documents.append(text)
-        metadatas.append(
-            {
-                "source": full_path,
-                "filename": file_name,
-            }
-        )
+        metadatas.append(_metadata(full_path, file_name, text))
 
     if not documents:
-        return
+        return 0
 
-    embeddings = embedder.embed_texts(documents)
+    if dedup_threshold:
+        groups = find_near_duplicates(documents, threshold=dedup_threshold)
+    else:
+        groups = DuplicateGroups(canonical=list(range(len(documents))))
 
-    chroma.upsert_vectors(
-        ids=ids,
-        documents=documents,
-        embeddings=embeddings,
-        metadatas=metadatas,
+    canonical = groups.canonical_indices
+    reused = (
+        _reusable_vectors(reuse_from, [metadatas[i] for i in canonical])
+        if reuse_from is not None
+        else {}
     )
+    to_embed = [i for i in canonical if ids[i] not in reused]
+    fresh = embedder.embed_texts([documents[i] for i in to_embed]) if to_embed else None
+    if not reused:
+        canonical_vectors = fresh
+    else:
+        dim = len(next(iter(reused.values())))
+        canonical_vectors = np.empty((len(canonical), dim), dtype=np.float32)
+        fresh_row = {doc_index: row for row, doc_index in enumerate(to_embed)}
+        for row, doc_index in enumerate(canonical):
+            if doc_index in fresh_row:
+                canonical_vectors[row] = fresh[fresh_row[doc_index]]
+            else:
+                canonical_vectors[row] = reused[ids[doc_index]]
+    row_of = {doc_index: row for row, doc_index in enumerate(canonical)}
+    embeddings = canonical_vectors[[row_of[c] for c in groups.canonical]]
+
+    for i, c in enumerate(groups.canonical):
+        if c != i:
+            metadatas[i]["canonical_id"] = ids[c]
+            metadatas[i]["duplicate_similarity"] = groups.similarity[i]
+    if groups.duplicate_count:
+        print(
+            f"[Vectorization] {groups.duplicate_count} near-duplicate file(s) "
+            f"linked to a canonical document instead of being embedded."
+        )
+
+    _upsert(chroma, ids, documents, embeddings, metadatas, shard_by_region)
+    return len(to_embed)
+
+
+def _metadata(path: str, file_name: str, text: str) -> dict:
+    meta = {
+        "source": path,
+        "filename": file_name,
+        "canonical_id": file_name,
+        "region": region_of(text),
+        "content_hash": content_hash(text),
+    }
+    digest = listing_digest(text)
+    if digest is not None:
+        # Chroma metadata values cannot be None.
+        meta["digest"] = digest
+    return meta
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _reusable_vectors(chroma: ChromaOperator, metadatas: List[dict]) -> Dict[str, Any]:
+    """
+    Vectors in `chroma` for documents whose stored `content_hash` matches,
+    or, for rows stored without one, whose stored text hashes the same.
+    """
+    wanted = {meta["filename"]: meta["content_hash"] for meta in metadatas}
+    found = chroma.collection.get(
+        ids=list(wanted), include=["embeddings", "metadatas", "documents"]
+    )
+    reusable: Dict[str, Any] = {}
+    for doc_id, vector, meta, document in zip(
+        found["ids"], found["embeddings"], found["metadatas"], found["documents"]
+    ):
+        stored = (meta or {}).get("content_hash")
+        if stored is None and document:
+            stored = content_hash(document)
+        if stored == wanted.get(doc_id):
+            reusable[doc_id] = vector
+    return reusable
+
+
+def _upsert(
+    chroma: ChromaOperator,
+    ids: List[str],
+    documents: List[str],
+    embeddings: Any,
+    metadatas: List[dict],
+    shard_by_region: bool,
+) -> None:
+    if not shard_by_region:
+        chroma.upsert_vectors(ids=ids, documents=documents, embeddings=embeddings, metadatas=metadatas)
+        write_document_store(chroma.location, chroma.collection_name, ids, documents)
+        return
+
+    rows_by_region: Dict[str, List[int]] = {}
+    for row, meta in enumerate(metadatas):
+        rows_by_region.setdefault(meta["region"], []).append(row)
+    for region, rows in rows_by_region.items():
+        shard = chroma.shard(region)
+        shard_ids = [ids[r] for r in rows]
+        shard_documents = [documents[r] for r in rows]
+        shard.upsert_vectors(
+            ids=shard_ids,
+            documents=shard_documents,
+            embeddings=embeddings[rows],
+            metadatas=[metadatas[r] for r in rows],
+        )
+        write_document_store(shard.location, shard.collection_name, shard_ids, shard_documents)
+    print(f"[Vectorization] {len(ids)} document(s) written to {len(rows_by_region)} region shard(s).")
+
+
+# documents/properties at the project root.
+DEFAULT_PROPERTIES_DIR = os.path.normpath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "documents", "properties"
+))
 
 
 def main() -> None:
     """
-    Simple entrypoint to test Chroma persistence.
+    Build or move the live property collection at `CHROMA_LOCATION`.
 
-    For now this is hard-wired to:
-    - create/get the `properties` collection
-    - vectorize a single test file (p1.txt)
+    - `vectorize [DIR]`: embed every `.txt` file in DIR (default
+      `documents/properties`) and upsert it (the default command)
+    - `export PATH`: write the collection to a snapshot file (`snapshot.py`)
+    - `import PATH`: rebuild the collection from a snapshot, no embedding calls
     """
-    co = ChromaOperator(CHROMA_LOCATION, CHROMA_COLLECTION_NAME)
-    co.client_create()  # safe even if already created
-    co.get_or_create_collection()
+    parser = argparse.ArgumentParser(description=main.__doc__.split("\n\n")[0].strip())
+    commands = parser.add_subparsers(dest="command")
+
+    vectorize = commands.add_parser("vectorize", help="embed property files into Chroma")
+    vectorize.add_argument("directory", nargs="?", default=DEFAULT_PROPERTIES_DIR)
+    vectorize.add_argument(
+        "--shard-by-region",
+        action="store_true",
+        default=SHARD_BY_REGION,
+        help="one collection per REF region (default: CHROMA_SHARD_BY_REGION)",
+    )
 
-    # file_path = r"D:\Codes\Projects\TelelinkAiProject\TelelinkAiProject\documents\properties\p1.txt"
-    file_path =r""
-    dir_path=r"D:\Codes\Projects\TelelinkAiProject\TelelinkAiProject\documents\properties"
+    export = commands.add_parser("export", help="write the collection to a .npz snapshot")
+    export.add_argument("path")
+    export.add_argument("--compress", action="store_true", help="zip the arrays")
+    export.add_argument("--page-size", type=int, default=1000)
 
-    # vectorize_file(file_path)
-    vectorize_directory(dir_path)
+    restore = commands.add_parser("import", help="restore the collection from a snapshot")
+    restore.add_argument("path")
+    restore.add_argument(
+        "--keep-existing",
+        action="store_true",
+        help="upsert into the existing collection instead of replacing it",
+    )
+
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    configure_from_args(args)
+    with profile(f"prop_vectorization.{args.command or 'vectorize'}"):
+        _run_command(args)
+
+
+def _run_command(args: argparse.Namespace) -> None:
+    co = live_chroma()
+
+    if args.command == "export":
+        from core.database.vectorstore.snapshot import export_snapshot
+
+        info = export_snapshot(co, args.path, page_size=args.page_size, compress=args.compress)
+        print(f"[Snapshot] Exported {info.count} vectors (dim {info.dim}) to {info.path} in {info.seconds:.2f}s")
+        return
+    if args.command == "import":
+        from core.database.vectorstore.snapshot import import_snapshot
+
+        info = import_snapshot(co, args.path, replace=not args.keep_existing)
+        print(f"[Snapshot] Imported {info.count} vectors (dim {info.dim}) from {info.path} in {info.seconds:.2f}s")
+        return
+
+    co.get_or_create_collection()
+    vectorize_directory(
+        getattr(args, "directory", DEFAULT_PROPERTIES_DIR),
+        chroma=co,
+        shard_by_region=getattr(args, "shard_by_region", SHARD_BY_REGION),
+    )
 
 
 if __name__ == "__main__":
     main()
     # To RUN:
-    # python -m core.database.vectorstore.prop_vectorization
+    # python -m core.database.vectorstore.prop_vectorization [vectorize [DIR] | export PATH | import PATH]
@@ -0,0 +1,199 @@
+"""
+Quantized in-memory sidecar index for property embeddings.
+
+Chroma keeps the full float32 vectors on disk and in its HNSW index. The
+sidecar keeps a compact copy of every vector in memory:
+
+- "float16": half precision, 2x smaller than float32
+- "int8": symmetric per-vector scalar quantization (one float32 scale per
+  row), 4x smaller than float32
+
+Both trade some scoring speed for memory: the codes are widened to float32
+block by block before the BLAS product. int8 is about 2x slower to scan than
+float32; float16 is much slower (NumPy has no fast half-precision path), so
+prefer int8 unless exact half-precision storage is needed.
+
+A query is scored against the compact copy by brute force, which returns
+`k * oversample` candidates; those are then re-scored exactly with their
+full-precision vectors (fetched from Chroma together with the documents),
+so quantization error only affects which candidates are considered.
+
+Vectors are expected to be unit length (as produced by `Embedder`), so the
+dot product ranks candidates the same way in every distance space. The exact
+re-score returns distances in the collection's own space (`rescore(...,
+space=)`: cosine, squared L2 or inner product, as Chroma computes them), so
+scores have the same scale with or without the sidecar.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from core.database.vectorstore.prop_chroma import ChromaOperator
+
+QUANTIZED_DTYPES = ("int8", "float16")
+
+# Elements converted back to float32 at a time while scoring; keeps the
+# temporary block small enough to stay in cache (~1 MB).
+_SCORE_BLOCK_ELEMENTS = 1 << 18
+
+
+class QuantizedIndex:
+    """
+    Compact copy of a collection's vectors with approximate top-k search.
+    """
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        codes: np.ndarray,
+        scales: Optional[np.ndarray] = None,
+    ) -> None:
+        if codes.dtype.name not in QUANTIZED_DTYPES:
+            raise ValueError(f"codes must be one of {QUANTIZED_DTYPES}, got {codes.dtype}")
+        if codes.dtype == np.int8 and scales is None:
+            raise ValueError("int8 codes need per-row scales")
+        if len(ids) != len(codes):
+            raise ValueError("ids and codes have different lengths")
+        self.ids: List[str] = list(ids)
+        self.codes = codes
+        self.scales = scales
+
+    # ------------------------------------------------------------------
+    # Construction / persistence
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def build(cls, ids: Sequence[str], vectors: Any, dtype: str = "int8") -> "QuantizedIndex":
+        """
+        Quantize `vectors` (one row per id).
+        """
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if dtype == "float16":
+            return cls(ids, matrix.astype(np.float16))
+        if dtype != "int8":
+            raise ValueError(f"dtype must be one of {QUANTIZED_DTYPES}, got {dtype!r}")
+
+        scales = np.abs(matrix).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+        return cls(ids, codes, scales.astype(np.float32))
+
+    @classmethod
+    def from_chroma(
+        cls,
+        chroma: "ChromaOperator",
+        dtype: str = "int8",
+        page_size: int = 1000,
+    ) -> "QuantizedIndex":
+        """
+        Build the sidecar from every vector in `chroma`'s collection, reading
+        it page by page.
+        """
+        ids: List[str] = []
+        pages: List[np.ndarray] = []
+        for page in chroma.iter_vectors(page_size, include=("embeddings",)):
+            ids.extend(page["ids"])
+            pages.append(page["embeddings"])
+        vectors = np.concatenate(pages) if pages else np.zeros((0, 0), dtype=np.float32)
+        return cls.build(ids, vectors, dtype)
+
+    def save(self, path: str) -> None:
+        arrays = {"ids": np.asarray(self.ids), "codes": self.codes}
+        if self.scales is not None:
+            arrays["scales"] = self.scales
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "QuantizedIndex":
+        with np.load(path, allow_pickle=False) as data:
+            scales = data["scales"] if "scales" in data.files else None
+            return cls([str(i) for i in data["ids"]], data["codes"], scales)
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    @property
+    def dtype(self) -> str:
+        return self.codes.dtype.name
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def scores(self, queries: np.ndarray) -> np.ndarray:
+        """
+        Approximate similarity of each query (rows) to every stored vector.
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries[None, :]
+        out = np.empty((len(queries), len(self.codes)), dtype=np.float32)
+        rows = max(1, _SCORE_BLOCK_ELEMENTS // max(1, self.codes.shape[1]))
+        for start in range(0, len(self.codes), rows):
+            block = self.codes[start:start + rows].astype(np.float32)
+            out[:, start:start + len(block)] = queries @ block.T
+        if self.scales is not None:
+            out *= self.scales
+        return out
+
+    def candidates(self, query: np.ndarray, k: int, oversample: int = 4) -> List[str]:
+        """
+        Ids of the `k * oversample` best approximate matches, best first.
+        """
+        scores = self.scores(query)[0]
+        n = min(len(scores), max(k, k * oversample))
+        if n == 0:
+            return []
+        top = np.argpartition(-scores, n - 1)[:n]
+        top = top[np.argsort(-scores[top])]
+        return [self.ids[i] for i in top]
+
+
+DISTANCE_SPACES = ("cosine", "l2", "ip")
+
+
+def distances(query: np.ndarray, vectors: Any, space: str = "cosine") -> np.ndarray:
+    """
+    Distances of `query` to each row of `vectors`, as Chroma computes them
+    in `space`: `1 - cosine similarity`, squared L2, or `1 - dot product`.
+    """
+    if space not in DISTANCE_SPACES:
+        raise ValueError(f"space must be one of {DISTANCE_SPACES}, got {space!r}")
+    matrix = np.asarray(vectors, dtype=np.float32)
+    query = np.asarray(query, dtype=np.float32).reshape(-1)
+    dots = matrix @ query
+    if space == "ip":
+        return 1.0 - dots
+    if space == "l2":
+        return np.maximum(0.0, (matrix * matrix).sum(axis=1) - 2.0 * dots + query @ query)
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+    norms[norms == 0] = 1.0
+    return 1.0 - dots / norms
+
+
+def rescore(
+    query: np.ndarray,
+    ids: Sequence[str],
+    vectors: Any,
+    k: int,
+    space: str = "cosine",
+) -> List[Tuple[int, float]]:
+    """
+    Exact distances (in the collection's `space`) of `query` to the
+    candidate `vectors`.
+
+    Returns `(position in ids, distance)` for the best `k`, closest first.
+    """
+    if len(ids) == 0:
+        return []
+    distances_ = distances(query, vectors, space)
+    order = np.argsort(distances_)[:k]
+    return [(int(i), float(distances_[i])) for i in order]
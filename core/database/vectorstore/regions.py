@@ -0,0 +1,99 @@
+"""
+Region codes for sharding the property collection.
+
+Listing REF codes look like `BG-SOF-001`: country, region, number. The
+region part (`SOF`) names the shard a listing is stored in when the
+collection is sharded by region (`<collection>_<region>`, e.g.
+`properties_sof`).
+
+- `region_of(text)`: region of the first REF code in a listing
+- `regions_in(text)`: regions a free-text query names, through REF codes
+  or place names (`REGION_NAMES`)
+- `regions_in_where(where)`: regions a metadata filter pins on `region`
+
+Sharding only pays off for a corpus that spans several regions. The bundled
+listings are all in Sofia (`BG-SOF-0xx`), so they end up in one
+`properties_sof` shard and every query goes to that shard. Districts (the
+"Location" field) are too fine-grained to shard by: most hold one listing.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+_REF_RE = re.compile(r"\b([A-Z]{2})-([A-Z]{3})-\d+\b")
+
+# Shard of listings without a REF code.
+UNKNOWN_REGION = "XXX"
+
+# Place names (lower case, English and Bulgarian) per region code.
+REGION_NAMES: Dict[str, Tuple[str, ...]] = {
+    "SOF": ("sofia", "софия"),
+    "PDV": ("plovdiv", "пловдив"),
+    "VAR": ("varna", "варна"),
+    "BGS": ("burgas", "bourgas", "бургас"),
+    "RSE": ("ruse", "rousse", "русе"),
+    "SZR": ("stara zagora", "стара загора"),
+    "PVN": ("pleven", "плевен"),
+    "BLG": ("blagoevgrad", "благоевград"),
+    "VTR": ("veliko tarnovo", "veliko turnovo", "велико търново"),
+    "BAN": ("bansko", "банско"),
+}
+
+_NAME_RE = re.compile(
+    r"\b("
+    + "|".join(re.escape(n) for names in REGION_NAMES.values() for n in names)
+    + r")\b",
+    re.IGNORECASE,
+)
+_CODE_OF_NAME = {n: code for code, names in REGION_NAMES.items() for n in names}
+
+
+def region_of(text: str) -> str:
+    """
+    Region code of the first REF code in `text`, or `UNKNOWN_REGION`.
+    """
+    match = _REF_RE.search(text or "")
+    return match.group(2) if match else UNKNOWN_REGION
+
+
+def regions_in(text: str) -> List[str]:
+    """
+    Region codes named in a query, in order of first mention.
+    """
+    found: List[str] = []
+    for match in _REF_RE.finditer(text or ""):
+        found.append(match.group(2))
+    for match in _NAME_RE.finditer(text or ""):
+        found.append(_CODE_OF_NAME[match.group(1).lower()])
+    return list(dict.fromkeys(found))
+
+
+def regions_in_where(where: Optional[Dict[str, Any]]) -> List[str]:
+    """
+    Region codes a Chroma `where` filter restricts `region` to
+    (`{"region": "SOF"}`, `{"region": {"$eq" | "$in": ...}}`, also inside a
+    top-level `$and`). Empty if the filter does not pin the region.
+    """
+    if not where:
+        return []
+    if "$and" in where:
+        for clause in where["$and"]:
+            found = regions_in_where(clause)
+            if found:
+                return found
+        return []
+    value = where.get("region")
+    if isinstance(value, str):
+        return [value.upper()]
+    if isinstance(value, dict):
+        if isinstance(value.get("$eq"), str):
+            return [value["$eq"].upper()]
+        if isinstance(value.get("$in"), list):
+            return [str(v).upper() for v in value["$in"]]
+    return []
+
+
+def shard_name(collection_name: str, region: str) -> str:
+    return f"{collection_name}_{region.lower()}"
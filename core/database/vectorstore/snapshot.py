@@ -0,0 +1,194 @@
+"""
+Snapshot export / import for a property collection.
+
+Re-vectorizing the corpus costs one embedding call per document. A snapshot
+stores what Chroma needs to rebuild the collection without any of them, in a
+single NumPy `.npz` bundle:
+
+- `ids`: unicode array
+- `embeddings`: float32 matrix, one row per id
+- `documents`: UTF-8 blob plus `document_offsets` (row `i` is
+  `blob[offsets[i]:offsets[i + 1]]`)
+- `metadatas`: one JSON array (UTF-8)
+- `manifest`: JSON with the format version, collection name, row count,
+  embedding dimension and the HNSW settings of the source collection
+
+The collection is read page by page (`ChromaOperator.iter_vectors`), and the
+import upserts in Chroma-sized batches, so neither side goes through
+`view_all_vectors`.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+import numpy as np
+
+from core.database.vectorstore.chroma_config import IndexConfig
+from core.database.vectorstore.doc_store import write_document_store
+
+if TYPE_CHECKING:
+    from core.database.vectorstore.prop_chroma import ChromaOperator
+
+SNAPSHOT_VERSION = 1
+
+
+class SnapshotError(RuntimeError):
+    """
+    The file is not a snapshot this version can read.
+    """
+
+
+@dataclass
+class SnapshotInfo:
+    path: str
+    count: int
+    dim: int
+    seconds: float
+
+
+# ----------------------------------------------------------------------
+# Export
+# ----------------------------------------------------------------------
+
+
+def export_snapshot(
+    chroma: "ChromaOperator",
+    path: str,
+    *,
+    page_size: int = 1000,
+    compress: bool = False,
+) -> SnapshotInfo:
+    """
+    Write every id, embedding, document and metadata of `chroma`'s collection
+    to `path` (`.npz`). `compress=True` zips the arrays (smaller file, slower
+    export and import).
+    """
+    started = time.perf_counter()
+    total = chroma.collection.count()
+
+    ids: List[str] = []
+    embeddings: Optional[np.ndarray] = None
+    documents = bytearray()
+    offsets = np.zeros(total + 1, dtype=np.uint64)
+    metadatas: List[Any] = []
+
+    row = 0
+    for page in chroma.iter_vectors(page_size):
+        vectors = page["embeddings"]
+        if embeddings is None:
+            embeddings = np.empty((total, vectors.shape[1]), dtype=np.float32)
+        # Rows added while exporting would overflow the preallocated arrays.
+        n = min(len(page["ids"]), total - row)
+        embeddings[row:row + n] = vectors[:n]
+        for doc in page["documents"][:n]:
+            documents += (doc or "").encode("utf-8")
+            row += 1
+            offsets[row] = len(documents)
+        ids.extend(page["ids"][:n])
+        metadatas.extend(page["metadatas"][:n])
+        if row >= total:
+            break
+
+    if embeddings is None:
+        embeddings = np.zeros((0, 0), dtype=np.float32)
+    # Rows deleted while exporting leave the arrays shorter than `total`.
+    embeddings = embeddings[:row]
+    offsets = offsets[:row + 1]
+
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "collection": chroma.collection_name,
+        "count": row,
+        "dim": int(embeddings.shape[1]),
+        "hnsw": chroma.index_settings(),
+        "created_at": time.time(),
+    }
+
+    save = np.savez_compressed if compress else np.savez
+    save(
+        path,
+        ids=np.asarray(ids, dtype=str),
+        embeddings=embeddings,
+        documents=np.frombuffer(bytes(documents), dtype=np.uint8),
+        document_offsets=offsets,
+        metadatas=np.frombuffer(json.dumps(metadatas).encode("utf-8"), dtype=np.uint8),
+        manifest=np.frombuffer(json.dumps(manifest).encode("utf-8"), dtype=np.uint8),
+    )
+    return SnapshotInfo(path, row, manifest["dim"], time.perf_counter() - started)
+
+
+# ----------------------------------------------------------------------
+# Import
+# ----------------------------------------------------------------------
+
+
+def read_manifest(path: str) -> Dict[str, Any]:
+    with np.load(path, allow_pickle=False) as data:
+        if "manifest" not in data.files:
+            raise SnapshotError(f"{path} is not a collection snapshot")
+        manifest = json.loads(data["manifest"].tobytes().decode("utf-8"))
+    if manifest.get("version") != SNAPSHOT_VERSION:
+        raise SnapshotError(
+            f"unsupported snapshot version {manifest.get('version')} "
+            f"(expected {SNAPSHOT_VERSION})"
+        )
+    return manifest
+
+
+def import_snapshot(
+    chroma: "ChromaOperator",
+    path: str,
+    *,
+    replace: bool = True,
+    use_snapshot_index: bool = True,
+    batch_size: Optional[int] = None,
+) -> SnapshotInfo:
+    """
+    Restore a snapshot into `chroma`'s collection without embedding calls.
+
+    With `replace=True` an existing collection of the same name is dropped
+    first; otherwise the rows are upserted into it. `use_snapshot_index`
+    creates the new collection with the source collection's HNSW settings
+    instead of `chroma.index_config`. The collection's document store is
+    written as well.
+    """
+    started = time.perf_counter()
+    manifest = read_manifest(path)
+
+    with np.load(path, allow_pickle=False) as data:
+        ids = [str(i) for i in data["ids"]]
+        embeddings = data["embeddings"]
+        blob = data["documents"].tobytes()
+        offsets = data["document_offsets"]
+        metadatas = json.loads(data["metadatas"].tobytes().decode("utf-8"))
+
+    documents = [
+        blob[int(offsets[i]):int(offsets[i + 1])].decode("utf-8") for i in range(len(ids))
+    ]
+
+    if use_snapshot_index and manifest.get("hnsw"):
+        chroma.index_config = IndexConfig.from_settings(manifest["hnsw"])
+    if replace:
+        try:
+            chroma.delete_collection()
+        except Exception:
+            # Nothing to replace.
+            pass
+        chroma.client_create()
+    else:
+        chroma.get_or_create_collection()
+
+    if ids:
+        chroma.upsert_vectors(
+            ids=ids,
+            documents=documents,
+            embeddings=embeddings,
+            metadatas=metadatas,
+            batch_size=batch_size,
+        )
+    write_document_store(chroma.location, chroma.collection_name, ids, documents, replace=replace)
+    return SnapshotInfo(path, len(ids), manifest["dim"], time.perf_counter() - started)
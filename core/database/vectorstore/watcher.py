@@ -0,0 +1,277 @@
+"""
+Live re-indexing of the property directory.
+
+`PropertyWatcher` polls `documents/properties` (mtime + size of every
+`.txt` file, confirmed by a content hash) from a background thread. When the
+set of files changes and then stays unchanged for one more poll (so files
+still being written are not picked up), it:
+
+- builds a new generation of the collection (`<name>-gen<N>`) next to the
+  live one, with the live collection's distance space and HNSW settings
+  (not `CHROMA_INDEX_CONFIG`, so scores keep their scale across swaps):
+  unchanged files take their vector from the live collection, only new or
+  edited files are embedded (`vectorize_directory(reuse_from=...)`)
+- rebuilds the quantized sidecar for it, if the retriever uses one
+- swaps the retriever to the new collection in one step
+  (`PropertyRetriever.swap`) and records its name in the `LIVE_COLLECTION`
+  file under the Chroma location, so a restart opens it too
+- drops generations older than the previous one, with their document
+  stores (the previous one stays for queries that were already running on it)
+
+Queries keep running against the live collection the whole time and never
+see a half-built one. A failed rebuild is logged, its collection deleted, and
+the live collection stays in place.
+
+Polling is used rather than inotify: it needs no extra dependency and works
+the same on Windows, Linux and mounted volumes; the directory is small.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Tuple
+
+from core.database.vectorstore.chroma_config import IndexConfig
+from core.database.vectorstore.doc_store import delete_document_store
+
+if TYPE_CHECKING:
+    from core.database.embedder import Embedder
+    from core.database.vectorstore.prop_retriever import PropertyRetriever
+
+LIVE_POINTER_FILE = "LIVE_COLLECTION"
+_GENERATION_RE = re.compile(r"^(?P<base>.+)-gen(?P<n>\d+)$")
+
+
+# ----------------------------------------------------------------------
+# Live collection pointer
+# ----------------------------------------------------------------------
+
+
+def read_live_collection(location: str, default: str) -> str:
+    """
+    Name of the collection the last re-index made live, or `default`.
+    """
+    try:
+        with open(os.path.join(location, LIVE_POINTER_FILE), "r", encoding="utf-8") as f:
+            name = f.read().strip()
+    except OSError:
+        return default
+    return name or default
+
+
+def write_live_collection(location: str, name: str) -> None:
+    os.makedirs(location, exist_ok=True)
+    path = os.path.join(location, LIVE_POINTER_FILE)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(name)
+    os.replace(tmp, path)
+
+
+def generation_of(collection_name: str) -> Tuple[str, int]:
+    """
+    `("properties", 3)` for `properties-gen3`; `(name, 0)` otherwise.
+    """
+    match = _GENERATION_RE.match(collection_name)
+    if not match:
+        return collection_name, 0
+    return match.group("base"), int(match.group("n"))
+
+
+# ----------------------------------------------------------------------
+# Directory fingerprint
+# ----------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class FileState:
+    mtime_ns: int
+    size: int
+    sha1: str
+
+
+def scan_directory(
+    directory: str,
+    previous: Optional[Dict[str, FileState]] = None,
+) -> Dict[str, FileState]:
+    """
+    State of every `.txt` file in `directory`. Files whose mtime and size
+    match `previous` are not read again.
+    """
+    previous = previous or {}
+    states: Dict[str, FileState] = {}
+    for entry in os.scandir(directory):
+        if not entry.is_file() or not entry.name.lower().endswith(".txt"):
+            continue
+        stat = entry.stat()
+        known = previous.get(entry.name)
+        if known is not None and known.mtime_ns == stat.st_mtime_ns and known.size == stat.st_size:
+            states[entry.name] = known
+            continue
+        with open(entry.path, "rb") as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        states[entry.name] = FileState(stat.st_mtime_ns, stat.st_size, digest)
+    return states
+
+
+def _contents(states: Dict[str, FileState]) -> Dict[str, str]:
+    return {name: state.sha1 for name, state in states.items()}
+
+
+# ----------------------------------------------------------------------
+# Watcher
+# ----------------------------------------------------------------------
+
+
+class PropertyWatcher:
+    """
+    Poll `directory` and re-index it into a new collection generation when
+    it changes, then swap `retriever` to it.
+
+    `embedder` embeds new / edited files (defaults to the retriever's).
+    `on_swap(name, embedded)` is called after each swap.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        retriever: "PropertyRetriever",
+        *,
+        embedder: Optional["Embedder"] = None,
+        interval_s: float = 2.0,
+        on_swap: Optional[Callable[[str, int], None]] = None,
+    ) -> None:
+        self.directory = directory
+        self.retriever = retriever
+        self.embedder = embedder or retriever.embedder
+        self.interval_s = interval_s
+        self.on_swap = on_swap
+
+        live = retriever.chroma
+        self.location = live.location
+        self.base_name, self.generation = generation_of(live.collection_name)
+        self.swaps = 0
+        self.failures = 0
+
+        self._indexed = scan_directory(directory)
+        self._pending: Optional[Dict[str, FileState]] = None
+        self._stop = threading.Event()
+        self._rebuild_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> "PropertyWatcher":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="property-watcher", daemon=True)
+            self._thread.start()
+            print(f"[Watcher] Watching {self.directory} every {self.interval_s:g}s")
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.poll()
+            except Exception as e:
+                # Keep watching; the next change triggers another attempt.
+                print(f"[Watcher] Poll failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Polling / re-indexing
+    # ------------------------------------------------------------------
+
+    def poll(self) -> Optional[str]:
+        """
+        Scan once. Re-index when a change seen by the previous poll is still
+        the current state; returns the new live collection name, if any.
+        """
+        current = scan_directory(self.directory, self._pending or self._indexed)
+        if _contents(current) == _contents(self._indexed):
+            self._pending = None
+            return None
+        if self._pending is None or _contents(current) != _contents(self._pending):
+            # Changed since the last poll: wait until it settles.
+            self._pending = current
+            return None
+        self._pending = None
+        return self.rebuild(current)
+
+    def rebuild(self, states: Optional[Dict[str, FileState]] = None) -> Optional[str]:
+        """
+        Build the next generation from the directory and swap to it.
+        """
+        from core.database.vectorstore.prop_vectorization import vectorize_directory
+
+        with self._rebuild_lock:
+            states = states or scan_directory(self.directory)
+            live = self.retriever.chroma
+            shadow = live.sibling(
+                f"{self.base_name}-gen{self.generation + 1}",
+                index_config=IndexConfig.from_settings(live.index_settings()),
+            )
+            try:
+                # Leftover from an interrupted rebuild.
+                shadow.delete_collection()
+            except Exception:
+                pass
+            delete_document_store(self.location, shadow.collection_name)
+
+            try:
+                shadow.client_create()
+                embedded = vectorize_directory(
+                    self.directory,
+                    embedder=self.embedder,
+                    chroma=shadow,
+                    shard_by_region=False,
+                    reuse_from=live,
+                )
+                sidecar = None
+                if self.retriever.sidecar is not None:
+                    from core.database.vectorstore.quantized_index import QuantizedIndex
+
+                    sidecar = QuantizedIndex.from_chroma(shadow, self.retriever.sidecar.dtype)
+            except Exception as e:
+                self.failures += 1
+                print(f"[Watcher] Re-index failed, keeping {live.collection_name}: {e}")
+                try:
+                    shadow.delete_collection()
+                except Exception:
+                    pass
+                delete_document_store(self.location, shadow.collection_name)
+                return None
+
+            previous = self.retriever.swap(shadow, sidecar)
+            self.generation += 1
+            self.swaps += 1
+            self._indexed = states
+            write_live_collection(self.location, shadow.collection_name)
+            print(
+                f"[Watcher] Swapped to {shadow.collection_name} "
+                f"({len(states)} files, {embedded} embedded)"
+            )
+            self._drop_old_generations(keep={shadow.collection_name, previous.collection_name})
+            if self.on_swap is not None:
+                self.on_swap(shadow.collection_name, embedded)
+            return shadow.collection_name
+
+    def _drop_old_generations(self, keep: set) -> None:
+        live = self.retriever.chroma
+        for collection in live.list_collections():
+            name = getattr(collection, "name", collection)
+            base, generation = generation_of(name)
+            if base != self.base_name or generation == 0 or name in keep:
+                continue
+            live.sibling(name).delete_collection()
+            delete_document_store(self.location, name)
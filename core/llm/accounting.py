@@ -0,0 +1,500 @@
+"""
+Token accounting and budgets for LLM calls.
+
+Every request sent to `generate_content` (read from its `usage_metadata`),
+and every embedding call, is charged to a process-wide `TokenLedger`:
+
+- by agent: "must", "orchestrator", "buyer:<name>", "embedder"
+- by Must agent session (one conversation, `MustAgent.session_id`)
+- by auction (`AuctionState.auction_id`, one per run: all buyers plus the
+  orchestrator)
+
+`get_ledger().usage(...)` and `report()` read the totals. Responses
+without usage metadata (some embedding APIs) are charged an estimate of
+about four characters per token. Agents call the model inside an
+`Admission` block; `CallPolicyClient` charges each attempt it sends there,
+so retries and hedged or abandoned duplicates are counted too. Sessions and
+auctions are `release()`d when they end.
+
+With a `BudgetConfig`, generation calls are admitted before they are sent:
+
+- `session_tokens`: tokens per Must agent session
+- `auction_tokens`: tokens per auction
+- `tokens_per_minute`: tokens charged over the last 60 s, all agents
+  (embeddings included)
+
+The prompt size is estimated before the call, and every admitted call
+reserves its estimate plus `output_allowance` until it settles, so calls
+admitted concurrently (sealed-bid buyers, batch workers) cannot all pass
+on the same headroom. If the estimate plus `output_allowance` would take a
+scope (charged + reserved) past `degrade_at` of its limit, the call is
+degraded: it is sent to `degraded_model` (if set) with `max_output_tokens`
+capped. If the prompt alone would go past the limit, the call is rejected
+with `BudgetExceeded` and nothing is sent. The agents handle that like a
+timeout: buyers PASS, the orchestrator skips its commentary, and the Must
+agent answers with `budget_reply`.
+
+Configuration from the environment (`BudgetConfig.from_env`):
+`TELEHELPER_BUDGET_SESSION_TOKENS`, `TELEHELPER_BUDGET_AUCTION_TOKENS`,
+`TELEHELPER_BUDGET_TPM`, `TELEHELPER_BUDGET_DEGRADE_AT` and
+`TELEHELPER_BUDGET_DEGRADED_MODEL`. Without limits, admission reserves
+nothing and accounting is a few dict updates per call.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterable, Optional, Tuple
+
+from core.telemetry.metrics import count
+
+BUDGET_METRIC = "telehelper_budget_decisions_total"
+WINDOW_S = 60.0
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count (~4 characters per token) for admission decisions.
+    """
+    return max(1, len(text) // 4)
+
+
+class BudgetExceeded(RuntimeError):
+    """
+    A call was rejected before it was sent: `scope` ("session", "auction"
+    or "minute") has `used` of `limit` tokens.
+    """
+
+    def __init__(self, scope: str, used: int, limit: int) -> None:
+        super().__init__(f"{scope} token budget exhausted ({used}/{limit} tokens)")
+        self.scope = scope
+        self.used = used
+        self.limit = limit
+
+
+def _env_int(name: str) -> Optional[int]:
+    value = os.getenv(name, "").strip()
+    if not value or int(value) <= 0:
+        return None
+    return int(value)
+
+
+@dataclass
+class BudgetConfig:
+    """
+    - session_tokens / auction_tokens / tokens_per_minute: limits (None
+      for no limit).
+    - degrade_at: fraction of a limit from which calls are degraded.
+    - degraded_model: model for degraded calls (None keeps the model).
+    - degraded_max_output_tokens: output cap for degraded calls.
+    - output_allowance: output tokens assumed per call when admitting.
+    """
+
+    session_tokens: Optional[int] = None
+    auction_tokens: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+    degrade_at: float = 0.8
+    degraded_model: Optional[str] = None
+    degraded_max_output_tokens: int = 256
+    output_allowance: int = 512
+
+    def __post_init__(self) -> None:
+        if not 0.0 < self.degrade_at <= 1.0:
+            raise ValueError("degrade_at must be in (0, 1]")
+
+    @property
+    def active(self) -> bool:
+        return any(
+            limit is not None
+            for limit in (self.session_tokens, self.auction_tokens, self.tokens_per_minute)
+        )
+
+    @classmethod
+    def from_env(cls) -> "BudgetConfig":
+        return cls(
+            session_tokens=_env_int("TELEHELPER_BUDGET_SESSION_TOKENS"),
+            auction_tokens=_env_int("TELEHELPER_BUDGET_AUCTION_TOKENS"),
+            tokens_per_minute=_env_int("TELEHELPER_BUDGET_TPM"),
+            degrade_at=float(os.getenv("TELEHELPER_BUDGET_DEGRADE_AT", "0.8")),
+            degraded_model=os.getenv("TELEHELPER_BUDGET_DEGRADED_MODEL") or None,
+        )
+
+
+@dataclass
+class Usage:
+    calls: int = 0
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    total_tokens: int = 0
+
+    def add(self, prompt: int, output: int, total: int) -> None:
+        self.calls += 1
+        self.prompt_tokens += prompt
+        self.output_tokens += output
+        self.total_tokens += total
+
+
+_current: contextvars.ContextVar[Optional["Admission"]] = contextvars.ContextVar(
+    "telehelper_llm_admission", default=None
+)
+
+
+@dataclass
+class Admission:
+    """
+    An admitted call: how to send it, and the tokens reserved for it.
+
+        with ledger.admit(prompt, agent="must", model=model) as admission:
+            response = client.models.generate_content(
+                model=admission.model, contents=prompt, **admission.kwargs
+            )
+            admission.settle(response)
+
+    Inside the block, `CallPolicyClient` charges every request it sends for
+    the call (retries, hedged duplicates, abandoned attempts) with
+    `charge_attempt`. `settle` charges the response only if nothing was
+    charged yet, i.e. without a policy client. Leaving the block releases
+    the reservation, whether the call succeeded or not.
+    """
+
+    model: str
+    degraded: bool = False
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    agent: str = ""
+    session: Optional[str] = None
+    auction: Optional[str] = None
+    prompt: Optional[str] = field(default=None, repr=False)
+    # Tokens held against the budgets until the call settles.
+    reserved: int = 0
+    # Requests charged so far, and their tokens.
+    attempts: int = 0
+    tokens: int = 0
+    ledger: Optional["TokenLedger"] = field(default=None, repr=False, compare=False)
+    _context_token: Any = field(default=None, repr=False, compare=False)
+
+    def __enter__(self) -> "Admission":
+        self._context_token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _current.reset(self._context_token)
+        if self.ledger is not None:
+            self.ledger._release_reservation(self)
+        return None
+
+    def settle(self, response: Any) -> int:
+        """
+        Charge `response` unless its request was already charged; returns
+        the tokens charged for the whole call so far.
+        """
+        if self.attempts == 0 and self.ledger is not None:
+            self.ledger._charge_admission(self, response)
+        return self.tokens
+
+
+def charge_attempt(response: Any) -> None:
+    """
+    Charge one sent request's response to the admission of the calling
+    context (a no-op outside an `Admission` block).
+    """
+    admission = _current.get()
+    if admission is not None and admission.ledger is not None:
+        admission.ledger._charge_admission(admission, response)
+
+
+def _response_tokens(response: Any, prompt: Optional[str]) -> Tuple[int, int, int]:
+    usage = getattr(response, "usage_metadata", None)
+    total = getattr(usage, "total_token_count", None) if usage is not None else None
+    if total:
+        prompt_tokens = getattr(usage, "prompt_token_count", None) or 0
+        output_tokens = getattr(usage, "candidates_token_count", None) or 0
+        return prompt_tokens, output_tokens, total
+    prompt_tokens = estimate_tokens(prompt) if prompt else 0
+    text = getattr(response, "text", None)
+    output_tokens = estimate_tokens(text) if isinstance(text, str) and text else 0
+    return prompt_tokens, output_tokens, prompt_tokens + output_tokens
+
+
+class TokenLedger:
+    """
+    Thread-safe token totals and budget admission.
+
+    Session and auction totals are opened by their first admission and kept
+    until `release()`; the runners release them when a conversation or an
+    auction ends, so long runs do not accumulate them.
+    """
+
+    def __init__(
+        self,
+        budget: Optional[BudgetConfig] = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.budget = budget or BudgetConfig()
+        self.clock = clock
+        self.degraded = 0
+        self.rejected = 0
+        self._by_agent: Dict[str, Usage] = {}
+        self._by_session: Dict[str, Usage] = {}
+        self._by_auction: Dict[str, Usage] = {}
+        # Tokens reserved by calls in flight, by ("session" | "auction" |
+        # "minute", key).
+        self._reserved: Dict[Tuple[str, str], int] = {}
+        self._window: Deque[Tuple[float, int]] = deque()
+        self._window_tokens = 0
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Admission
+    # ------------------------------------------------------------------
+
+    def admit(
+        self,
+        prompt: str,
+        *,
+        agent: str,
+        model: str,
+        session: Optional[str] = None,
+        auction: Optional[str] = None,
+    ) -> Admission:
+        """
+        Decide how (and whether) a call may be sent, and reserve its
+        estimated tokens (prompt + `output_allowance`) against every budget
+        it counts towards; raises `BudgetExceeded`.
+        """
+        budget = self.budget
+        admission = Admission(
+            model, agent=agent, session=session, auction=auction, prompt=prompt, ledger=self
+        )
+        with self._lock:
+            if session is not None:
+                self._by_session.setdefault(session, Usage())
+            if auction is not None:
+                self._by_auction.setdefault(auction, Usage())
+            if not budget.active:
+                return admission
+
+            prompt_tokens = estimate_tokens(prompt)
+            scopes = list(self._limits(session, auction))
+            degrade = False
+            for scope, _key, used, limit in scopes:
+                if used + prompt_tokens > limit:
+                    self.rejected += 1
+                    count(BUDGET_METRIC, decision="rejected", scope=scope, agent=agent)
+                    raise BudgetExceeded(scope, used, limit)
+                if used + prompt_tokens + budget.output_allowance > budget.degrade_at * limit:
+                    degrade = True
+
+            allowance = budget.output_allowance
+            if degrade:
+                self.degraded += 1
+                allowance = min(allowance, budget.degraded_max_output_tokens)
+            admission.reserved = prompt_tokens + allowance
+            for scope, key, _used, _limit in scopes:
+                self._reserved[(scope, key)] = self._reserved.get((scope, key), 0) + admission.reserved
+        if not degrade:
+            return admission
+
+        count(BUDGET_METRIC, decision="degraded", agent=agent)
+        admission.degraded = True
+        admission.model = budget.degraded_model or model
+        admission.kwargs = {"config": {"max_output_tokens": budget.degraded_max_output_tokens}}
+        return admission
+
+    def _limits(self, session: Optional[str], auction: Optional[str]):
+        """
+        (scope, key, used + reserved, limit) for every budget a call counts
+        towards. Called with the lock held.
+        """
+        budget = self.budget
+        if budget.session_tokens is not None and session is not None:
+            used = self._total(self._by_session, session) + self._reserved.get(("session", session), 0)
+            yield "session", session, used, budget.session_tokens
+        if budget.auction_tokens is not None and auction is not None:
+            used = self._total(self._by_auction, auction) + self._reserved.get(("auction", auction), 0)
+            yield "auction", auction, used, budget.auction_tokens
+        if budget.tokens_per_minute is not None:
+            self._expire(self.clock())
+            used = self._window_tokens + self._reserved.get(("minute", ""), 0)
+            yield "minute", "", used, budget.tokens_per_minute
+
+    def _release_reservation(self, admission: Admission) -> None:
+        if not admission.reserved:
+            return
+        with self._lock:
+            keys = [("session", admission.session), ("auction", admission.auction), ("minute", "")]
+            for key in keys:
+                if key in self._reserved:
+                    left = self._reserved[key] - admission.reserved
+                    if left > 0:
+                        self._reserved[key] = left
+                    else:
+                        del self._reserved[key]
+            admission.reserved = 0
+
+    @staticmethod
+    def _total(table: Dict[str, Usage], key: str) -> int:
+        usage = table.get(key)
+        return usage.total_tokens if usage is not None else 0
+
+    def _expire(self, now: float) -> None:
+        while self._window and self._window[0][0] <= now - WINDOW_S:
+            self._window_tokens -= self._window.popleft()[1]
+
+    # ------------------------------------------------------------------
+    # Charging
+    # ------------------------------------------------------------------
+
+    def _charge_admission(self, admission: Admission, response: Any) -> None:
+        tokens = _response_tokens(response, admission.prompt)
+        self._charge(tokens, admission.agent, admission.session, admission.auction)
+        with self._lock:
+            admission.attempts += 1
+            admission.tokens += tokens[2]
+
+    def record(
+        self,
+        response: Any,
+        *,
+        agent: str,
+        session: Optional[str] = None,
+        auction: Optional[str] = None,
+        prompt: Optional[str] = None,
+    ) -> int:
+        """
+        Charge a `generate_content` response sent without an admission;
+        returns its total tokens. `prompt` is used for the estimate when
+        the response has no usage.
+        """
+        tokens = _response_tokens(response, prompt)
+        self._charge(tokens, agent, session, auction)
+        return tokens[2]
+
+    def record_embedding(
+        self,
+        response: Any,
+        texts: Iterable[str],
+        *,
+        agent: str = "embedder",
+    ) -> int:
+        """
+        Charge an `embed_content` response (estimated from `texts` when it
+        carries no usage metadata); returns its tokens.
+        """
+        usage = getattr(response, "usage_metadata", None)
+        total = getattr(usage, "total_token_count", None) if usage is not None else None
+        if not total:
+            total = sum(estimate_tokens(text) for text in texts)
+        self._charge((total, 0, total), agent, None, None)
+        return total
+
+    def _charge(
+        self,
+        tokens: Tuple[int, int, int],
+        agent: str,
+        session: Optional[str],
+        auction: Optional[str],
+    ) -> None:
+        now = self.clock()
+        with self._lock:
+            self._by_agent.setdefault(agent, Usage()).add(*tokens)
+            # Released sessions / auctions (late, abandoned attempts) only
+            # count towards the agent totals and the per-minute window.
+            if session in self._by_session:
+                self._by_session[session].add(*tokens)
+            if auction in self._by_auction:
+                self._by_auction[auction].add(*tokens)
+            if self.budget.tokens_per_minute is not None:
+                self._window.append((now, tokens[2]))
+                self._window_tokens += tokens[2]
+                self._expire(now)
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def usage(
+        self,
+        *,
+        agent: Optional[str] = None,
+        session: Optional[str] = None,
+        auction: Optional[str] = None,
+    ) -> Usage:
+        """
+        Totals for one agent, session or auction (a copy; zero if unknown
+        or released).
+        """
+        if agent is not None:
+            table, key = self._by_agent, agent
+        elif session is not None:
+            table, key = self._by_session, session
+        elif auction is not None:
+            table, key = self._by_auction, auction
+        else:
+            raise ValueError("pass agent, session or auction")
+        with self._lock:
+            found = table.get(key)
+            return Usage(**asdict(found)) if found is not None else Usage()
+
+    def release(self, *, session: Optional[str] = None, auction: Optional[str] = None) -> Usage:
+        """
+        Close a finished session or auction: forget its totals (agent totals
+        stay) and return them.
+        """
+        with self._lock:
+            found = None
+            if session is not None:
+                found = self._by_session.pop(session, None)
+            if auction is not None:
+                found = self._by_auction.pop(auction, None)
+            return found or Usage()
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            self._expire(self.clock())
+            by_agent = {name: asdict(usage) for name, usage in sorted(self._by_agent.items())}
+            return {
+                "total_tokens": sum(u["total_tokens"] for u in by_agent.values()),
+                "by_agent": by_agent,
+                "open_sessions": len(self._by_session),
+                "open_auctions": len(self._by_auction),
+                "tokens_last_minute": self._window_tokens if self.budget.tokens_per_minute else None,
+                "degraded": self.degraded,
+                "rejected": self.rejected,
+            }
+
+
+# ----------------------------------------------------------------------
+# Process-wide ledger
+# ----------------------------------------------------------------------
+
+_ledger: Optional[TokenLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def get_ledger() -> TokenLedger:
+    """
+    The shared ledger, with budgets from the environment on first use.
+    """
+    global _ledger
+    if _ledger is None:
+        with _ledger_lock:
+            if _ledger is None:
+                _ledger = TokenLedger(BudgetConfig.from_env())
+    return _ledger
+
+
+def configure(budget: Optional[BudgetConfig] = None) -> TokenLedger:
+    """
+    Replace the shared ledger (totals start from zero) with one enforcing
+    `budget` (None: limits from the environment).
+    """
+    global _ledger
+    with _ledger_lock:
+        _ledger = TokenLedger(budget or BudgetConfig.from_env())
+    return _ledger
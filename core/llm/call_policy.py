@@ -0,0 +1,331 @@
+"""
+Deadlines, retries and hedged requests for LLM calls.
+
+`generate_content` has no deadline of its own: one slow response stalls a
+whole auction round or user turn. `CallPolicyClient` wraps any client (see
+`core.llm.wrappers`) and runs each `generate_content` call under a
+`CallPolicy`:
+
+- a deadline for the whole logical call (retries and hedges included);
+  when it passes, `CallTimeout` is raised and the agent falls back (PASS for
+  buyers, a canned reply for the Must agent)
+- bounded retries with exponential backoff and jitter, for errors that are
+  worth retrying (429 / 5xx / timeouts) and for attempts that exceed
+  `attempt_timeout_s`
+- optional hedging: when an attempt is still running after the observed
+  p95 latency of successful calls (or `hedge_after_s`), a duplicate request
+  is sent and the first response wins
+
+Attempts run on a small thread pool so the caller can stop waiting. Python
+cannot cancel a running HTTP call, so an abandoned attempt finishes in the
+background and its result is discarded; with hedging, expect up to about
+`1 - hedge_quantile` extra requests. Attempts run in a copy of the caller's
+context, so a `ConcurrencyLimitedClient` below this wrapper still charges
+slot waits to the caller. No attempt is started once the deadline has
+passed: a backoff that would reach it ends the call with `CallTimeout`.
+
+Configuration from the environment (`CallPolicy.from_env`):
+`TELEHELPER_LLM_DEADLINE` (seconds, "0" for none), `TELEHELPER_LLM_ATTEMPT_TIMEOUT`,
+`TELEHELPER_LLM_RETRIES` and `TELEHELPER_LLM_HEDGE` ("1" to enable).
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from core.llm.accounting import charge_attempt
+from core.llm.concurrency import submit_in_context
+from core.llm.wrappers import ClientWrapper
+from core.telemetry.metrics import count
+
+_RETRYABLE_CODES = {408, 429, 500, 502, 503, 504}
+_RETRYABLE_MARKERS = ("429", "RESOURCE_EXHAUSTED", "UNAVAILABLE", "503", "DEADLINE_EXCEEDED")
+
+
+class CallTimeout(TimeoutError):
+    """
+    The call did not succeed within its policy's deadline.
+    """
+
+    def __init__(self, message: str, *, elapsed_s: float, attempts: int) -> None:
+        super().__init__(message)
+        self.elapsed_s = elapsed_s
+        self.attempts = attempts
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """
+    Transient failures: timeouts, connection errors, 429 and 5xx responses.
+    """
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    code = getattr(exc, "code", None) or getattr(exc, "status_code", None)
+    if isinstance(code, int):
+        return code in _RETRYABLE_CODES
+    text = str(exc)
+    return any(marker in text for marker in _RETRYABLE_MARKERS)
+
+
+def _env_seconds(name: str, default: Optional[float]) -> Optional[float]:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    seconds = float(value)
+    return seconds if seconds > 0 else None
+
+
+@dataclass
+class CallPolicy:
+    """
+    - deadline_s: time for one logical call, retries and hedges included
+      (None waits forever).
+    - attempt_timeout_s: time one attempt may take before it is abandoned
+      and retried (None: the rest of the deadline).
+    - max_retries: extra attempts after a retryable error or an attempt
+      timeout.
+    - backoff_s: delay before the first retry; doubles per retry, with
+      +/-50% jitter, and never runs past the deadline.
+    - hedge: send a duplicate request when an attempt runs longer than the
+      hedge delay; the first response wins.
+    - hedge_quantile / hedge_min_samples: the hedge delay is this quantile
+      of recent successful latencies, once that many were observed.
+    - hedge_after_s: fixed hedge delay (also used until enough samples).
+    - max_hedges: duplicates per attempt.
+    """
+
+    deadline_s: Optional[float] = 60.0
+    attempt_timeout_s: Optional[float] = None
+    max_retries: int = 2
+    backoff_s: float = 0.5
+    hedge: bool = False
+    hedge_quantile: float = 0.95
+    hedge_min_samples: int = 20
+    hedge_after_s: Optional[float] = None
+    max_hedges: int = 1
+
+    def __post_init__(self) -> None:
+        if self.max_retries < 0 or self.max_hedges < 0:
+            raise ValueError("max_retries and max_hedges must be >= 0")
+        if not 0.0 < self.hedge_quantile < 1.0:
+            raise ValueError("hedge_quantile must be between 0 and 1")
+
+    @classmethod
+    def from_env(cls) -> "CallPolicy":
+        return cls(
+            deadline_s=_env_seconds("TELEHELPER_LLM_DEADLINE", 60.0),
+            attempt_timeout_s=_env_seconds("TELEHELPER_LLM_ATTEMPT_TIMEOUT", None),
+            max_retries=int(os.getenv("TELEHELPER_LLM_RETRIES", "2")),
+            hedge=os.getenv("TELEHELPER_LLM_HEDGE", "").lower() in ("1", "true", "yes"),
+        )
+
+
+class LatencyTracker:
+    """
+    Recent successful call latencies and a cached quantile of them.
+    """
+
+    def __init__(self, window: int = 256, quantile: float = 0.95, refresh_every: int = 16) -> None:
+        self.quantile = quantile
+        self.refresh_every = refresh_every
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._since_refresh = 0
+        self._value: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+            self._since_refresh += 1
+            if self._value is None or self._since_refresh >= self.refresh_every:
+                ordered = sorted(self._samples)
+                self._value = ordered[min(len(ordered) - 1, int(self.quantile * len(ordered)))]
+                self._since_refresh = 0
+
+    def value(self) -> Optional[float]:
+        return self._value
+
+
+class CallPolicyClient(ClientWrapper):
+    """
+    Client wrapper that runs `generate_content` under `policy`.
+
+    Embedding calls are passed through unchanged.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        policy: Optional[CallPolicy] = None,
+        *,
+        max_workers: int = 32,
+    ) -> None:
+        super().__init__(client)
+        self.policy = policy or CallPolicy()
+        self.latency = LatencyTracker(quantile=self.policy.hedge_quantile)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-call")
+        self._random = random.Random()
+        self._stats_lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.timeouts = 0
+
+    # ------------------------------------------------------------------
+    # Calls
+    # ------------------------------------------------------------------
+
+    def generate_content(self, **kwargs: Any) -> Any:
+        call = self.wrapped.models.generate_content
+
+        def attempt() -> Any:
+            response = call(**kwargs)
+            # Every request sent is charged to the caller's token admission,
+            # hedged duplicates and abandoned attempts included.
+            charge_attempt(response)
+            return response
+
+        return self.run(attempt, name="generate_content")
+
+    def run(self, fn: Callable[[], Any], name: str = "call") -> Any:
+        """
+        Call `fn()` under the policy: retries, hedging and the deadline.
+        """
+        policy = self.policy
+        started = time.monotonic()
+        deadline = None if policy.deadline_s is None else started + policy.deadline_s
+        self._bump("calls")
+
+        attempt = 0
+        while True:
+            attempt += 1
+            attempt_deadline = deadline
+            if policy.attempt_timeout_s is not None:
+                attempt_end = time.monotonic() + policy.attempt_timeout_s
+                attempt_deadline = attempt_end if deadline is None else min(deadline, attempt_end)
+            try:
+                return self._attempt(fn, attempt_deadline)
+            except _AttemptTimeout:
+                error: BaseException = TimeoutError(f"{name} attempt {attempt} timed out")
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                error = e
+
+            now = time.monotonic()
+            delay = policy.backoff_s * (2 ** (attempt - 1)) * self._random.uniform(0.5, 1.5)
+            retry = attempt <= policy.max_retries
+            # A retry that could only start at or after the deadline is not sent.
+            out_of_time = retry and deadline is not None and now + delay >= deadline
+            if not retry or out_of_time:
+                if isinstance(error, TimeoutError) or out_of_time:
+                    self._bump("timeouts")
+                    count("telehelper_llm_timeouts_total", call=name)
+                    raise CallTimeout(
+                        f"{name} did not finish within {policy.deadline_s}s "
+                        f"({attempt} attempt(s))",
+                        elapsed_s=now - started,
+                        attempts=attempt,
+                    ) from error
+                raise error
+
+            self._bump("retries")
+            count("telehelper_llm_retries_total", call=name)
+            time.sleep(delay)
+
+    def _attempt(self, fn: Callable[[], Any], deadline: Optional[float]) -> Any:
+        """
+        One attempt, with hedges; raises `_AttemptTimeout` at `deadline`.
+        """
+        start = time.monotonic()
+        futures: List[Future] = [submit_in_context(self._pool, self._timed, fn)]
+        hedges_left = self.policy.max_hedges if self.policy.hedge else 0
+        hedge_delay = self._hedge_delay() if hedges_left else None
+        last_error: Optional[BaseException] = None
+
+        while futures:
+            now = time.monotonic()
+            waits = []
+            if deadline is not None:
+                waits.append(deadline - now)
+            if hedges_left and hedge_delay is not None:
+                waits.append(start + hedge_delay - now)
+            timeout = max(0.0, min(waits)) if waits else None
+
+            done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                futures.remove(future)
+                error = future.exception()
+                if error is None:
+                    result, seconds, hedged = future.result()
+                    self.latency.record(seconds)
+                    if hedged:
+                        self._bump("hedge_wins")
+                    return result
+                last_error = error
+            if done:
+                continue
+
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                raise _AttemptTimeout()
+            if hedges_left and hedge_delay is not None and now >= start + hedge_delay:
+                hedges_left -= 1
+                self._bump("hedges")
+                count("telehelper_llm_hedges_total")
+                futures.append(submit_in_context(self._pool, self._timed, fn, True))
+
+        assert last_error is not None
+        raise last_error
+
+    @staticmethod
+    def _timed(fn: Callable[[], Any], hedged: bool = False) -> Any:
+        start = time.monotonic()
+        result = fn()
+        return result, time.monotonic() - start, hedged
+
+    def _hedge_delay(self) -> Optional[float]:
+        if len(self.latency) >= self.policy.hedge_min_samples:
+            observed = self.latency.value()
+            if observed is not None:
+                return observed
+        return self.policy.hedge_after_s
+
+    # ------------------------------------------------------------------
+    # Stats / lifecycle
+    # ------------------------------------------------------------------
+
+    def _bump(self, counter: str) -> None:
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "timeouts": self.timeouts,
+            "p95_s": self.latency.value(),
+        }
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class _AttemptTimeout(Exception):
+    pass
+
+
+def with_call_policy(client: Any, policy: Optional[CallPolicy] = None) -> CallPolicyClient:
+    return CallPolicyClient(client, policy or CallPolicy.from_env())
@@ -0,0 +1,92 @@
+"""
+Global cap on in-flight LLM calls.
+
+`ConcurrencyLimitedClient` lets many agents (e.g. auctions running in
+parallel) share one client while never having more than `max_in_flight`
+`generate_content` calls outstanding at once. Time spent waiting for a slot
+is added to a `WaitMeter` held in a context variable, so callers can
+separate queueing from real work.
+
+The meter belongs to the caller's context, not its thread: work handed to
+another thread with `submit_in_context` (the call policy's attempt pool,
+sealed-bid buyer threads) keeps charging the caller's meter. Waits of calls
+running in parallel (hedges, sealed-bid buyers) are all added, so the total
+can exceed the caller's wall-clock time.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Optional
+
+from core.llm.wrappers import ClientWrapper
+
+
+def submit_in_context(executor: Executor, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    """
+    `executor.submit(fn, ...)`, run in a copy of the caller's context so
+    context-bound accounting (slot wait, ...) follows the work.
+    """
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+class WaitMeter:
+    """
+    Seconds spent waiting for a slot, summed over threads.
+    """
+
+    def __init__(self) -> None:
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self.seconds += seconds
+
+
+class ConcurrencyLimitedClient(ClientWrapper):
+    """
+    Client wrapper whose `generate_content` calls share a semaphore.
+
+    Embedding calls are passed through unchanged.
+    """
+
+    def __init__(self, client: Any, max_in_flight: int) -> None:
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be >= 1")
+        super().__init__(client)
+        self.max_in_flight = max_in_flight
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._meter: contextvars.ContextVar[Optional[WaitMeter]] = contextvars.ContextVar(
+            f"llm_slot_wait_{id(self)}", default=None
+        )
+
+    def generate_content(self, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        with self._slots:
+            meter = self._meter.get()
+            if meter is None:
+                meter = WaitMeter()
+                self._meter.set(meter)
+            meter.add(time.perf_counter() - start)
+            return self.wrapped.models.generate_content(**kwargs)
+
+    @property
+    def wait_s(self) -> float:
+        """
+        Seconds the current context has spent waiting for a slot.
+        """
+        meter = self._meter.get()
+        return meter.seconds if meter is not None else 0.0
+
+    def reset_wait(self) -> float:
+        """
+        Return the current context's accumulated wait time and start a new
+        meter (calls still running keep charging the old one).
+        """
+        waited = self.wait_s
+        self._meter.set(WaitMeter())
+        return waited
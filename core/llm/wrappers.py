@@ -0,0 +1,48 @@
+"""
+Base class for Gemini client wrappers.
+
+Agents only use `client.models.generate_content(...)` and
+`client.models.embed_content(...)`. A `ClientWrapper` looks like a
+`genai.Client` to them but routes those two calls through overridable
+methods, so cross-cutting behaviour (concurrency limits, tracing, ...) can be
+layered around any client, including other wrappers or the benchmark fakes.
+Everything else is delegated to the wrapped client.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+
+class _ModelsProxy:
+    def __init__(self, owner: "ClientWrapper") -> None:
+        self._owner = owner
+
+    def generate_content(self, **kwargs: Any) -> Any:
+        return self._owner.generate_content(**kwargs)
+
+    def embed_content(self, **kwargs: Any) -> Any:
+        return self._owner.embed_content(**kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._owner.wrapped.models, name)
+
+
+class ClientWrapper:
+    """
+    Wrap `client`; subclasses override `generate_content` / `embed_content`.
+    """
+
+    def __init__(self, client: Any) -> None:
+        self.wrapped = client
+        self.models = _ModelsProxy(self)
+
+    def generate_content(self, **kwargs: Any) -> Any:
+        return self.wrapped.models.generate_content(**kwargs)
+
+    def embed_content(self, **kwargs: Any) -> Any:
+        return self.wrapped.models.embed_content(**kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes not found on the wrapper itself.
+        return getattr(self.wrapped, name)
@@ -13,6 +13,7 @@ to the Gemini client.
 from dataclasses import dataclass
 
 from core.prompts.prompts import MUST_AGENT_PROMPT
+from core.telemetry.metrics import span
 
 
 @dataclass
@@ -31,7 +32,8 @@ class PromptBuilder:
         The template is expected to contain `{state}` and `{question}`
         placeholders (as in `MUST_AGENT_PROMPT`).
         """
-        return self.template.format(state=state, question=question)
+        with span("prompt.build"):
+            return self.template.format(state=state, question=question)
 
 
 def make_must_agent_prompt(state: str, question: str) -> str:
@@ -57,6 +57,12 @@ Output format:
 - Start with a short summary of the property being auctioned.
 - Then list the bidding rounds and bids in a structured way (e.g. “Round 1: Buyer1 bids X, Buyer2 passes, …”).
 - End with a clear final statement: winner, winning bid, or “no sale” and why.
+
+Auction log so far:
+{state}
+
+Latest update:
+{question}
 """
 
 BUYER_AGENT1_PROMPT = """
@@ -91,6 +97,12 @@ Output:
 - When asked for your action, respond with either:
   - “PASS” and a one-sentence explanation, or
   - “BID: <amount> EUR” and a brief explanation of why this is a reasonable bid for you.
+
+Your previous decisions in this auction:
+{state}
+
+Current round:
+{question}
 """
 
 BUYER_AGENT2_PROMPT = """
@@ -126,4 +138,10 @@ Output:
 - When asked for your action, respond with either:
   - “PASS” and a short justification, or
   - “BID: <amount> EUR” and a brief explanation of your logic (match to preferences, value vs. current price).
+
+Your previous decisions in this auction:
+{state}
+
+Current round:
+{question}
 """
\ No newline at end of file
@@ -0,0 +1,215 @@
+"""
+Process-wide registry of expensive clients.
+
+Building a `genai.Client` (plus `load_dotenv`) or a Chroma `PersistentClient`
+is not free, and several components used to do it on every call (e.g.
+`vectorize_file`). The registry hands out shared instances instead:
+
+- `genai_client(api_key)` – a small round-robin pool of `genai.Client`s per
+  API key (the clients are thread-safe; the pool spreads connections)
+- `chroma_client(path)` – one `PersistentClient` per on-disk location
+- `chroma_collection(path, name)` – cached collections keyed by path + name
+- `shared(name, factory)` – any other process-wide object built once
+
+Use `get_registry()` for the process-wide instance. `close()` releases
+everything explicitly; it is also called at interpreter exit.
+"""
+
+from __future__ import annotations
+
+import atexit
+import itertools
+import os
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class ResourceRegistry:
+    """
+    Thread-safe cache of Gemini clients and Chroma clients/collections.
+    """
+
+    def __init__(self, genai_pool_size: int = 4) -> None:
+        if genai_pool_size < 1:
+            raise ValueError("genai_pool_size must be >= 1")
+        self.genai_pool_size = genai_pool_size
+        self._lock = threading.RLock()
+        self._genai_pools: Dict[str, List[Any]] = {}
+        self._genai_cursors: Dict[str, Iterator[int]] = {}
+        self._chroma_clients: Dict[str, Any] = {}
+        self._collections: Dict[Tuple[str, str], Any] = {}
+        self._owned_clients: List[Any] = []
+        self._shared: Dict[str, Any] = {}
+        self._env_loaded = False
+        self._closed = False
+
+    # ------------------------------------------------------------------
+    # Gemini clients
+    # ------------------------------------------------------------------
+
+    def _resolve_api_key(self, api_key: Optional[str]) -> str:
+        if api_key:
+            return api_key
+        if not self._env_loaded:
+            from dotenv import load_dotenv
+
+            load_dotenv()
+            self._env_loaded = True
+        api_key = os.getenv("GOOGLE_API_KEY")
+        if not api_key:
+            raise RuntimeError("GOOGLE_API_KEY environment variable is not set.")
+        return api_key
+
+    def genai_client(self, api_key: Optional[str] = None, *, pooled: bool = True) -> Any:
+        """
+        Return a pooled `genai.Client` for `api_key` (default: GOOGLE_API_KEY).
+
+        Clients are created lazily up to `genai_pool_size`, then handed out
+        round-robin. `pooled=False` returns a fresh client that is not shared
+        but still closed with the registry; use it for clients that get
+        patched in place (e.g. `langsmith.wrappers.wrap_gemini`).
+        """
+        with self._lock:
+            self._check_open()
+            key = self._resolve_api_key(api_key)
+            from google import genai
+
+            if not pooled:
+                client = genai.Client(api_key=key)
+                self._owned_clients.append(client)
+                return client
+
+            pool = self._genai_pools.setdefault(key, [])
+            if len(pool) < self.genai_pool_size:
+                pool.append(genai.Client(api_key=key))
+                return pool[-1]
+            cursor = self._genai_cursors.setdefault(key, itertools.cycle(range(len(pool))))
+            return pool[next(cursor)]
+
+    # ------------------------------------------------------------------
+    # Chroma clients / collections
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _path_key(path: str) -> str:
+        return os.path.normcase(os.path.abspath(path))
+
+    def chroma_client(self, path: str) -> Any:
+        """
+        Return the shared `chromadb.PersistentClient` for `path`.
+        """
+        key = self._path_key(path)
+        with self._lock:
+            self._check_open()
+            client = self._chroma_clients.get(key)
+            if client is None:
+                import chromadb
+
+                client = chromadb.PersistentClient(path=path)
+                self._chroma_clients[key] = client
+            return client
+
+    def chroma_collection(self, path: str, name: str, **kwargs: Any) -> Any:
+        """
+        Return the cached collection `name` at `path`, creating it if needed.
+
+        `kwargs` are forwarded to `get_or_create_collection` the first time
+        the collection is requested.
+        """
+        key = (self._path_key(path), name)
+        with self._lock:
+            collection = self._collections.get(key)
+            if collection is None:
+                collection = self.chroma_client(path).get_or_create_collection(name=name, **kwargs)
+                self._collections[key] = collection
+            return collection
+
+    def forget_collection(self, path: str, name: str) -> None:
+        """
+        Drop a cached collection (e.g. after it was deleted or recreated).
+        """
+        with self._lock:
+            self._collections.pop((self._path_key(path), name), None)
+
+    # ------------------------------------------------------------------
+    # Other shared objects
+    # ------------------------------------------------------------------
+
+    def shared(self, name: str, factory: Callable[[], Any]) -> Any:
+        """
+        Return the object registered under `name`, building it with
+        `factory()` on first use. It is closed (if it has `close()`) together
+        with the registry.
+        """
+        with self._lock:
+            self._check_open()
+            if name not in self._shared:
+                self._shared[name] = factory()
+            return self._shared[name]
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def _check_open(self) -> None:
+        if self._closed:
+            raise RuntimeError("ResourceRegistry is closed.")
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def close(self) -> None:
+        """
+        Close pooled Gemini clients and drop all cached Chroma handles.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            closeables = [c for pool in self._genai_pools.values() for c in pool]
+            closeables += self._owned_clients + list(self._shared.values())
+            for obj in closeables:
+                close = getattr(obj, "close", None)
+                if callable(close):
+                    try:
+                        close()
+                    except Exception:
+                        pass
+            self._genai_pools.clear()
+            self._owned_clients.clear()
+            self._shared.clear()
+            self._genai_cursors.clear()
+            self._collections.clear()
+            self._chroma_clients.clear()
+            self._closed = True
+
+    def __enter__(self) -> "ResourceRegistry":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+_registry: Optional[ResourceRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> ResourceRegistry:
+    """
+    Return the process-wide registry, creating a new one if needed (also
+    after `close_registry()`).
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None or _registry.closed:
+            _registry = ResourceRegistry()
+        return _registry
+
+
+def close_registry() -> None:
+    with _registry_lock:
+        if _registry is not None:
+            _registry.close()
+
+
+atexit.register(close_registry)
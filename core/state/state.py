@@ -11,6 +11,7 @@ This state is meant to be injected into prompt templates (e.g. `{state}` in
 
 from __future__ import annotations
 
+import copy
 from typing import Any, Dict, List, Optional
 
 
@@ -47,6 +48,12 @@ class State:
         self._data.update(values)
         self._data.setdefault("messages", [])
 
+    def copy(self) -> "State":
+        """
+        An independent deep copy (changes to it never reach this state).
+        """
+        return State(copy.deepcopy(self._data))
+
     # -------------------------
     # Conversation helpers
     # -------------------------
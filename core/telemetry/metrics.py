@@ -0,0 +1,347 @@
+"""
+Lightweight instrumentation for the agent pipeline.
+
+This module provides:
+- `span(name, **labels)` – a context manager timing one pipeline stage
+- `record_usage(response, **labels)` – token counts from `usage_metadata`
+- histograms/counters kept in a process-wide `MetricsRegistry`
+- `snapshot()` / `prometheus_text()` / `dump(path)` to expose the data
+
+Instrumentation is off by default. Turn it on with `TELEHELPER_METRICS=1`
+or `enable()`. When it is off, `span()` hands back one shared no-op context
+manager and `record_usage()` returns immediately, so the hooks can stay in
+the hot path.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+SPAN_METRIC = "telehelper_span_seconds"
+SPAN_ERRORS_METRIC = "telehelper_span_errors_total"
+TOKENS_METRIC = "telehelper_llm_tokens_total"
+TOKENS_PER_CALL_METRIC = "telehelper_llm_tokens_per_call"
+
+DEFAULT_TIME_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+DEFAULT_TOKEN_BUCKETS: Tuple[float, ...] = (
+    64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768, 65536,
+)
+
+_enabled = os.getenv("TELEHELPER_METRICS", "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram (Prometheus style) with sum/count/min/max.
+
+    Quantiles are estimated by linear interpolation inside the bucket that
+    contains the requested rank, which is accurate enough for p50/p95/p99
+    reporting without keeping raw samples.
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_TIME_BUCKETS) -> None:
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)  # last = +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for idx, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.buckets[idx - 1] if idx > 0 else max(0.0, self.min)
+                upper = self.buckets[idx] if idx < len(self.buckets) else self.max
+                lower = max(lower, self.min)
+                upper = min(upper, self.max)
+                fraction = (rank - seen) / bucket_count
+                return lower + (upper - lower) * fraction
+            seen += bucket_count
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": {
+                **{str(b): c for b, c in zip(self.buckets, self.counts)},
+                "+Inf": self.counts[-1],
+            },
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe store of named histograms and counters, keyed by labels.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._histogram_buckets: Dict[str, Tuple[float, ...]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        # Raw observations, only while `keep_samples(True)` (load tests that
+        # need exact percentiles rather than bucket estimates).
+        self._samples: Optional[Dict[str, Dict[LabelKey, List[float]]]] = None
+
+    def keep_samples(self, enabled: bool = True) -> None:
+        with self._lock:
+            self._samples = {} if enabled else None
+
+    def samples(self, name: str) -> Dict[LabelKey, List[float]]:
+        """
+        Raw observations of histogram `name` per label set (empty unless
+        `keep_samples(True)` was called before they were recorded).
+        """
+        with self._lock:
+            if self._samples is None:
+                return {}
+            return {key: list(values) for key, values in self._samples.get(name, {}).items()}
+
+    def observe(
+        self,
+        name: str,
+        value: float,
+        labels: Optional[Dict[str, Any]] = None,
+        buckets: Iterable[float] = DEFAULT_TIME_BUCKETS,
+    ) -> None:
+        key = _label_key(labels or {})
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = Histogram(self._histogram_buckets.setdefault(name, tuple(buckets)))
+                series[key] = hist
+            hist.observe(value)
+            if self._samples is not None:
+                self._samples.setdefault(name, {}).setdefault(key, []).append(value)
+
+    def inc(self, name: str, amount: float = 1.0, labels: Optional[Dict[str, Any]] = None) -> None:
+        key = _label_key(labels or {})
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+
+    def histogram(self, name: str, **labels: Any) -> Optional[Histogram]:
+        with self._lock:
+            return self._histograms.get(name, {}).get(_label_key(labels))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._histogram_buckets.clear()
+            self._counters.clear()
+            if self._samples is not None:
+                self._samples.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return a JSON-serializable view of every metric series.
+        """
+        with self._lock:
+            return {
+                "histograms": {
+                    name: [
+                        {"labels": dict(key), **hist.to_dict()}
+                        for key, hist in series.items()
+                    ]
+                    for name, series in self._histograms.items()
+                },
+                "counters": {
+                    name: [
+                        {"labels": dict(key), "value": value}
+                        for key, value in series.items()
+                    ]
+                    for name, series in self._counters.items()
+                },
+            }
+
+    def prometheus_text(self) -> str:
+        """
+        Render every series in the Prometheus text exposition format.
+        """
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for key, hist in series.items():
+                    cumulative = 0
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_prom_labels(key, le=repr(float(bound)))} {cumulative}")
+                    lines.append(f"{name}_bucket{_prom_labels(key, le='+Inf')} {hist.count}")
+                    lines.append(f"{name}_sum{_prom_labels(key)} {hist.sum}")
+                    lines.append(f"{name}_count{_prom_labels(key)} {hist.count}")
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{_prom_labels(key)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+def _prom_labels(key: LabelKey, **extra: str) -> str:
+    pairs = list(key) + sorted(extra.items())
+    if not pairs:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"')) for k, v in pairs
+    )
+    return "{" + body + "}"
+
+
+REGISTRY = MetricsRegistry()
+
+
+# ----------------------------------------------------------------------
+# Spans
+# ----------------------------------------------------------------------
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("labels", "start", "duration")
+
+    def __init__(self, labels: Dict[str, Any]) -> None:
+        self.labels = labels
+        self.start = 0.0
+        self.duration: Optional[float] = None
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.duration = time.perf_counter() - self.start
+        REGISTRY.observe(SPAN_METRIC, self.duration, self.labels)
+        if exc_type is not None:
+            REGISTRY.inc(SPAN_ERRORS_METRIC, 1, {**self.labels, "error": exc_type.__name__})
+
+
+def span(name: str, **labels: Any):
+    """
+    Time the enclosed block as pipeline stage `name`.
+
+        with span("retriever.retrieve"):
+            ...
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span({"span": name, **labels})
+
+
+def count(name: str, amount: float = 1.0, **labels: Any) -> None:
+    """
+    Increment counter `name` (no-op while metrics are disabled).
+    """
+    if _enabled:
+        REGISTRY.inc(name, amount, labels)
+
+
+def record_usage(response: Any, **labels: Any) -> None:
+    """
+    Record token counts from a Gemini response's `usage_metadata`.
+
+    Missing metadata (or missing individual counts) is silently ignored.
+    """
+    if not _enabled:
+        return
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    for kind, attr in (
+        ("prompt", "prompt_token_count"),
+        ("output", "candidates_token_count"),
+        ("total", "total_token_count"),
+    ):
+        value = getattr(usage, attr, None)
+        if value:
+            REGISTRY.inc(TOKENS_METRIC, value, {**labels, "kind": kind})
+    total = getattr(usage, "total_token_count", None)
+    if total:
+        REGISTRY.observe(TOKENS_PER_CALL_METRIC, total, labels, buckets=DEFAULT_TOKEN_BUCKETS)
+
+
+# ----------------------------------------------------------------------
+# Switches and exposition
+# ----------------------------------------------------------------------
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def snapshot() -> Dict[str, Any]:
+    return REGISTRY.snapshot()
+
+
+def prometheus_text() -> str:
+    return REGISTRY.prometheus_text()
+
+
+def dump(path: str) -> None:
+    """
+    Write the current metrics to `path`: Prometheus text for `.prom`/`.txt`,
+    JSON otherwise.
+    """
+    if path.lower().endswith((".prom", ".txt")):
+        payload = prometheus_text()
+    else:
+        payload = json.dumps(snapshot(), indent=2)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(payload)
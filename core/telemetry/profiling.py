@@ -0,0 +1,285 @@
+"""
+On-demand CPU and memory profiling of agent turns, auctions and ingest runs.
+
+`profile(label)` wraps one unit of work (a Must agent turn, an auction lot,
+a vectorization run) with `cProfile` and `tracemalloc` and writes a report
+for it into the profile directory:
+
+- `<n>-<label>.txt`: wall / CPU time, peak traced memory, the top functions
+  by cumulative time and the top allocation sites (net bytes by line)
+- `<n>-<label>.prof`: the raw `pstats` data (for `snakeviz`, `pstats`, ...)
+
+Profiling is off by default. Turn it on with `TELEHELPER_PROFILE=<dir>` (or
+the entrypoints' `--profile DIR` flag / `configure()`); only the first
+`TELEHELPER_PROFILE_LIMIT` units (default 10) are profiled.
+`TELEHELPER_PROFILE_MEMORY=0` skips tracemalloc, which slows allocation-heavy
+code down noticeably, and `TELEHELPER_PROFILE_TOP` sets the report length.
+
+When it is off, `profile()` hands back one shared no-op context manager,
+like `metrics.span()`, so the hooks can stay in place; `cProfile` and
+`tracemalloc` are not even imported.
+
+`cProfile` only sees the thread that entered `profile()`, and tracemalloc
+is process-wide, so one unit is profiled at a time: units that start while
+another is being profiled run unprofiled and do not count towards the limit.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+_SAFE_LABEL_RE = re.compile(r"[^\w.-]+")
+
+
+@dataclass
+class ProfileConfig:
+    """
+    - directory: where reports are written (created if missing).
+    - limit: number of units profiled, then profiling stops.
+    - memory: also trace allocations with tracemalloc.
+    - top: functions / allocation sites listed per report.
+    """
+
+    directory: str
+    limit: int = 10
+    memory: bool = True
+    top: int = 25
+
+    @classmethod
+    def from_env(cls) -> Optional["ProfileConfig"]:
+        directory = os.getenv("TELEHELPER_PROFILE", "").strip()
+        if not directory:
+            return None
+        return cls(
+            directory=directory,
+            limit=int(os.getenv("TELEHELPER_PROFILE_LIMIT", "10")),
+            memory=os.getenv("TELEHELPER_PROFILE_MEMORY", "1").lower() not in ("0", "false", "no"),
+            top=int(os.getenv("TELEHELPER_PROFILE_TOP", "25")),
+        )
+
+
+class _NullProfile:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullProfile":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+_NULL_PROFILE = _NullProfile()
+
+
+class Profiler:
+    """
+    Hands out `_Profile` context managers until `config.limit` is reached.
+    """
+
+    def __init__(self, config: ProfileConfig) -> None:
+        self.config = config
+        self.profiled = 0
+        self.skipped = 0
+        self._busy = threading.Lock()
+        self._count_lock = threading.Lock()
+        os.makedirs(config.directory, exist_ok=True)
+
+    @property
+    def exhausted(self) -> bool:
+        return self.profiled >= self.config.limit
+
+    def profile(self, label: str):
+        if self.exhausted:
+            return _NULL_PROFILE
+        if not self._busy.acquire(blocking=False):
+            self.skipped += 1
+            return _NULL_PROFILE
+        with self._count_lock:
+            if self.exhausted:
+                self._busy.release()
+                return _NULL_PROFILE
+            self.profiled += 1
+            sequence = self.profiled
+        return _Profile(self, label, sequence)
+
+
+class _Profile:
+    def __init__(self, profiler: Profiler, label: str, sequence: int) -> None:
+        self.profiler = profiler
+        self.label = label
+        self.sequence = sequence
+        self.report_path: Optional[str] = None
+
+    def __enter__(self) -> "_Profile":
+        try:
+            self._start()
+        except BaseException:
+            self.profiler._busy.release()
+            raise
+        return self
+
+    def _start(self) -> None:
+        import cProfile
+
+        config = self.profiler.config
+        self._started_tracemalloc = False
+        self._before: Any = None
+        if config.memory:
+            import tracemalloc
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            tracemalloc.reset_peak()
+            self._before = tracemalloc.take_snapshot()
+
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._profile.disable()
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        try:
+            self._write(wall, cpu, exc_type)
+        except Exception as e:
+            # A failed report must not fail the profiled work.
+            print(f"[Profiling] Could not write report for {self.label}: {e}")
+        finally:
+            if self._started_tracemalloc:
+                import tracemalloc
+
+                tracemalloc.stop()
+            self.profiler._busy.release()
+        return None
+
+    def _write(self, wall: float, cpu: float, exc_type: Any) -> None:
+        import pstats
+
+        config = self.profiler.config
+        name = f"{self.sequence:03d}-{_SAFE_LABEL_RE.sub('_', self.label)[:80]}"
+        base = os.path.join(config.directory, name)
+
+        out = io.StringIO()
+        out.write(f"label: {self.label}\n")
+        out.write(f"wall_s: {wall:.4f}\ncpu_s: {cpu:.4f}\n")
+        if exc_type is not None:
+            out.write(f"error: {exc_type.__name__}\n")
+
+        allocations = None
+        if self._before is not None:
+            import tracemalloc
+
+            current, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+            noise = (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            )
+            allocations = after.filter_traces(noise).compare_to(
+                self._before.filter_traces(noise), "lineno"
+            )
+            net = sum(stat.size_diff for stat in allocations)
+            out.write(f"peak_traced_bytes: {peak}\nnet_allocated_bytes: {net}\n")
+
+        out.write(f"\n== Top {config.top} functions by cumulative time ==\n")
+        stats = pstats.Stats(self._profile, stream=out)
+        stats.sort_stats("cumulative").print_stats(config.top)
+        stats.dump_stats(base + ".prof")
+
+        if allocations is not None:
+            out.write(f"\n== Top {config.top} allocation sites (net bytes) ==\n")
+            for stat in allocations[: config.top]:
+                frame = stat.traceback[0]
+                out.write(
+                    f"{stat.size_diff:>12,d} B  {stat.count_diff:>+8d} blocks  "
+                    f"{frame.filename}:{frame.lineno}\n"
+                )
+
+        self.report_path = base + ".txt"
+        with open(self.report_path, "w", encoding="utf-8") as f:
+            f.write(out.getvalue())
+        print(f"[Profiling] {self.label}: {wall * 1000:.1f} ms -> {self.report_path}")
+
+
+# ----------------------------------------------------------------------
+# Process-wide profiler
+# ----------------------------------------------------------------------
+
+_config_from_env = ProfileConfig.from_env()
+_profiler: Optional[Profiler] = Profiler(_config_from_env) if _config_from_env else None
+
+
+def configure(config: Optional[ProfileConfig]) -> Optional[Profiler]:
+    """
+    Turn profiling on with `config`, or off with None.
+    """
+    global _profiler
+    _profiler = Profiler(config) if config is not None else None
+    return _profiler
+
+
+def is_enabled() -> bool:
+    return _profiler is not None and not _profiler.exhausted
+
+
+def profile(label: str):
+    """
+    Profile the enclosed block as unit `label` (a no-op when profiling is
+    off, the limit is reached or another unit is being profiled).
+
+        with profile("must_agent.ask"):
+            ...
+    """
+    if _profiler is None:
+        return _NULL_PROFILE
+    return _profiler.profile(label)
+
+
+# ----------------------------------------------------------------------
+# CLI flags
+# ----------------------------------------------------------------------
+
+
+def add_profile_arguments(parser: Any) -> None:
+    """
+    `--profile DIR` / `--profile-limit N` for an entrypoint's argparse parser.
+    """
+    group = parser.add_argument_group("profiling")
+    group.add_argument(
+        "--profile",
+        metavar="DIR",
+        default=None,
+        help="Write cProfile/tracemalloc reports to DIR (default: TELEHELPER_PROFILE).",
+    )
+    group.add_argument(
+        "--profile-limit",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Units profiled before profiling stops (default: TELEHELPER_PROFILE_LIMIT or 10).",
+    )
+
+
+def configure_from_args(args: Any) -> Optional[Profiler]:
+    """
+    Configure from the environment (re-read, for `.env` files loaded after
+    import) with the `add_profile_arguments` flags on top.
+    """
+    config = ProfileConfig.from_env()
+    if args.profile is not None:
+        config = config or ProfileConfig(directory=args.profile)
+        config.directory = args.profile
+    if config is None:
+        return configure(None)
+    if args.profile_limit is not None:
+        config.limit = args.profile_limit
+    return configure(config)
@@ -0,0 +1,359 @@
+"""
+Sampled, asynchronous tracing of LLM calls.
+
+`langsmith.wrappers.wrap_gemini` traces every call, on the calling thread.
+This module keeps tracing cheap enough to leave on under load:
+
+- `TracingClient` wraps any Gemini client (see `core.llm.wrappers`) and
+  traces a `sample_rate` fraction of `generate_content` / `embed_content`
+  calls; unsampled calls pay for one `random()` call
+- finished traces go into a bounded in-process ring buffer (the oldest are
+  dropped and counted when it is full), never to I/O on the request path
+- a background exporter thread drains the buffer in batches every
+  `flush_interval_s` (or as soon as `batch_size` traces are waiting) and
+  hands them to a sink: `JsonlFileSink` (local file) or `LangSmithSink`
+
+Configuration comes from the environment (`TraceConfig.from_env`):
+
+- `TELEHELPER_TRACING`: "langsmith" (default, the previous `wrap_gemini`
+  behaviour), "sampled" (this module) or "off"
+- `TELEHELPER_TRACE_SAMPLE`: fraction of calls traced (default 0.1)
+- `TELEHELPER_TRACE_FILE`: JSONL sink path (default `traces.jsonl`)
+- `TELEHELPER_TRACE_SINK`: "file" (default) or "langsmith"
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from core.llm.wrappers import ClientWrapper
+
+TRACING_MODES = ("langsmith", "sampled", "off")
+
+
+@dataclass
+class TraceConfig:
+    """
+    - sample_rate: fraction of calls traced (0 disables, 1 traces all).
+    - buffer_size: traces kept in memory before the oldest are dropped.
+    - batch_size: traces handed to the sink per write.
+    - flush_interval_s: exporter wake-up period.
+    - capture_chars: characters of prompt / response text kept per trace
+      (0 keeps none).
+    - background: export from a thread; False writes on the calling thread
+      (only useful to measure what the exporter saves).
+    """
+
+    sample_rate: float = 0.1
+    buffer_size: int = 4096
+    batch_size: int = 256
+    flush_interval_s: float = 1.0
+    capture_chars: int = 500
+    background: bool = True
+
+    def __post_init__(self) -> None:
+        if not 0.0 <= self.sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0 and 1")
+        if self.buffer_size < 1 or self.batch_size < 1:
+            raise ValueError("buffer_size and batch_size must be >= 1")
+
+    @classmethod
+    def from_env(cls) -> "TraceConfig":
+        return cls(sample_rate=float(os.getenv("TELEHELPER_TRACE_SAMPLE", "0.1")))
+
+
+def tracing_mode() -> str:
+    mode = os.getenv("TELEHELPER_TRACING", "langsmith").strip().lower()
+    if mode not in TRACING_MODES:
+        raise ValueError(f"TELEHELPER_TRACING must be one of {TRACING_MODES}, got {mode!r}")
+    return mode
+
+
+# ----------------------------------------------------------------------
+# Sinks
+# ----------------------------------------------------------------------
+
+
+class JsonlFileSink:
+    """
+    Append traces to a local JSONL file, one trace per line.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, batch: List[Dict[str, Any]]) -> None:
+        self._file.write("".join(json.dumps(t, default=str) + "\n" for t in batch))
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class LangSmithSink:
+    """
+    Send traces to LangSmith as root `llm` runs with `batch_ingest_runs`.
+
+    Uses the usual LangSmith environment variables (`LANGSMITH_API_KEY`,
+    `LANGSMITH_PROJECT`, ...).
+    """
+
+    def __init__(self, project_name: Optional[str] = None) -> None:
+        from langsmith import Client
+
+        self._client = Client()
+        self.project_name = project_name or os.getenv("LANGSMITH_PROJECT", "default")
+
+    def write(self, batch: List[Dict[str, Any]]) -> None:
+        from datetime import datetime, timezone
+
+        runs = []
+        for t in batch:
+            start = datetime.fromtimestamp(t["start_time"], tz=timezone.utc)
+            end = datetime.fromtimestamp(t["start_time"] + t["duration_s"], tz=timezone.utc)
+            runs.append(
+                {
+                    "id": t["id"],
+                    "trace_id": t["id"],
+                    "dotted_order": f"{start:%Y%m%dT%H%M%S%fZ}{t['id']}",
+                    "name": t["name"],
+                    "run_type": "llm",
+                    "inputs": {"model": t.get("model"), "input": t.get("input")},
+                    "outputs": {"output": t.get("output")},
+                    "error": t.get("error"),
+                    "start_time": start,
+                    "end_time": end,
+                    "session_name": self.project_name,
+                    "extra": {"metadata": {"usage": t.get("usage"), "thread": t.get("thread")}},
+                }
+            )
+        self._client.batch_ingest_runs(create=runs)
+
+    def close(self) -> None:
+        self._client.flush()
+
+
+# ----------------------------------------------------------------------
+# Tracer
+# ----------------------------------------------------------------------
+
+
+class Tracer:
+    """
+    Sampling decision, ring buffer and background exporter.
+    """
+
+    def __init__(self, config: Optional[TraceConfig] = None, sink: Any = None) -> None:
+        self.config = config or TraceConfig()
+        self.sink = sink
+        self.buffer: Deque[Dict[str, Any]] = deque(maxlen=self.config.buffer_size)
+        self.sampled = 0
+        self.dropped = 0
+        self.exported = 0
+        self.export_errors = 0
+        self._random = random.Random()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._write_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        if self.config.background and sink is not None:
+            self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+            self._thread.start()
+
+    def should_sample(self) -> bool:
+        rate = self.config.sample_rate
+        return rate >= 1.0 or (rate > 0.0 and self._random.random() < rate)
+
+    def record(self, trace: Dict[str, Any]) -> None:
+        self.sampled += 1
+        if not self.config.background:
+            self._export([trace])
+            return
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        self.buffer.append(trace)
+        if len(self.buffer) >= self.config.batch_size:
+            self._wake.set()
+
+    def flush(self) -> None:
+        """
+        Export everything buffered so far (on the calling thread).
+        """
+        while self.buffer:
+            self._export(self._drain())
+
+    def close(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+        self.flush()
+        if self.sink is not None and hasattr(self.sink, "close"):
+            self.sink.close()
+            self.sink = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "sampled": self.sampled,
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "buffered": len(self.buffer),
+            "export_errors": self.export_errors,
+        }
+
+    def _drain(self) -> List[Dict[str, Any]]:
+        batch: List[Dict[str, Any]] = []
+        try:
+            while len(batch) < self.config.batch_size:
+                batch.append(self.buffer.popleft())
+        except IndexError:
+            pass
+        return batch
+
+    def _export(self, batch: List[Dict[str, Any]]) -> None:
+        if not batch or self.sink is None:
+            return
+        with self._write_lock:
+            try:
+                self.sink.write([_finish(t, self.config.capture_chars) for t in batch])
+                self.exported += len(batch)
+            except Exception as e:
+                # Tracing must never break the caller; count and move on.
+                self.export_errors += 1
+                print(f"[Tracing] Export of {len(batch)} trace(s) failed: {e}")
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.config.flush_interval_s)
+            self._wake.clear()
+            self.flush()
+
+
+# ----------------------------------------------------------------------
+# Client wrapper
+# ----------------------------------------------------------------------
+
+
+def _preview(value: Any, limit: int) -> Optional[str]:
+    if limit <= 0 or value is None:
+        return None
+    text = value if isinstance(value, str) else str(value)
+    return text[:limit]
+
+
+def _usage(response: Any) -> Optional[Dict[str, Any]]:
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return None
+    return {
+        "prompt": getattr(usage, "prompt_token_count", None),
+        "output": getattr(usage, "candidates_token_count", None),
+        "total": getattr(usage, "total_token_count", None),
+    }
+
+
+class TracingClient(ClientWrapper):
+    """
+    Client wrapper that records sampled calls into `tracer`.
+    """
+
+    def __init__(self, client: Any, tracer: Tracer) -> None:
+        super().__init__(client)
+        self.tracer = tracer
+
+    def generate_content(self, **kwargs: Any) -> Any:
+        call = self.wrapped.models.generate_content
+        if not self.tracer.should_sample():
+            return call(**kwargs)
+        return self._traced("generate_content", call, kwargs, lambda r: getattr(r, "text", None))
+
+    def embed_content(self, **kwargs: Any) -> Any:
+        call = self.wrapped.models.embed_content
+        if not self.tracer.should_sample():
+            return call(**kwargs)
+        return self._traced("embed_content", call, kwargs, lambda r: None)
+
+    def _traced(
+        self,
+        name: str,
+        call: Callable[..., Any],
+        kwargs: Dict[str, Any],
+        output_of: Callable[[Any], Any],
+    ) -> Any:
+        # Only references are taken here; ids, previews and token usage are
+        # worked out by the exporter (`_finish`), off the request path.
+        trace: Dict[str, Any] = {
+            "name": name,
+            "model": kwargs.get("model"),
+            "start_time": time.time(),
+            "thread": threading.current_thread().name,
+            "_input": kwargs.get("contents"),
+        }
+        start = time.perf_counter()
+        try:
+            response = call(**kwargs)
+        except Exception as e:
+            trace["duration_s"] = time.perf_counter() - start
+            trace["error"] = f"{type(e).__name__}: {e}"
+            self.tracer.record(trace)
+            raise
+        trace["duration_s"] = time.perf_counter() - start
+        trace["_response"] = response
+        trace["_output_of"] = output_of
+        self.tracer.record(trace)
+        return response
+
+
+def _finish(trace: Dict[str, Any], capture_chars: int) -> Dict[str, Any]:
+    """
+    Turn a recorded trace into its exported (JSON-ready) form.
+    """
+    trace["id"] = str(uuid.uuid4())
+    trace["input"] = _preview(trace.pop("_input", None), capture_chars)
+    response = trace.pop("_response", None)
+    output_of = trace.pop("_output_of", None)
+    if response is not None:
+        trace["output"] = _preview(output_of(response), capture_chars) if output_of else None
+        trace["usage"] = _usage(response)
+    return trace
+
+
+# ----------------------------------------------------------------------
+# Process-wide tracer
+# ----------------------------------------------------------------------
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """
+    The process-wide tracer built from the environment, closed (and
+    flushed) at interpreter exit.
+    """
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            if os.getenv("TELEHELPER_TRACE_SINK", "file").strip().lower() == "langsmith":
+                sink: Any = LangSmithSink()
+            else:
+                sink = JsonlFileSink(os.getenv("TELEHELPER_TRACE_FILE", "traces.jsonl"))
+            _tracer = Tracer(TraceConfig.from_env(), sink)
+            atexit.register(_tracer.close)
+        return _tracer
+
+
+def trace_client(client: Any, tracer: Optional[Tracer] = None) -> TracingClient:
+    return TracingClient(client, tracer or get_tracer())
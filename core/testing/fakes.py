@@ -0,0 +1,373 @@
+"""
+Fake `google.genai` clients: the shared test support for the benchmarks,
+the load test, the pytest suite and `main_auction_system --fake-latency`.
+
+They mimic the small surface of `genai.Client` the project actually uses:
+
+- `client.models.generate_content(model=..., contents=...)` returning an
+  object with `.text` and `.usage_metadata`
+- `client.models.embed_content(model=..., contents=...)` returning an object
+  with `.embeddings[i].values`
+
+Latency is simulated with `time.sleep`, so the numbers reflect our own
+overhead plus whatever network latency the benchmark configures: a fixed
+delay, or a `LatencyDistribution` (uniform, exponential, lognormal) for load
+tests. Calls can also fail at a configured rate with `FakeAPIError`.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import math
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token estimate (~4 characters per token), good enough for fakes.
+    """
+    return max(1, len(text) // 4)
+
+
+@dataclass
+class FakeUsageMetadata:
+    prompt_token_count: int
+    candidates_token_count: int
+    total_token_count: int
+
+
+@dataclass
+class FakeGenerateResponse:
+    text: str
+    usage_metadata: FakeUsageMetadata
+
+
+@dataclass
+class FakeEmbedding:
+    values: List[float]
+
+
+@dataclass
+class FakeEmbedResponse:
+    embeddings: List[FakeEmbedding]
+
+
+@functools.lru_cache(maxsize=4096)
+def hashed_embedding(text: str, dim: int) -> Tuple[float, ...]:
+    """
+    Deterministic bag-of-words embedding: each token is hashed into one of
+    `dim` buckets with a +/-1 sign, then the vector is L2-normalized.
+
+    Texts sharing vocabulary end up close to each other, which keeps
+    retrieval results meaningful without a real model. Results are cached so
+    the fake itself adds almost nothing to the measured time.
+    """
+    vec = [0.0] * dim
+    for token in _TOKEN_RE.findall(text.lower()):
+        digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+        bucket = int.from_bytes(digest[:4], "little") % dim
+        sign = 1.0 if digest[4] & 1 else -1.0
+        vec[bucket] += sign
+    norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+    return tuple(v / norm for v in vec)
+
+
+class FakeAPIError(RuntimeError):
+    """
+    Simulated transient API failure (like a 503 / 429 from Gemini).
+    """
+
+
+LATENCY_KINDS = ("fixed", "uniform", "exponential", "lognormal")
+
+
+class LatencyDistribution:
+    """
+    Random per-call latency.
+
+    - "fixed": always `scale_s`
+    - "uniform": between 0 and 2 * `scale_s` (mean `scale_s`)
+    - "exponential": mean `scale_s`
+    - "lognormal": median `scale_s`, log-space std `sigma` (long tail)
+
+    `parse("lognormal:0.8:0.5")` builds one from a `kind:scale[:sigma]`
+    string, as used on command lines.
+    """
+
+    def __init__(
+        self,
+        kind: str = "fixed",
+        scale_s: float = 0.0,
+        sigma: float = 0.5,
+        seed: Optional[int] = None,
+    ) -> None:
+        if kind not in LATENCY_KINDS:
+            raise ValueError(f"kind must be one of {LATENCY_KINDS}, got {kind!r}")
+        if scale_s < 0 or sigma < 0:
+            raise ValueError("scale_s and sigma must be >= 0")
+        self.kind = kind
+        self.scale_s = scale_s
+        self.sigma = sigma
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def parse(cls, spec: str, seed: Optional[int] = None) -> "LatencyDistribution":
+        parts = spec.split(":")
+        if len(parts) == 1:
+            return cls("fixed", float(parts[0]), seed=seed)
+        sigma = float(parts[2]) if len(parts) > 2 else 0.5
+        return cls(parts[0], float(parts[1]), sigma, seed=seed)
+
+    def sample(self) -> float:
+        if self.kind == "fixed" or self.scale_s == 0:
+            return self.scale_s
+        with self._lock:
+            if self.kind == "uniform":
+                return self._random.uniform(0.0, 2.0 * self.scale_s)
+            if self.kind == "exponential":
+                return self._random.expovariate(1.0 / self.scale_s)
+            return self._random.lognormvariate(math.log(self.scale_s), self.sigma)
+
+    def __repr__(self) -> str:
+        return f"LatencyDistribution({self.kind!r}, {self.scale_s}, sigma={self.sigma})"
+
+
+def _config_value(config: Any, name: str) -> Any:
+    if config is None:
+        return None
+    if isinstance(config, dict):
+        return config.get(name)
+    return getattr(config, name, None)
+
+
+class AuctionResponder:
+    """
+    Scripted replies for auction prompts.
+
+    Buyers (recognized by "your name is <Name>" in the prompt) climb a bid
+    ladder from `start_bid` in `step` increments and PASS once the next bid
+    would exceed `cap_ratio` of the budget found in the prompt. Any other
+    prompt (e.g. the orchestrator) gets a short acknowledgement.
+    """
+
+    _NAME_RE = re.compile(r"your name is (\w+)", re.IGNORECASE)
+    _BUDGET_RE = re.compile(r"Budget:\s*([\d,\.]+)\s*EUR", re.IGNORECASE)
+
+    def __init__(
+        self,
+        start_bid: float = 100_000,
+        step: float = 5_000,
+        cap_ratio: float = 0.95,
+    ) -> None:
+        self.start_bid = start_bid
+        self.step = step
+        self.cap_ratio = cap_ratio
+        self._next_bid: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._next_bid.clear()
+
+    def __call__(self, contents: str) -> str:
+        name_match = self._NAME_RE.search(contents)
+        if not name_match:
+            return "Acknowledged. Proceeding with the auction."
+
+        name = name_match.group(1)
+        budget_match = self._BUDGET_RE.search(contents)
+        budget = (
+            float(budget_match.group(1).replace(",", "").replace(".", ""))
+            if budget_match
+            else float("inf")
+        )
+
+        with self._lock:
+            bid = self._next_bid.get(name, self.start_bid)
+            if bid > budget * self.cap_ratio:
+                self._next_bid.pop(name, None)
+                return "PASS - the price is above my fair value."
+            self._next_bid[name] = bid + self.step
+
+        return f"BID: {bid:.0f} EUR - still below my estimated fair value."
+
+
+def default_responder(contents: str) -> str:
+    return "This is a simulated answer about the requested properties."
+
+
+class FakeModels:
+    def __init__(self, owner: "FakeGenaiClient") -> None:
+        self._owner = owner
+
+    def generate_content(
+        self,
+        *,
+        model: str,
+        contents: Union[str, List[Any]],
+        config: Any = None,
+    ) -> FakeGenerateResponse:
+        owner = self._owner
+        prompt = contents if isinstance(contents, str) else "\n".join(map(str, contents))
+        with owner._lock:
+            owner.generate_calls += 1
+            owner._enter("generate")
+        try:
+            latency = owner.generate_latency.sample() if owner.generate_latency else owner.generate_latency_s
+            if latency > 0:
+                time.sleep(latency)
+            owner._maybe_fail("generate", owner.generate_error_rate)
+        finally:
+            owner._leave("generate")
+
+        text = owner.responder(prompt)
+        prompt_tokens = estimate_tokens(prompt)
+        output_tokens = estimate_tokens(text)
+        return FakeGenerateResponse(
+            text=text,
+            usage_metadata=FakeUsageMetadata(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=output_tokens,
+                total_token_count=prompt_tokens + output_tokens,
+            ),
+        )
+
+    def embed_content(
+        self,
+        *,
+        model: str,
+        contents: Union[str, List[str]],
+        config: Any = None,
+    ) -> FakeEmbedResponse:
+        owner = self._owner
+        texts = [contents] if isinstance(contents, str) else list(contents)
+        with owner._lock:
+            owner.embed_calls += 1
+            owner.embedded_texts += len(texts)
+            owner._enter("embed")
+        try:
+            base = owner.embed_latency.sample() if owner.embed_latency else owner.embed_latency_s
+            latency = base + owner.embed_latency_per_item_s * len(texts)
+            if latency > 0:
+                time.sleep(latency)
+            owner._maybe_fail("embed", owner.embed_error_rate)
+        finally:
+            owner._leave("embed")
+
+        # Like the real API, `output_dimensionality` returns the leading
+        # components without re-normalizing them.
+        dim = _config_value(config, "output_dimensionality") or owner.embedding_dim
+        return FakeEmbedResponse(
+            embeddings=[
+                FakeEmbedding(values=list(hashed_embedding(t, owner.embedding_dim)[:dim]))
+                for t in texts
+            ]
+        )
+
+
+@dataclass
+class FakeGenaiClient:
+    """
+    Drop-in stand-in for `genai.Client` with configurable latencies.
+
+    - `generate_latency_s`: fixed delay per `generate_content` call
+    - `embed_latency_s`: fixed delay per `embed_content` call
+    - `embed_latency_per_item_s`: extra delay per text in an embed batch
+    - `generate_latency` / `embed_latency`: random per-call delay, used
+      instead of the fixed one when set
+    - `generate_error_rate` / `embed_error_rate`: share of calls raising
+      `FakeAPIError` (after their latency)
+    - `responder`: maps the prompt to the generated text
+
+    `in_flight` / `max_in_flight` count concurrent calls per kind
+    ("generate", "embed"), i.e. how deep the queue in front of the API gets.
+    """
+
+    generate_latency_s: float = 0.0
+    embed_latency_s: float = 0.0
+    embed_latency_per_item_s: float = 0.0
+    embedding_dim: int = 3072
+    responder: Callable[[str], str] = default_responder
+    generate_latency: Optional[LatencyDistribution] = None
+    embed_latency: Optional[LatencyDistribution] = None
+    generate_error_rate: float = 0.0
+    embed_error_rate: float = 0.0
+    seed: Optional[int] = None
+
+    generate_calls: int = field(default=0, init=False)
+    embed_calls: int = field(default=0, init=False)
+    embedded_texts: int = field(default=0, init=False)
+    errors: Dict[str, int] = field(default_factory=dict, init=False)
+    in_flight: Dict[str, int] = field(default_factory=dict, init=False)
+    max_in_flight: Dict[str, int] = field(default_factory=dict, init=False)
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+        self._random = random.Random(self.seed)
+        self.models = FakeModels(self)
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.generate_calls = 0
+            self.embed_calls = 0
+            self.embedded_texts = 0
+            self.errors.clear()
+            self.max_in_flight = dict(self.in_flight)
+
+    def _enter(self, kind: str) -> None:
+        # Called with `_lock` held.
+        current = self.in_flight.get(kind, 0) + 1
+        self.in_flight[kind] = current
+        if current > self.max_in_flight.get(kind, 0):
+            self.max_in_flight[kind] = current
+
+    def _leave(self, kind: str) -> None:
+        with self._lock:
+            self.in_flight[kind] -= 1
+
+    def _maybe_fail(self, kind: str, rate: float) -> None:
+        if rate <= 0:
+            return
+        with self._lock:
+            failed = self._random.random() < rate
+            if failed:
+                self.errors[kind] = self.errors.get(kind, 0) + 1
+        if failed:
+            raise FakeAPIError(f"503 UNAVAILABLE (simulated {kind} failure)")
+
+
+def make_fake_client(
+    *,
+    generate_latency_s: float = 0.0,
+    embed_latency_s: float = 0.0,
+    embed_latency_per_item_s: float = 0.0,
+    embedding_dim: int = 3072,
+    responder: Optional[Callable[[str], str]] = None,
+    generate_latency: Optional[LatencyDistribution] = None,
+    embed_latency: Optional[LatencyDistribution] = None,
+    generate_error_rate: float = 0.0,
+    embed_error_rate: float = 0.0,
+    seed: Optional[int] = None,
+) -> FakeGenaiClient:
+    return FakeGenaiClient(
+        generate_latency_s=generate_latency_s,
+        embed_latency_s=embed_latency_s,
+        embed_latency_per_item_s=embed_latency_per_item_s,
+        embedding_dim=embedding_dim,
+        responder=responder or default_responder,
+        generate_latency=generate_latency,
+        embed_latency=embed_latency,
+        generate_error_rate=generate_error_rate,
+        embed_error_rate=embed_error_rate,
+        seed=seed,
+    )
@@ -0,0 +1,352 @@
+"""
+Batch question answering with the Must agent.
+
+Reads prepared questions from JSONL, one per line:
+
+    {"id": "q1", "question": "Two-bedroom flat in Lozenets?", "conversation_id": "c7"}
+
+- `id` is optional (defaults to `line-<n>`) and must be unique
+- lines sharing a `conversation_id` form one multi-turn thread, asked in
+  file order to one agent; a line without it is a conversation of its own
+
+and writes one JSONL line per answered item (`id`, `conversation_id`,
+`turn`, `question`, `answer`, `error`, `context`, `seconds`).
+
+- Conversations run concurrently on a bounded worker pool (`workers`);
+  the turns of one conversation run in order.
+- Questions are embedded in batches of `embed_batch` per call
+  (`PropertyRetriever.embed_queries`) before their conversations start, and
+  the vectors are passed to `MustAgent.ask`, instead of one embedding call
+  per question. Only two batches are in memory at a time.
+- The run can be interrupted and started again with the same arguments:
+  items already in the output without an error are skipped, and the
+  answered turns of a conversation are replayed into its `State` so the
+  remaining turns see the same history. The last replayed turn that
+  retrieved is retrieved again (`MustAgent.restore_retrieval`), so
+  follow-ups reuse the same context as in an uninterrupted run. Items that
+  failed (including timeout, budget and details replies) are asked again.
+
+    python -m exec.main_must_agent --batch questions.jsonl --output answers.jsonl --workers 16
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from agents.must.must_agent import MustAgent
+
+
+@dataclass
+class BatchItem:
+    id: str
+    question: str
+    conversation_id: str
+    turn: int
+
+
+def load_items(path: str) -> List[BatchItem]:
+    """
+    Parse the input JSONL (blank lines are ignored).
+    """
+    items: List[BatchItem] = []
+    turns: Dict[str, int] = {}
+    seen = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_no}: invalid JSON ({e})") from None
+            question = str(record.get("question") or "").strip()
+            if not question:
+                raise ValueError(f"{path}:{line_no}: missing 'question'")
+            item_id = str(record.get("id") or f"line-{line_no}")
+            if item_id in seen:
+                raise ValueError(f"{path}:{line_no}: duplicate id {item_id!r}")
+            seen.add(item_id)
+            conversation_id = str(record.get("conversation_id") or item_id)
+            turn = turns.get(conversation_id, 0)
+            turns[conversation_id] = turn + 1
+            items.append(BatchItem(item_id, question, conversation_id, turn))
+    return items
+
+
+def load_done(path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Items already answered without an error in an earlier run's output.
+    A line cut short by an interruption is ignored.
+    """
+    done: Dict[str, Dict[str, Any]] = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("error") is None and record.get("answer") is not None:
+                done[str(record["id"])] = record
+    return done
+
+
+class _JsonlWriter:
+    def __init__(self, path: str) -> None:
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # Start on a fresh line if the last run was cut mid-write.
+        needs_newline = False
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+        self._file = open(path, "a", encoding="utf-8")
+        if needs_newline:
+            self._file.write("\n")
+        self._lock = threading.Lock()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+@dataclass
+class BatchReport:
+    items: int
+    skipped: int
+    answered: int
+    errors: int
+    embed_calls: int
+    wall_s: float
+    interrupted: bool = False
+
+    def print(self) -> None:
+        rate = self.answered / self.wall_s if self.wall_s else 0.0
+        print(
+            f"[Batch] {self.answered} answered, {self.errors} failed, "
+            f"{self.skipped} already done (of {self.items}) in {self.wall_s:.1f}s "
+            f"({rate:.2f}/s, {self.embed_calls} embedding batch(es))"
+        )
+        if self.interrupted:
+            print("[Batch] Interrupted; run the same command again to resume.")
+
+
+class BatchRunner:
+    """
+    `agent_factory()` returns a fresh `MustAgent` per conversation (sharing
+    the client, retriever and answer cache).
+    """
+
+    def __init__(
+        self,
+        agent_factory: Callable[[], MustAgent],
+        *,
+        workers: int = 8,
+        embed_batch: int = 100,
+    ) -> None:
+        if workers < 1 or embed_batch < 1:
+            raise ValueError("workers and embed_batch must be >= 1")
+        self.agent_factory = agent_factory
+        self.workers = workers
+        self.embed_batch = embed_batch
+        self._stop = threading.Event()
+        self._embed_calls = 0
+
+    def run(self, items: List[BatchItem], output_path: str) -> BatchReport:
+        started = time.perf_counter()
+        done = load_done(output_path)
+        conversations: Dict[str, List[BatchItem]] = {}
+        for item in items:
+            conversations.setdefault(item.conversation_id, []).append(item)
+        pending = [
+            turns for turns in conversations.values() if any(t.id not in done for t in turns)
+        ]
+
+        probe = self.agent_factory()
+        retriever = probe.retriever if probe.config.use_rag else None
+
+        counts = {"answered": 0, "errors": 0}
+        counts_lock = threading.Lock()
+        writer = _JsonlWriter(output_path)
+        pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="batch")
+        self._stop.clear()
+        self._embed_calls = 0
+        interrupted = False
+
+        def run_conversation(turns: List[BatchItem], vectors: Dict[str, Any]) -> None:
+            agent = self.agent_factory()
+            # Token budgets and totals are per conversation.
+            agent.session_id = turns[0].conversation_id
+            try:
+                ask_turns(agent, turns, vectors)
+            finally:
+                agent.end_session()
+
+        def ask_turns(agent: MustAgent, turns: List[BatchItem], vectors: Dict[str, Any]) -> None:
+            # Last replayed turn that retrieved, and the follow-ups reusing it.
+            replay_query: Optional[str] = None
+            replay_reused = 0
+            for item in turns:
+                if self._stop.is_set():
+                    return
+                previous = done.get(item.id)
+                if previous is not None:
+                    agent.state.add_turn(item.question, previous["answer"])
+                    if previous.get("context") == "retrieved":
+                        replay_query, replay_reused = item.question, 0
+                    elif previous.get("context") == "reused":
+                        replay_reused += 1
+                    continue
+                if replay_query is not None:
+                    self._restore_context(agent, replay_query, replay_reused)
+                    replay_query = None
+                record = self._ask(agent, item, vectors.get(item.id))
+                writer.write(record)
+                with counts_lock:
+                    counts["errors" if record["error"] else "answered"] += 1
+
+        try:
+            in_flight: List[Future] = []
+            for chunk in self._chunks(pending, done):
+                vectors = self._embed(retriever, chunk, done)
+                submitted = [pool.submit(run_conversation, turns, vectors) for turns in chunk]
+                # Embed the next chunk while this one runs; wait for the one before.
+                for future in in_flight:
+                    future.result()
+                in_flight = submitted
+            for future in in_flight:
+                future.result()
+        except KeyboardInterrupt:
+            interrupted = True
+            self._stop.set()
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            writer.close()
+
+        return BatchReport(
+            items=len(items),
+            skipped=sum(1 for item in items if item.id in done),
+            answered=counts["answered"],
+            errors=counts["errors"],
+            embed_calls=self._embed_calls,
+            wall_s=time.perf_counter() - started,
+            interrupted=interrupted,
+        )
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _chunks(self, conversations: List[List[BatchItem]], done: Dict[str, Any]):
+        """
+        Whole conversations, grouped so each group has about `embed_batch`
+        questions still to ask.
+        """
+        chunk: List[List[BatchItem]] = []
+        size = 0
+        for turns in conversations:
+            chunk.append(turns)
+            size += sum(1 for t in turns if t.id not in done)
+            if size >= self.embed_batch:
+                yield chunk
+                chunk, size = [], 0
+        if chunk:
+            yield chunk
+
+    def _embed(
+        self,
+        retriever: Any,
+        chunk: List[List[BatchItem]],
+        done: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        if retriever is None:
+            return {}
+        todo = [t for turns in chunk for t in turns if t.id not in done]
+        vectors: Dict[str, Any] = {}
+        for start in range(0, len(todo), self.embed_batch):
+            part = todo[start : start + self.embed_batch]
+            try:
+                self._embed_calls += 1
+                matrix = retriever.embed_queries([t.question for t in part])
+            except Exception as e:
+                # The agent embeds these questions itself, one call each.
+                print(f"[Batch] Embedding {len(part)} question(s) failed: {e}")
+                continue
+            vectors.update((t.id, row) for t, row in zip(part, matrix))
+        return vectors
+
+    @staticmethod
+    def _restore_context(agent: MustAgent, query: str, reused: int) -> None:
+        try:
+            agent.restore_retrieval(query, reused)
+        except Exception as e:
+            # The next turn then retrieves on its own.
+            print(f"[Batch] Could not restore the context of {agent.session_id}: {e}")
+
+    @staticmethod
+    def _ask(agent: MustAgent, item: BatchItem, query_vector: Any) -> Dict[str, Any]:
+        retrievals, reuses, timeouts = agent.retrievals, agent.reuses, agent.timeouts
+        rejections, details_failures = agent.rejections, agent.details_failures
+        answer: Optional[str] = None
+        error: Optional[str] = None
+        start = time.perf_counter()
+        try:
+            answer = agent.ask(item.question, query_vector=query_vector)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        seconds = time.perf_counter() - start
+        if agent.timeouts > timeouts:
+            # The canned timeout reply; asked again on resume.
+            error = "CallTimeout: answered with the timeout reply"
+        elif agent.rejections > rejections:
+            error = "BudgetExceeded: answered with the budget reply"
+        elif agent.details_failures > details_failures:
+            # Not recorded in the agent's State either, so never replayed.
+            error = "NeedDetails: answered with the details reply"
+
+        if agent.reuses > reuses:
+            context = "reused"
+        elif agent.retrievals > retrievals:
+            context = "retrieved"
+        else:
+            context = None
+        return {
+            "id": item.id,
+            "conversation_id": item.conversation_id,
+            "turn": item.turn,
+            "question": item.question,
+            "answer": answer,
+            "error": error,
+            "context": context,
+            "seconds": round(seconds, 4),
+        }
+
+
+def run_batch(
+    agent_factory: Callable[[], MustAgent],
+    input_path: str,
+    output_path: str,
+    *,
+    workers: int = 8,
+    embed_batch: int = 100,
+) -> BatchReport:
+    items = load_items(input_path)
+    print(f"[Batch] {len(items)} question(s) from {input_path} -> {output_path}")
+    report = BatchRunner(agent_factory, workers=workers, embed_batch=embed_batch).run(
+        items, output_path
+    )
+    report.print()
+    return report
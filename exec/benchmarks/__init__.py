@@ -0,0 +1,9 @@
+"""
+Benchmark suite package.
+
+Benchmarks run against fake Gemini / embedding clients (see `core/testing/fakes.py`), so
+they need no API key and measure only our own overhead plus a configurable,
+simulated network latency. Run them via:
+
+    python -m exec.benchmarks.run_benchmarks
+"""
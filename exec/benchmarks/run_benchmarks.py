@@ -0,0 +1,1183 @@
+"""
+Benchmark runner for the project's hot paths.
+
+Covered paths:
+- `Embedder.embed_texts` at several batch sizes
+- `vectorize_directory` throughput into a temporary Chroma store
+- snapshot export / import of that store (restore without embedding calls)
+- `PropertyRetriever.retrieve` latency against a temporary Chroma store
+- lazy retrieval (ids + metadata from Chroma, texts from the memory-mapped
+  document store) against texts returned by Chroma
+- region-sharded retrieval: routed to one shard, fanned out to all, and
+  the same corpus in a single collection
+- `MustAgent.ask` end-to-end overhead
+- the Must agent's semantic answer cache on repeated / paraphrased questions
+- prompt size with ingest-time listing digests against full listings
+- `State.conversation_text` at large history sizes
+- full `AuctionSystem.run_single_auction` runs
+- auction event streams: bus overhead, a stalled subscriber, time to the
+  first streamed event
+- token accounting: ledger overhead per call, and auction tokens without
+  and with a per-auction budget (degraded / rejected calls)
+- `core.telemetry.metrics.span` overhead, enabled and disabled
+- sampled / asynchronous LLM tracing overhead per call, per mode
+- LLM call policy: tail latency with deadlines and hedged requests
+- the vectorized Monte Carlo auction simulator
+
+All Gemini traffic goes to the fake clients in `core/testing/fakes.py`. Results are
+written as JSON and compared against a baseline file, so regressions show
+up as ratios > `--tolerance`.
+
+Usage:
+
+    python -m exec.benchmarks.run_benchmarks
+    python -m exec.benchmarks.run_benchmarks --only retrieve --repeat 20
+    python -m exec.benchmarks.run_benchmarks --update-baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Callable, Dict, List, Optional
+
+from core.testing.fakes import AuctionResponder, make_fake_client
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+PROPERTIES_DIR = os.path.join(PROJECT_ROOT, "documents", "properties")
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+BENCH_COLLECTION_NAME = "bench_properties"
+
+
+@dataclass
+class BenchConfig:
+    repeat: int = 5
+    generate_latency_s: float = 0.0
+    embed_latency_s: float = 0.0
+    embed_latency_per_item_s: float = 0.0
+    embedding_dim: int = 3072
+
+    def fake_client(self, **overrides: Any):
+        params = {
+            "generate_latency_s": self.generate_latency_s,
+            "embed_latency_s": self.embed_latency_s,
+            "embed_latency_per_item_s": self.embed_latency_per_item_s,
+            "embedding_dim": self.embedding_dim,
+        }
+        params.update(overrides)
+        return make_fake_client(**params)
+
+
+BenchFn = Callable[[BenchConfig], Dict[str, Dict[str, Any]]]
+BENCHMARKS: Dict[str, BenchFn] = {}
+
+
+def benchmark(name: str) -> Callable[[BenchFn], BenchFn]:
+    def register(fn: BenchFn) -> BenchFn:
+        BENCHMARKS[name] = fn
+        return fn
+
+    return register
+
+
+# ----------------------------------------------------------------------
+# Helpers
+# ----------------------------------------------------------------------
+
+
+def summarize(samples: List[float]) -> Dict[str, Any]:
+    """
+    Reduce raw timings (seconds) to the stats stored in the JSON report.
+    """
+    ordered = sorted(samples)
+    p95_index = min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))
+    return {
+        "iterations": len(ordered),
+        "median_s": statistics.median(ordered),
+        "mean_s": statistics.fmean(ordered),
+        "p95_s": ordered[p95_index],
+        "min_s": ordered[0],
+        "max_s": ordered[-1],
+    }
+
+
+def time_calls(fn: Callable[[], Any], repeat: int, warmup: int = 1) -> Dict[str, Any]:
+    for _ in range(warmup):
+        fn()
+    samples: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def load_corpus() -> Dict[str, str]:
+    corpus: Dict[str, str] = {}
+    for file_name in sorted(os.listdir(PROPERTIES_DIR)):
+        if file_name.lower().endswith(".txt"):
+            with open(os.path.join(PROPERTIES_DIR, file_name), "r", encoding="utf-8") as f:
+                corpus[file_name] = f.read()
+    return corpus
+
+
+def temp_chroma_dir() -> tempfile.TemporaryDirectory:
+    return tempfile.TemporaryDirectory(prefix="bench_chroma_", ignore_cleanup_errors=True)
+
+
+def build_retriever(cfg: BenchConfig, location: str):
+    """
+    Populate a temporary Chroma store with the sample corpus and return a
+    `PropertyRetriever` (plus the fake client) pointed at it.
+    """
+    from core.database.embedder import Embedder
+    from core.database.vectorstore.prop_chroma import ChromaOperator
+    from core.database.vectorstore.prop_retriever import PropertyRetriever
+    from core.database.vectorstore.prop_vectorization import vectorize_directory
+
+    client = cfg.fake_client()
+    embedder = Embedder("gemini-embedding-001", client=client)
+    chroma = ChromaOperator(location=location, collection_name=BENCH_COLLECTION_NAME)
+    vectorize_directory(PROPERTIES_DIR, embedder=embedder, chroma=chroma)
+    retriever = PropertyRetriever(
+        location=location,
+        collection_name=BENCH_COLLECTION_NAME,
+        embedder=embedder,
+        chroma=chroma,
+    )
+    return retriever, client
+
+
+QUERIES = [
+    "Two-bedroom apartment in Lozenets with parking",
+    "cheapest flat near a metro station",
+    "family maisonette with garden and garage",
+    "renovated studio in the center of Sofia",
+    "apartment with gas heating and a balcony",
+]
+
+
+# ----------------------------------------------------------------------
+# Benchmarks
+# ----------------------------------------------------------------------
+
+
+@benchmark("embed_texts")
+def bench_embed_texts(cfg: BenchConfig) -> Dict[str, Dict[str, Any]]:
+    from core.database.embedder import Embedder
+
+    docs = list(load_corpus().values())
+    embedder = Embedder("gemini-embedding-001", client=cfg.fake_client())
+    results: Dict[str, Dict[str, Any]] = {}
+    for batch_size in (1, 10, 30, 100):
+        texts = [docs[i % len(docs)] for i in range(batch_size)]
+        stats = time_calls(lambda: embedder.embed_texts(texts), cfg.repeat)
+        stats["items"] = batch_size
+        stats["per_item_s"] = stats["median_s"] / batch_size
+        results[f"embed_texts[batch={batch_size}]"] = stats
+    return results
+
+
+@benchmark("vectorize_directory")
+def bench_vectorize_directory(cfg: BenchConfig) -> Dict[str, Dict[str, Any]]:
+    from core.database.embedder import Embedder
+    from core.database.vectorstore.prop_chroma import ChromaOperator
+    from core.database.vectorstore.prop_vectorization import vectorize_directory
+
+    n_docs = len(load_corpus())
+    samples: List[float] = []
+    for _ in range(cfg.repeat):
+        with temp_chroma_dir() as location:
+            embedder = Embedder("gemini-embedding-001", client=cfg.fake_client())
+            chroma = ChromaOperator(location=location, collection_name=BENCH_COLLECTION_NAME)
+            start = time.perf_counter()
+            vectorize_directory(PROPERTIES_DIR, embedder=embedder, chroma=chroma)
+            samples.append(time.perf_counter() - start)
+
+    stats = summarize(samples)
+    stats["documents"] = n_docs
+    stats["docs_per_s"] = n_docs / stats["median_s"] if stats["median_s"] else None
+    return {"vectorize_directory": stats}
+
+
+@benchmark("snapshot")
+def bench_snapshot(cfg: BenchConfig) -> Dict[str, Dict[str, Any]]:
+    """
+    Export the vectorized corpus to a snapshot and import it into a fresh
+    store; compare with `vectorize_directory`, which re-embeds everything.
+    """
+    from core.database.vectorstore.prop_chroma import ChromaOperator
+    from core.database.vectorstore.snapshot import export_snapshot, import_snapshot
+
+    results: Dict[str, Dict[str, Any]] = {}
+    with temp_chroma_dir() as location:
+        retriever, _ = build_retriever(cfg, location)
+        path = os.path.join(location, "snapshot.npz")
+        for compress in (False, True):
+            label = "npz_compressed" if compress else "npz"
+            stats = time_calls(
+                lambda: export_snapshot(retriever.chroma, path, compress=compress), cfg.repeat
+            )
+            stats["bytes"] = os.path.getsize(path)
+            results[f"snapshot_export[{label}]"] = stats
+
+            samples: List[float] = []
+            for _ in range(cfg.repeat):
+                with temp_chroma_dir() as target:
+                    chroma = ChromaOperator(location=target, collection_name=BENCH_COLLECTION_NAME)
+                    start = time.perf_counter()
+                    info = import_snapshot(chroma, path)
+                    samples.append(time.perf_counter() - start)
+            stats = summarize(samples)
+            stats["documents"] = info.count
+            results[f"snapshot_import[{label}]"] = stats
+    return results
+
+
+@benchmark("retrieve")
+def bench_retrieve(cfg: BenchConfig) -> Dict[str, Dict[str, Any]]:
+    with temp_chroma_dir() as location:
+        retriever, _ = build_retriever(cfg, location)
+        calls = max(cfg.repeat, len(QUERIES)) * 4
+        counter = iter(range(10**9))
+        stats = time_calls(
+            lambda: retriever.retrieve(QUERIES[next(counter) % len(QUERIES)], n_results=3),
+            calls,
+        )
+    return {"retrieve[k=3]": stats}
+
+
+HNSW_CORPUS_SIZE = 2_000
+HNSW_QUERIES = 100
+HNSW_K = 10
+HNSW_BUILDS = [("l2", None, None), ("cosine", 16, 100), ("cosine", 32, 200)]
+HNSW_SEARCH_EFS = (10, 50, 100)
+
+
+def hnsw_corpus(cfg: BenchConfig, size: int = HNSW_CORPUS_SIZE):
+    """
+    Fake embeddings of the sample corpus, scaled to `size`
+    vectors with noisy copies (30 documents are too few for HNSW settings
+    to matter), plus held-out noisy queries and their exact top-k by cosine.
+    """
+    import numpy as np
+
+    from core.database.embedder import Embedder
+
+    embedder = Embedder("gemini-embedding-001", client=cfg.fake_client())
+    base = np.asarray(embedder.embed_texts(list(load_corpus().values()) + QUERIES), dtype=np.float32)
+    rng = np.random.default_rng(0)
+
+    def noisy(n: int) -> "np.ndarray":
+        picks = base[rng.integers(0, len(base), size=n)]
+        scale = 0.5 / np.sqrt(base.shape[1])  # noise norm ~half the signal
+        vectors = picks + rng.normal(0.0, scale, size=picks.shape).astype(np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    corpus = noisy(size)
+    queries = noisy(HNSW_QUERIES)
+    exact = np.argsort(-(queries @ corpus.T), axis=1)[:, :HNSW_K]
+    return corpus, queries, exact
+
+
+@benchmark("hnsw")
+def bench_hnsw(cfg: BenchConfig) -> Dict[str, Dict[str, Any]]:
+    """
+    Recall@k against query latency for distance space / M / construction_ef
+    (per build) and search_ef (changed in place on each build).
+    """
+    from core.database.vectorstore.chroma_config import IndexConfig
+    from core.database.vectorstore.prop_chroma import ChromaOperator
+
+    corpus, queries, exact = hnsw_corpus(cfg)
+    ids = [str(i) for i in range(len(corpus))]
+    results: Dict[str, Dict[str, Any]] = {}
+
+    for space, m, construction_ef in HNSW_BUILDS:
+        with temp_chroma_dir() as location:
+            chroma = ChromaOperator(
+                location=location,
+                collection_name=BENCH_COLLECTION_NAME,
+                index_config=IndexConfig(space=space, M=m, construction_ef=construction_ef),
+            )
+            start = time.perf_counter()
+            chroma.upsert_vectors(ids=ids, embeddings=corpus)
+            build_s = time.perf_counter() - start
+            settings = chroma.index_settings()
+
+            for search_ef in HNSW_SEARCH_EFS:
+                chroma.set_search_ef(search_ef)
+                counter = iter(range(10**9))
+                stats = time_calls(
+                    lambda: chroma.collection.query(
+                        query_embeddings=queries[next(counter) % len(queries)][None, :],
+                        n_results=HNSW_K,
+                        include=[],
+                    ),
+                    max(cfg.repeat, 10) * 4,
+                )
+                found = chroma.collection.query(
+                    query_embeddings=queries, n_results=HNSW_K, include=[]
+                )["ids"]
+                hits = sum(
+                    len({int(i) for i in row} & set(truth.tolist()))
+                    for row, truth in zip(found, exact)
+                )
+                stats["recall_at_k"] = hits / (len(queries) * HNSW_K)
+                stats["build_s"] = build_s
+                stats["vectors"] = len(corpus)
+                name = (
+                    f"hnsw[space={space},M={settings['max_neighbors']},"
+                    f"construction_ef={settings['ef_construction']},search_ef={search_ef}]"
+                )
+                results[name] = stats
+    return results
+
+
+STORAGE_DIMS = (3072, 1536, 768)
+STORAGE_DTYPES = ("float32", "float16", "int8")
+
+
+@benchmark("embedding_storage")
+def bench_embedding_storage(cfg: BenchConfig) -> Dict[str, Dict[str, Any]]:
+    """
+    Index memory, query time and recall@k (against exact full-size float32
+    search) for Matryoshka-truncated dimensions and quantized sidecars.
+
+    float32 rows use brute-force NumPy search; float16/int8 rows use the
+    `QuantizedIndex` sidecar plus exact re-scoring of the candidates.
+    Chroma query time is measured per dimension as well.
+
+    `recall_at_k` is against full-size search; `recall_vs_float32` isolates
+    quantization by comparing with float32 search at the same dimension.
+    The fake hashed embeddings are not Matryoshka-trained, so truncation
+    costs them far more recall than it costs `gemini-embedding-001`.
+    """
+    import numpy as np
+
+    from core.database.embedder import truncate_and_normalize
+    from core.database.vectorstore.chroma_config import IndexConfig
+    from core.database.vectorstore.prop_chroma import ChromaOperator
+    from core.database.vectorstore.quantized_index import QuantizedIndex, rescore
+
+    full_corpus, full_queries, exact = hnsw_corpus(cfg)
+    ids = [str(i) for i in range(len(full_corpus))]
+    calls = max(cfg.repeat, 10) * 4
+    results: Dict[str, Dict[str, Any]] = {}
+
+    def recall(found: List[List[int]], truth: "np.ndarray" = exact) -> float:
+        hits = sum(len(set(row) & set(t.tolist())) for row, t in zip(found, truth))
+        return hits / (len(truth) * HNSW_K)
+
+    for dim in STORAGE_DIMS:
+        if dim > full_corpus.shape[1]:
+            continue
+        corpus = truncate_and_normalize(full_corpus, dim)
+        queries = truncate_and_normalize(full_queries, dim)
+        exact_at_dim = np.argsort(-(queries @ corpus.T), axis=1)[:, :HNSW_K]
+
+        for dtype in STORAGE_DTYPES:
+            counter = iter(range(10**9))
+            if dtype == "float32":
+                def search(query: "np.ndarray") -> List[int]:
+                    scores = corpus @ query
+                    top = np.argpartition(-scores, HNSW_K - 1)[:HNSW_K]
+                    return top[np.argsort(-scores[top])].tolist()
+
+                nbytes = corpus.nbytes
+            else:
+                sidecar = QuantizedIndex.build(ids, corpus, dtype)
+
+                def search(query: "np.ndarray") -> List[int]:
+                    candidates = [int(i) for i in sidecar.candidates(query, HNSW_K)]
+                    best = rescore(query, candidates, corpus[candidates], HNSW_K)
+                    return [candidates[pos] for pos, _ in best]
+
+                nbytes = sidecar.nbytes
+
+            stats = time_calls(lambda: search(queries[next(counter) % len(queries)]), calls)
+            found = [search(q) for q in queries]
+            stats["recall_at_k"] = recall(found)
+            stats["recall_vs_float32"] = recall(found, exact_at_dim)
+            stats["index_bytes"] = nbytes
+            stats["dim"] = dim
+            results[f"embedding_storage[dim={dim},dtype={dtype}]"] = stats
+
+        with temp_chroma_dir() as location:
+            chroma = ChromaOperator(
+                location=location,
+                collection_name=BENCH_COLLECTION_NAME,
+                index_config=IndexConfig(space="cosine"),
+            )
+            chroma.upsert_vectors(ids=ids, embeddings=corpus)
+            counter = iter(range(10**9))
+            stats = time_calls(
+                lambda: chroma.collection.query(
+                    query_embeddings=queries[next(counter) % len(queries)][None, :],
+                    n_results=HNSW_K,
+                    include=[],
+                ),
+                calls,
+            )
+            found = chroma.collection.query(query_embeddings=queries, n_results=HNSW_K, include=[])
+            found_ids = [[int(i) for i in row] for row in found["ids"]]
+            stats["recall_at_k"] = recall(found_ids)
+            stats["recall_vs_float32"] = recall(found_ids, exact_at_dim)
+            stats["index_bytes"] = corpus.nbytes
+            stats["dim"] = dim
+            results[f"embedding_storage[dim={dim},chroma]"] = stats
+    return results
+
+
+SHARD_REGIONS = ("SOF", "PDV", "VAR", "BGS", "RSE", "SZR", "PVN", "BLG")
+SHARD_CORPUS_SIZE = 8_000
+
+
+@benchmark("shards")
+def bench_shards(cfg: BenchConfig) -> Dict[str, Dict[str, Any]]:
+    """
+    Query latency of a region-sharded corpus (`SHARD_REGIONS`, round-robin)
+    against the same vectors in one collection.
+    """
+    from core.database.embedder import Embedder
+    from core.database.vectorstore.prop_chroma import ChromaOperator
+    from core.database.vectorstore.prop_retriever import PropertyRetriever
+    from core.database.vectorstore.regions import REGION_NAMES
+
+    corpus, queries, _ = hnsw_corpus(cfg, SHARD_CORPUS_SIZE)
+    ids = [str(i) for i in range(len(corpus))]
+    regions = [SHARD_REGIONS[i % len(SHARD_REGIONS)] for i in range(len(corpus))]
+    metadatas = [{"region": r} for r in regions]
+    calls = max(cfg.repeat, 10) * 4
+    results: Dict[str, Dict[str, Any]] = {}
+
+    with temp_chroma_dir() as location:
+        chroma = ChromaOperator(location=location, collection_name=BENCH_COLLECTION_NAME)
+        chroma.upsert_vectors(ids=ids, embeddings=corpus, metadatas=metadatas)
+        for region in SHARD_REGIONS:
+            rows = [i for i, r in enumerate(regions) if r == region]
+            chroma.shard(region).upsert_vectors(
+                ids=[ids[i] for i in rows],
+                embeddings=corpus[rows],
+                metadatas=[metadatas[i] for i in rows],
+            )
+        retriever = PropertyRetriever(
+            location=location,
+            collection_name=BENCH_COLLECTION_NAME,
+            embedder=Embedder("gemini-embedding-001", client=cfg.fake_client()),
+            chroma=chroma,
+            shards=chroma.shards(),
+        )
+        counter = iter(range(10**9))
+
+        def query_vector():
+            return queries[next(counter) % len(queries)][None, :]
+
+        place = REGION_NAMES["VAR"][0].title()
+        cases = {
+            "shards[single_collection]": lambda: retriever._query_collection(
+                chroma, query_vector(), HNSW_K
+            ),
+            "shards[single_collection,where]": lambda: retriever._query_collection(
+                chroma, query_vector(), HNSW_K, {"region": "VAR"}
+            ),
+            "shards[routed]": lambda: retriever._retrieve_from_shards(
+                f"flat in {place}", query_vector(), HNSW_K, None
+            ),
+            "shards[fan_out]": lambda: retriever._retrieve_from_shards(
+                "flat", query_vector(), HNSW_K, None
+            ),
+        }
+        for name, fn in cases.items():
+            stats = time_calls(fn, calls)
+            stats["vectors"] = len(corpus)
+            stats["shards"] = len(SHARD_REGIONS)
+            results[name] = stats
+        retriever.close()
+    return results
+
+
+LAZY_CORPUS_SIZE = 2_000
+LAZY_K = 10
+
+
+@benchmark("lazy_text")
+def bench_lazy_text(cfg: BenchConfig) -> Dict[str, Dict[str, Any]]:
+    """
+    Top-10 queries over 2,000 full-length listings, with Chroma returning
+    the texts ("inline") or only ids / metadata ("lazy", texts read from the
+    document store on access). Also reports bytes allocated per query.
+    """
+    import tracemalloc
+
+    from core.database.embedder import Embedder
+    from core.database.vectorstore.doc_store import write_document_store
+    from core.database.vectorstore.prop_chroma import ChromaOperator
+    from core.database.vectorstore.prop_retriever import PropertyRetriever
+
+    corpus, queries, _ = hnsw_corpus(cfg, LAZY_CORPUS_SIZE)
+    texts = list(load_corpus().values())
+    ids = [str(i) for i in range(len(corpus))]
+    documents = [texts[i % len(texts)] for i in range(len(corpus))]
+    calls = max(cfg.repeat, 10) * 4
+    results: Dict[str, Dict[str, Any]] = {}
+
+    with temp_chroma_dir() as location:
+        chroma = ChromaOperator(location=location, collection_name=BENCH_COLLECTION_NAME)
+        chroma.upsert_vectors(
+            ids=ids,
+            documents=documents,
+            embeddings=corpus,
+            metadatas=[{"filename": i} for i in ids],
+        )
+        write_document_store(location, BENCH_COLLECTION_NAME, ids, documents)
+        embedder = Embedder("gemini-embedding-001", client=cfg.fake_client())
+
+        for lazy in (False, True):
+            retriever = PropertyRetriever(
+                location=location,
+                collection_name=BENCH_COLLECTION_NAME,
+                embedder=embedder,
+                chroma=chroma,
+                lazy_text=lazy,
+            )
+            counter = iter(range(10**9))
+
+            def query(read_text: bool) -> None:
+                qv = queries[next(counter) % len(queries)][None, :]
+                hits = retriever._query_collection(chroma, qv, LAZY_K)
+                if read_text:
+                    for hit in hits:
+                        hit.text
+
+            modes = [("lazy", False), ("lazy,read_text", True)] if lazy else [("inline", True)]
+            for label, read_text in modes:
+                stats = time_calls(lambda: query(read_text), calls)
+                tracemalloc.start()
+                query(read_text)
+                stats["bytes_allocated"] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                results[f"lazy_text[{label}]"] = stats
+    return results
+
+
+@benchmark("must_agent_ask")
+def bench_must_agent_ask(cfg: BenchConfig) -> Dict[str, Dict[str, Any]]:
+    from agents.must.must_agent import MustAgent, MustAgentConfig
+
+    with temp_chroma_dir() as location:
+        retriever, client = build_retriever(cfg, location)
+        agent = MustAgent(
+            client,
+            retriever=retriever,
+            config=MustAgentConfig(model="gemini-2.5-flash", rag_top_k=3),
+        )
+        calls = max(cfg.repeat, len(QUERIES)) * 4
+        counter = iter(range(10**9))
+        stats = time_calls(lambda: agent.ask(QUERIES[next(counter) % len(QUERIES)]), calls)
+    return {"must_agent_ask[rag_top_k=3]": stats}
+
+
+SESSION = [
+    "Two-bedroom apartment in Lozenets with parking",
+    "How big is its balcony?",
+    "Does the second one have gas heating?",
+    "What floor is it on?",
+    "Show me something cheaper near a metro station",
+    "Is there a parking spot included?",
+]
+
+
+@benchmark("must_agent_session")
+def bench_must_agent_session(cfg: BenchConfig) -> Dict[str, Dict[str, Any]]:
+    """
+    A scripted conversation with follow-up questions, with and without
+    reusing the previous turn's retrieved context.
+    """
+    from agents.must.must_agent import MustAgent, MustAgentConfig
+
+    results: Dict[str, Dict[str, Any]] = {}
+    with temp_chroma_dir() as location:
+        retriever, client = build_retriever(cfg, location)
+        for reuse in (False, True):
+            agents: List[MustAgent] = []
+
+            def run_session() -> None:
+                agent = MustAgent(
+                    client,
+                    retriever=retriever,
+                    config=MustAgentConfig(
+                        model="gemini-2.5-flash", rag_top_k=3, reuse_context=reuse
+                    ),
+                )
+                for question in SESSION:
+                    agent.ask(question)
+                agents.append(agent)
+
+            client.reset_counters()
+            stats = time_calls(run_session, cfg.repeat)
+            stats["turns"] = len(SESSION)
+            stats["reuse_rate"] = agents[-1].reuse_rate
+            stats["embed_calls_per_session"] = client.embed_calls / len(agents)
+            results[f"must_agent_session[reuse_context={reuse}]"] = stats
+    return results
+
+
+PARAPHRASES = [
+    "Two-bedroom apartment with parking in Lozenets",
+    "cheapest flat near the metro station",
+    "family maisonette with a garden and a garage",
+    "renovated studio in the Sofia center",
+    "apartment with a balcony and gas heating",
+]
+
+
+@benchmark("answer_cache")
+def bench_answer_cache(cfg: BenchConfig) -> Dict[str, Dict[str, Any]]:
+    """
+    Standalone questions, each asked again later as a paraphrase, with and
+    without the semantic answer cache. A hit skips `generate_content`.
+    """
+    from agents.must.answer_cache import SemanticAnswerCache
+    from agents.must.must_agent import MustAgent, MustAgentConfig
+
+    results: Dict[str, Dict[str, Any]] = {}
+    questions = QUERIES + PARAPHRASES
+    with temp_chroma_dir() as location:
+        retriever, client = build_retriever(cfg, location)
+        for cached in (False, True):
+            cache = SemanticAnswerCache() if cached else None
+            counter = iter(range(10**9))
+
+            def ask() -> None:
+                # A fresh agent per question: no follow-up context reuse.
+                agent = MustAgent(
+                    client,
+                    retriever=retriever,
+                    config=MustAgentConfig(model="gemini-2.5-flash", rag_top_k=3),
+                    answer_cache=cache,
+                )
+                agent.ask(questions[next(counter) % len(questions)])
+
+            client.reset_counters()
+            calls = max(cfg.repeat, len(questions)) * 2
+            stats = time_calls(ask, calls)
+            stats["generate_calls_per_question"] = client.generate_calls / calls
+            if cache is not None:
+                stats["hit_rate"] = cache.hit_rate
+            results[f"answer_cache[enabled={cached}]"] = stats
+    return results
+
+
+@benchmark("context_digest")
+def bench_context_digest(cfg: BenchConfig) -> Dict[str, Dict[str, Any]]:
+    """
+    Prompt size with ingest-time digests against full listings: Must agent
+    questions (the model asks for the full text of the top property on
+    detail questions) and buyer decisions over a whole auction.
+    """
+    from agents.auction_system.agent_configs.conf_buy1 import BUYER1_CONFIG
+    from agents.auction_system.agent_configs.conf_buy2 import BUYER2_CONFIG
+    from agents.auction_system.auction_system_def import AuctionSystem
+    from agents.auction_system.buyer_agent import BuyerAgent
+    from agents.auction_system.orchestrator_agent import OrchestratorAgent
+    from agents.must.must_agent import MustAgent, MustAgentConfig
+    from core.testing.fakes import default_responder, estimate_tokens
+
+    results: Dict[str, Dict[str, Any]] = {}
+    detail_words = ("renovated", "balcony")
+    with temp_chroma_dir() as location:
+        retriever, _ = build_retriever(cfg, location)
+        for mode in ("full", "digest"):
+            prompt_tokens: List[int] = []
+
+            def responder(prompt: str) -> str:
+                prompt_tokens.append(estimate_tokens(prompt))
+                if "NEED_DETAILS" in prompt and any(w in prompt for w in detail_words):
+                    return "NEED_DETAILS 1"
+                return default_responder(prompt)
+
+            client = cfg.fake_client(responder=responder)
+            counter = iter(range(10**9))
+
+            def ask() -> None:
+                agent = MustAgent(
+                    client,
+                    retriever=retriever,
+                    config=MustAgentConfig(model="gemini-2.5-flash", rag_top_k=3, context_mode=mode),
+                )
+                agent.ask(QUERIES[next(counter) % len(QUERIES)])
+
+            calls = max(cfg.repeat, len(QUERIES))
+            stats = time_calls(ask, calls)
+            asked = calls + 1
+            stats["prompt_tokens_per_question"] = sum(prompt_tokens) / asked
+            stats["generate_calls_per_question"] = client.generate_calls / asked
+            results[f"context_digest[must_agent,{mode}]"] = stats
+
+    property_text = load_corpus()["p1.txt"]
+    for mode in ("full", "digest"):
+        auction = AuctionResponder()
+        buyer_tokens: List[int] = []
+
+        def auction_responder(prompt: str) -> str:
+            if "Buyer Agent" in prompt:
+                buyer_tokens.append(estimate_tokens(prompt))
+            return auction(prompt)
+
+        client = cfg.fake_client(responder=auction_responder)
+
+        def run_once() -> None:
+            auction.reset()
+            system = AuctionSystem(
+                orchestrator=OrchestratorAgent(client),
+                buyers={
+                    c.name: BuyerAgent(client, replace(c, context_mode=mode))
+                    for c in (BUYER1_CONFIG, BUYER2_CONFIG)
+                },
+            )
+            system.run_single_auction("p1.txt", property_text)
+
+        stats = time_calls(run_once, cfg.repeat)
+        stats["buyer_prompt_tokens_per_call"] = sum(buyer_tokens) / len(buyer_tokens)
+        results[f"context_digest[auction,{mode}]"] = stats
+    return results
+
+
+@benchmark("conversation_text")
+def bench_conversation_text(cfg: BenchConfig) -> Dict[str, Dict[str, Any]]:
+    from core.state.state import State
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for size in (100, 10_000, 100_000):
+        state = State()
+        for i in range(size // 2):
+            state.add_turn(f"Question number {i} about a flat?", f"Answer number {i}.")
+        for max_messages in (6, None):
+            stats = time_calls(
+                lambda: state.conversation_text(max_messages=max_messages),
+                cfg.repeat,
+            )
+            results[f"conversation_text[n={size},max={max_messages}]"] = stats
+    return results
+
+
+@benchmark("auction")
+def bench_auction(cfg: BenchConfig) -> Dict[str, Dict[str, Any]]:
+    from agents.auction_system.agent_configs.conf_buy1 import BUYER1_CONFIG
+    from agents.auction_system.agent_configs.conf_buy2 import BUYER2_CONFIG
+    from agents.auction_system.auction_system_def import AuctionSystem
+    from agents.auction_system.buyer_agent import BuyerAgent
+    from agents.auction_system.orchestrator_agent import OrchestratorAgent, OrchestratorConfig
+
+    responder = AuctionResponder()
+    client = cfg.fake_client(responder=responder)
+    property_text = load_corpus()["p1.txt"]
+
+    variants = {
+        "run_single_auction": ("sequential", False),
+        "run_single_auction[sealed_bid]": ("sealed_bid", False),
+        "run_single_auction[checkpoint]": ("sequential", True),
+    }
+
+    results: Dict[str, Dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory(prefix="bench_ckpt_") as ckpt_dir:
+        for name, (round_mode, checkpoint) in variants.items():
+            orchestrator_config = OrchestratorConfig(round_mode=round_mode)
+            checkpoint_path = os.path.join(ckpt_dir, "auction.jsonl") if checkpoint else None
+            rounds: List[int] = []
+
+            def run_once() -> None:
+                responder.reset()
+                system = AuctionSystem(
+                    orchestrator=OrchestratorAgent(client, config=orchestrator_config),
+                    buyers={
+                        buyer_cfg.name: BuyerAgent(client, buyer_cfg)
+                        for buyer_cfg in (BUYER1_CONFIG, BUYER2_CONFIG)
+                    },
+                    checkpoint_path=checkpoint_path,
+                )
+                final = system.run_single_auction("p1.txt", property_text)
+                rounds.append(final.round)
+
+            client.reset_counters()
+            stats = time_calls(run_once, cfg.repeat)
+            stats["rounds"] = rounds[-1]
+            stats["llm_calls_per_auction"] = client.generate_calls / (cfg.repeat + 1)
+            results[name] = stats
+    return results
+
+
+@benchmark("auction_events")
+def bench_auction_events(cfg: BenchConfig) -> Dict[str, Dict[str, Any]]:
+    """
+    Auctions publishing to an event bus: no bus, a subscriber that never
+    reads (bounded buffer, must not slow the auction), and the delay until
+    a `stream_auction` consumer sees its first event (5 ms LLM calls).
+    """
+    from agents.auction_system.agent_configs.conf_buy1 import BUYER1_CONFIG
+    from agents.auction_system.agent_configs.conf_buy2 import BUYER2_CONFIG
+    from agents.auction_system.auction_system_def import AuctionSystem
+    from agents.auction_system.buyer_agent import BuyerAgent
+    from agents.auction_system.events import EventBus
+    from agents.auction_system.orchestrator_agent import OrchestratorAgent
+
+    responder = AuctionResponder()
+    client = cfg.fake_client(responder=responder)
+    property_text = load_corpus()["p1.txt"]
+
+    def make_system(bus: Optional[EventBus], llm: Any = client) -> AuctionSystem:
+        responder.reset()
+        return AuctionSystem(
+            orchestrator=OrchestratorAgent(llm),
+            buyers={c.name: BuyerAgent(llm, c) for c in (BUYER1_CONFIG, BUYER2_CONFIG)},
+            events=bus,
+        )
+
+    results: Dict[str, Dict[str, Any]] = {}
+    results["auction_events[no_bus]"] = time_calls(
+        lambda: make_system(None).run_single_auction("p1.txt", property_text), cfg.repeat
+    )
+
+    bus = EventBus()
+    stalled = bus.subscribe(maxsize=8)
+    stats = time_calls(lambda: make_system(bus).run_single_auction("p1.txt", property_text), cfg.repeat)
+    stats["events_per_auction"] = bus.published / (cfg.repeat + 1)
+    stats["dropped_by_stalled_subscriber"] = stalled.dropped
+    results["auction_events[stalled_subscriber]"] = stats
+
+    slow_client = cfg.fake_client(responder=responder, generate_latency_s=0.005)
+    first: List[float] = []
+
+    def stream_once() -> None:
+        start = time.perf_counter()
+        system = make_system(None, slow_client)
+        for i, _ in enumerate(system.stream_auction("p1.txt", property_text)):
+            if i == 0:
+                first.append(time.perf_counter() - start)
+
+    stats = time_calls(stream_once, cfg.repeat)
+    stats["first_event_ms"] = statistics.median(first) * 1000
+    results["auction_events[stream_auction]"] = stats
+    return results
+
+
+@benchmark("token_budget")
+def bench_token_budget(cfg: BenchConfig) -> Dict[str, Dict[str, Any]]:
+    """
+    `TokenLedger.admit` + `settle` per call (limits on), and full auctions
+    with no budget against a budget of about half their usual tokens.
+    """
+    from agents.auction_system.agent_configs.conf_buy1 import BUYER1_CONFIG
+    from agents.auction_system.agent_configs.conf_buy2 import BUYER2_CONFIG
+    from agents.auction_system.auction_system_def import AuctionSystem
+    from agents.auction_system.buyer_agent import BuyerAgent
+    from agents.auction_system.orchestrator_agent import OrchestratorAgent
+    from core.llm import accounting
+
+    results: Dict[str, Dict[str, Any]] = {}
+    prompt = "x" * 8_000
+    response = make_fake_client().models.generate_content(model="m", contents=prompt)
+    ledger = accounting.TokenLedger(
+        accounting.BudgetConfig(session_tokens=10**12, auction_tokens=10**12, tokens_per_minute=10**12)
+    )
+    n_calls = 1_000
+
+    def account_calls() -> None:
+        for _ in range(n_calls):
+            with ledger.admit(prompt, agent="bench", model="m", session="s", auction="a") as admission:
+                admission.settle(response)
+
+    stats = time_calls(account_calls, cfg.repeat)
+    stats["per_call_us"] = stats["median_s"] / n_calls * 1e6
+    results["token_budget[ledger_overhead]"] = stats
+
+    responder = AuctionResponder()
+    client = cfg.fake_client(responder=responder)
+    property_text = load_corpus()["p1.txt"]
+
+    def run_auctions(budget: accounting.BudgetConfig) -> Dict[str, Any]:
+        tokens: List[int] = []
+        rounds: List[int] = []
+
+        def run_once() -> None:
+            responder.reset()
+            accounting.configure(budget)
+            system = AuctionSystem(
+                orchestrator=OrchestratorAgent(client),
+                buyers={c.name: BuyerAgent(client, c) for c in (BUYER1_CONFIG, BUYER2_CONFIG)},
+            )
+            state = system.run_single_auction("p1.txt", property_text)
+            tokens.append(state.tokens_used)
+            rounds.append(state.round)
+
+        stats = time_calls(run_once, cfg.repeat)
+        report = accounting.get_ledger().report()
+        stats["tokens_per_auction"] = statistics.median(tokens)
+        stats["rounds"] = statistics.median(rounds)
+        stats["degraded_calls"] = report["degraded"]
+        stats["rejected_calls"] = report["rejected"]
+        return stats
+
+    try:
+        unlimited = run_auctions(accounting.BudgetConfig())
+        results["token_budget[auction_no_budget]"] = unlimited
+        half = int(unlimited["tokens_per_auction"] // 2)
+        results["token_budget[auction_half_budget]"] = run_auctions(
+            accounting.BudgetConfig(auction_tokens=half)
+        )
+    finally:
+        accounting.configure(accounting.BudgetConfig())
+    return results
+
+
+@benchmark("auction_simulation")
+def bench_auction_simulation(cfg: BenchConfig) -> Dict[str, Dict[str, Any]]:
+    from agents.auction_system.simulation import AuctionSimulator
+
+    simulator = AuctionSimulator.from_directory(PROPERTIES_DIR)
+    n_per_listing = 1_000
+    stats = time_calls(lambda: simulator.run(n_per_listing, seed=0), cfg.repeat)
+    stats["auctions"] = n_per_listing * len(simulator.listings)
+    stats["auctions_per_s"] = stats["auctions"] / stats["median_s"]
+    return {"auction_simulation[n=1000/listing]": stats}
+
+
+@benchmark("instrumentation")
+def bench_instrumentation(cfg: BenchConfig) -> Dict[str, Dict[str, Any]]:
+    from core.telemetry import metrics
+
+    was_enabled = metrics.is_enabled()
+    results: Dict[str, Dict[str, Any]] = {}
+    spans_per_sample = 10_000
+
+    def many_spans() -> None:
+        for _ in range(spans_per_sample):
+            with metrics.span("bench.noop"):
+                pass
+
+    try:
+        for enabled in (False, True):
+            metrics.enable() if enabled else metrics.disable()
+            stats = time_calls(many_spans, cfg.repeat)
+            stats["per_span_s"] = stats["median_s"] / spans_per_sample
+            results[f"span_overhead[enabled={enabled}]"] = stats
+    finally:
+        metrics.enable() if was_enabled else metrics.disable()
+        metrics.REGISTRY.reset()
+    return results
+
+
+TRACING_MODES = (
+    # name, sample_rate, background
+    ("sampled[rate=0]", 0.0, True),
+    ("sampled[rate=0.1]", 0.1, True),
+    ("sampled[rate=1]", 1.0, True),
+    ("sync[rate=1]", 1.0, False),
+)
+
+
+CALL_POLICY_CALLS = 200
+
+
+@benchmark("call_policy")
+def bench_call_policy(cfg: BenchConfig) -> Dict[str, Dict[str, Any]]:
+    """
+    `generate_content` against a heavy-tailed fake (lognormal, median 10 ms),
+    plain and through `CallPolicyClient`: with a deadline only, and with
+    hedging at the observed p95. Reports p95 / max per call.
+    """
+    from core.llm.call_policy import CallPolicy, CallPolicyClient, CallTimeout
+    from core.testing.fakes import LatencyDistribution
+
+    def client():
+        return cfg.fake_client(
+            generate_latency=LatencyDistribution("lognormal", 0.01, 1.0, seed=7)
+        )
+
+    cases = {
+        "call_policy[plain]": client(),
+        "call_policy[deadline=0.05s]": CallPolicyClient(
+            client(), CallPolicy(deadline_s=0.05, max_retries=0)
+        ),
+        "call_policy[hedge=p95]": CallPolicyClient(
+            client(), CallPolicy(deadline_s=None, hedge=True, hedge_min_samples=20)
+        ),
+    }
+    results: Dict[str, Dict[str, Any]] = {}
+    for name, target in cases.items():
+        timeouts = 0
+
+        def call() -> None:
+            nonlocal timeouts
+            try:
+                target.models.generate_content(model="gemini-2.5-flash", contents="Hello")
+            except CallTimeout:
+                timeouts += 1
+
+        stats = time_calls(call, CALL_POLICY_CALLS)
+        if isinstance(target, CallPolicyClient):
+            stats["hedges"] = target.hedges
+            stats["timeouts"] = timeouts
+            target.close()
+        results[name] = stats
+    return results
+
+
+@benchmark("tracing")
+def bench_tracing(cfg: BenchConfig) -> Dict[str, Dict[str, Any]]:
+    """
+    Per-call overhead of `TracingClient` against the bare client, with a
+    JSONL file sink. "sync" writes each trace on the calling thread.
+    """
+    from core.telemetry.tracing import JsonlFileSink, TraceConfig, Tracer, TracingClient
+
+    calls_per_sample = 2_000
+    client = cfg.fake_client(generate_latency_s=0.0)
+    prompt = "Property listing:\n" + next(iter(load_corpus().values()))
+
+    def many_calls(target: Any) -> Callable[[], None]:
+        def run() -> None:
+            for _ in range(calls_per_sample):
+                target.models.generate_content(model="gemini-2.5-flash", contents=prompt)
+
+        return run
+
+    results: Dict[str, Dict[str, Any]] = {}
+    stats = time_calls(many_calls(client), cfg.repeat)
+    stats["per_call_s"] = stats["median_s"] / calls_per_sample
+    results["tracing[none]"] = stats
+    bare = stats["per_call_s"]
+
+    with tempfile.TemporaryDirectory(prefix="bench_traces_") as directory:
+        for name, rate, background in TRACING_MODES:
+            sink = JsonlFileSink(os.path.join(directory, "traces.jsonl"))
+            tracer = Tracer(TraceConfig(sample_rate=rate, background=background), sink)
+            stats = time_calls(many_calls(TracingClient(client, tracer)), cfg.repeat)
+            tracer.close()
+            stats["per_call_s"] = stats["median_s"] / calls_per_sample
+            stats["overhead_per_call_s"] = stats["per_call_s"] - bare
+            stats.update(tracer.stats())
+            results[f"tracing[{name}]"] = stats
+    return results
+
+
+# ----------------------------------------------------------------------
+# Reporting
+# ----------------------------------------------------------------------
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Any],
+    tolerance: float,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Compare medians against the baseline; ratio > tolerance is a regression.
+    """
+    base_results = baseline.get("results", {})
+    comparison: Dict[str, Dict[str, Any]] = {}
+    for name, stats in results.items():
+        base = base_results.get(name)
+        if not base or not base.get("median_s"):
+            continue
+        ratio = stats["median_s"] / base["median_s"]
+        comparison[name] = {
+            "baseline_median_s": base["median_s"],
+            "median_s": stats["median_s"],
+            "ratio": ratio,
+            "regression": ratio > tolerance,
+        }
+    return comparison
+
+
+def run(cfg: BenchConfig, only: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    results: Dict[str, Dict[str, Any]] = {}
+    for name, fn in BENCHMARKS.items():
+        if only and name not in only:
+            continue
+        print(f"[bench] {name} ...", flush=True)
+        results.update(fn(cfg))
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run TeleHelper hot-path benchmarks.")
+    parser.add_argument("--only", nargs="*", choices=sorted(BENCHMARKS), help="Subset of benchmarks to run.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed iterations per benchmark.")
+    parser.add_argument("--output", default="bench_results.json", help="Where to write the JSON report.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare against.")
+    parser.add_argument("--update-baseline", action="store_true", help="Overwrite the baseline with this run.")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="Allowed median ratio before flagging a regression.")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 on any regression.")
+    parser.add_argument("--generate-latency", type=float, default=0.0, help="Simulated generate_content latency (s).")
+    parser.add_argument("--embed-latency", type=float, default=0.0, help="Simulated embed_content latency per call (s).")
+    parser.add_argument("--embed-latency-per-item", type=float, default=0.0, help="Simulated embed_content latency per text (s).")
+    parser.add_argument("--embedding-dim", type=int, default=3072, help="Dimension of fake embeddings.")
+    args = parser.parse_args(argv)
+
+    cfg = BenchConfig(
+        repeat=args.repeat,
+        generate_latency_s=args.generate_latency,
+        embed_latency_s=args.embed_latency,
+        embed_latency_per_item_s=args.embed_latency_per_item,
+        embedding_dim=args.embedding_dim,
+    )
+
+    results = run(cfg, args.only)
+    report: Dict[str, Any] = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": asdict(cfg),
+        },
+        "results": results,
+    }
+
+    baseline: Dict[str, Any] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("config", {}) != report["meta"]["config"]:
+            print("[bench] WARNING: baseline was recorded with a different config.")
+        report["comparison"] = compare(results, baseline, args.tolerance)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"[bench] Report written to {args.output}")
+
+    regressions = [n for n, c in report.get("comparison", {}).items() if c["regression"]]
+    for name, stats in results.items():
+        line = f"  {name:<45} median {stats['median_s'] * 1000:9.3f} ms"
+        cmp = report.get("comparison", {}).get(name)
+        if cmp:
+            flag = "  REGRESSION" if cmp["regression"] else ""
+            line += f"  (x{cmp['ratio']:.2f} vs baseline){flag}"
+        print(line)
+
+    if args.update_baseline:
+        # Merge, so `--only x --update-baseline` keeps the other entries.
+        merged = dict(baseline.get("results", {}))
+        merged.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"meta": report["meta"], "results": merged}, f, indent=2)
+        print(f"[bench] Baseline updated: {args.baseline}")
+
+    if regressions and args.fail_on_regression:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+# TO RUN:
+# python -m exec.benchmarks.run_benchmarks
@@ -0,0 +1,98 @@
+"""
+Import-time report for an entrypoint (a summary of `python -X importtime`).
+
+Runs a fresh interpreter with `-X importtime`, imports the given module and
+prints the total import time plus the slowest modules by cumulative and by
+self time:
+
+    python -m exec.import_report
+    python -m exec.import_report core.database.vectorstore.prop_vectorization --top 15
+    python -m exec.import_report --json > import_report.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+from dataclasses import asdict, dataclass
+from typing import List, Optional
+
+
+@dataclass
+class ImportRecord:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def collect(module: str) -> List[ImportRecord]:
+    """
+    Import `module` in a child interpreter and parse its importtime output.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"importing {module!r} failed:\n{proc.stderr[-2000:]}")
+
+    records: List[ImportRecord] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        try:
+            _, rest = line.split(":", 1)
+            self_us, cumulative_us, name = rest.split("|", 2)
+            records.append(
+                ImportRecord(
+                    module=name.strip(),
+                    self_us=int(self_us),
+                    cumulative_us=int(cumulative_us),
+                    depth=(len(name) - len(name.lstrip())) // 2,
+                )
+            )
+        except ValueError:
+            continue
+    return records
+
+
+def summarize(module: str, records: List[ImportRecord], top: int) -> dict:
+    target = next((r for r in records if r.module == module), None)
+    total_us = target.cumulative_us if target else sum(r.self_us for r in records)
+    return {
+        "module": module,
+        "total_ms": total_us / 1000,
+        "modules_imported": len(records),
+        "top_cumulative": [asdict(r) for r in sorted(records, key=lambda r: -r.cumulative_us)[:top]],
+        "top_self": [asdict(r) for r in sorted(records, key=lambda r: -r.self_us)[:top]],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Summarize `python -X importtime` for a module.")
+    parser.add_argument("module", nargs="?", default="exec.main_must_agent")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args(argv)
+
+    report = summarize(args.module, collect(args.module), args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"Import of {report['module']}: {report['total_ms']:.1f} ms "
+          f"({report['modules_imported']} modules)")
+    print("\nSlowest by cumulative time:")
+    for r in report["top_cumulative"]:
+        print(f"  {r['cumulative_us'] / 1000:9.1f} ms  {r['module']}")
+    print("\nSlowest by self time:")
+    for r in report["top_self"]:
+        print(f"  {r['self_us'] / 1000:9.1f} ms  {r['module']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+"""
+Load test for the Must agent.
+
+Simulates N concurrent users, each running conversations from a question
+corpus against one shared client and one shared `PropertyRetriever` (so
+one Chroma `PersistentClient`), as a server would. Every user has its own
+`MustAgent` / `State`.
+
+Gemini is replaced by the benchmark fake client with configurable latency
+distributions (`kind:scale[:sigma]`, see `core.testing.fakes.LatencyDistribution`) and
+error rates. The property store is built in a temporary directory from
+`documents/properties` with the fake embedder, so no API key is needed.
+
+Reported per load level:
+- throughput (answered questions per second) and errors by type
+- end-to-end latency of `MustAgent.ask` (p50 / p95 / p99 / max)
+- the same percentiles for every pipeline stage (the `metrics.span` names)
+- peak concurrent generate / embed calls (how deep the API queue gets) and,
+  with `--max-in-flight`, time spent waiting for a slot
+
+    python -m exec.load_test_must_agent --users 1,8,32 --conversations 4
+    python -m exec.load_test_must_agent --users 16 --duration 60 \\
+        --generate-latency lognormal:0.8:0.5 --generate-error-rate 0.02 --json load.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from agents.must.must_agent import MustAgent, MustAgentConfig
+from core.telemetry import metrics
+from core.testing.fakes import LatencyDistribution, make_fake_client
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROPERTIES_DIR = os.path.join(PROJECT_ROOT, "documents", "properties")
+LOAD_COLLECTION_NAME = "load_test_properties"
+
+DEFAULT_CONVERSATIONS: List[List[str]] = [
+    [
+        "Two-bedroom apartment in Lozenets with parking",
+        "How big is its balcony?",
+        "Does the second one have gas heating?",
+        "Show me something cheaper near a metro station",
+    ],
+    [
+        "Family maisonette with a garden and garage",
+        "What is the asking price of the first one?",
+        "Are there any schools nearby?",
+    ],
+    [
+        "Renovated studio in the center of Sofia",
+        "Which floor is it on?",
+        "Find me a one-bedroom flat with a balcony instead",
+        "Is it furnished?",
+    ],
+    [
+        "Cheapest apartment with two bathrooms",
+        "Does it have an elevator?",
+    ],
+]
+
+
+def load_conversations(path: str) -> List[List[str]]:
+    """
+    A JSON list of conversations (lists of questions), or a text file with
+    one question per line and blank lines between conversations.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        raw = f.read()
+    if path.lower().endswith(".json"):
+        return [[str(q) for q in conv] for conv in json.loads(raw) if conv]
+    conversations: List[List[str]] = []
+    for block in raw.split("\n\n"):
+        questions = [line.strip() for line in block.splitlines() if line.strip()]
+        if questions:
+            conversations.append(questions)
+    return conversations
+
+
+def percentiles(samples: Sequence[float]) -> Dict[str, Optional[float]]:
+    """
+    Exact (nearest-rank) p50 / p95 / p99 plus count and max.
+    """
+    ordered = sorted(samples)
+    if not ordered:
+        return {"count": 0, "p50": None, "p95": None, "p99": None, "max": None}
+
+    def rank(q: float) -> float:
+        return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+    return {
+        "count": len(ordered),
+        "p50": rank(0.50),
+        "p95": rank(0.95),
+        "p99": rank(0.99),
+        "max": ordered[-1],
+    }
+
+
+# ----------------------------------------------------------------------
+# Load generation
+# ----------------------------------------------------------------------
+
+
+@dataclass
+class LoadConfig:
+    """
+    - users: concurrent simulated users.
+    - conversations_per_user: conversations each user runs (ignored when
+      `duration_s` is set).
+    - duration_s: run for this long instead (users keep starting new
+      conversations until it elapses).
+    - think_time_s: mean pause between a user's questions (uniform 0..2x).
+    - ramp_up_s: user start times are spread over this window.
+    """
+
+    users: int = 8
+    conversations_per_user: int = 2
+    duration_s: Optional[float] = None
+    think_time_s: float = 0.0
+    ramp_up_s: float = 0.0
+    seed: int = 0
+
+
+@dataclass
+class LoadReport:
+    users: int
+    asks: int
+    errors: Dict[str, int]
+    wall_s: float
+    throughput_per_s: float
+    ask_latency_s: Dict[str, Optional[float]]
+    stages_s: Dict[str, Dict[str, Optional[float]]]
+    peak_in_flight: Dict[str, int]
+    slot_wait_s: Optional[Dict[str, Optional[float]]] = None
+    reuse_rate: Optional[float] = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def print(self) -> None:
+        def ms(value: Optional[float]) -> str:
+            return f"{value * 1000:9.1f}" if value is not None else "        -"
+
+        errors = sum(self.errors.values())
+        print(
+            f"[LoadTest] users={self.users} asks={self.asks} errors={errors} "
+            f"wall={self.wall_s:.1f}s throughput={self.throughput_per_s:.2f}/s "
+            f"peak_in_flight={self.peak_in_flight}"
+        )
+        if self.errors:
+            print(f"[LoadTest]   errors by type: {self.errors}")
+        print(f"  {'stage':<34}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+        rows = [("ask (end to end)", self.ask_latency_s)] + sorted(self.stages_s.items())
+        if self.slot_wait_s is not None:
+            rows.append(("llm slot wait", self.slot_wait_s))
+        for name, stats in rows:
+            print(
+                f"  {name:<34}{stats['count']:>7}{ms(stats['p50'])} {ms(stats['p95'])} "
+                f"{ms(stats['p99'])} {ms(stats['max'])}"
+            )
+
+
+class LoadTest:
+    """
+    Runs `LoadConfig` users against one shared client and retriever.
+
+    `agent_factory()` returns a fresh `MustAgent` per conversation.
+    """
+
+    def __init__(
+        self,
+        agent_factory,
+        conversations: List[List[str]],
+        *,
+        fake_client: Any = None,
+        limiter: Any = None,
+    ) -> None:
+        if not conversations:
+            raise ValueError("at least one conversation is needed")
+        self.agent_factory = agent_factory
+        self.conversations = conversations
+        self.fake_client = fake_client
+        self.limiter = limiter
+
+    def run(self, config: LoadConfig) -> LoadReport:
+        was_enabled = metrics.is_enabled()
+        metrics.enable()
+        metrics.REGISTRY.keep_samples(True)
+        metrics.REGISTRY.reset()
+        if self.fake_client is not None:
+            self.fake_client.reset_counters()
+
+        latencies: List[float] = []
+        waits: List[float] = []
+        errors: Counter = Counter()
+        reuse = [0, 0]  # reuses, retrievals
+        lock = threading.Lock()
+        deadline = None if config.duration_s is None else time.perf_counter() + config.duration_s
+
+        def user(index: int) -> None:
+            rng = random.Random(config.seed * 10_007 + index)
+            if config.ramp_up_s > 0:
+                time.sleep(config.ramp_up_s * index / max(1, config.users))
+            runs = 0
+            while True:
+                if deadline is None and runs >= config.conversations_per_user:
+                    break
+                conversation = self.conversations[(index + runs) % len(self.conversations)]
+                agent = self.agent_factory()
+                for question in conversation:
+                    if deadline is not None and time.perf_counter() >= deadline:
+                        break
+                    start = time.perf_counter()
+                    try:
+                        agent.ask(question)
+                        error = None
+                    except Exception as e:
+                        error = type(e).__name__
+                    elapsed = time.perf_counter() - start
+                    wait = self.limiter.reset_wait() if self.limiter is not None else None
+                    with lock:
+                        if error is None:
+                            latencies.append(elapsed)
+                        else:
+                            errors[error] += 1
+                        if wait is not None:
+                            waits.append(wait)
+                    if config.think_time_s > 0:
+                        time.sleep(rng.uniform(0.0, 2.0 * config.think_time_s))
+                agent.end_session()
+                with lock:
+                    reuse[0] += agent.reuses
+                    reuse[1] += agent.retrievals
+                runs += 1
+                if deadline is not None and time.perf_counter() >= deadline:
+                    break
+
+        started = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=config.users, thread_name_prefix="load-user") as pool:
+                # list() re-raises errors from the harness itself.
+                list(pool.map(user, range(config.users)))
+            wall = time.perf_counter() - started
+
+            stages = {}
+            for key, values in metrics.REGISTRY.samples(metrics.SPAN_METRIC).items():
+                labels = dict(key)
+                name = labels.pop("span")
+                if labels:
+                    name += "[" + ",".join(f"{k}={v}" for k, v in sorted(labels.items())) + "]"
+                stages[name] = percentiles(values)
+        finally:
+            metrics.REGISTRY.keep_samples(False)
+            metrics.REGISTRY.reset()
+            if not was_enabled:
+                metrics.disable()
+
+        total_rag = reuse[0] + reuse[1]
+        return LoadReport(
+            users=config.users,
+            asks=len(latencies) + sum(errors.values()),
+            errors=dict(errors),
+            wall_s=wall,
+            throughput_per_s=len(latencies) / wall if wall else 0.0,
+            ask_latency_s=percentiles(latencies),
+            stages_s=stages,
+            peak_in_flight=dict(self.fake_client.max_in_flight) if self.fake_client is not None else {},
+            slot_wait_s=percentiles(waits) if self.limiter is not None else None,
+            reuse_rate=reuse[0] / total_rag if total_rag else None,
+        )
+
+
+# ----------------------------------------------------------------------
+# Setup
+# ----------------------------------------------------------------------
+
+
+def build_retriever(location: str, embed_client: Any, lazy_text: bool = False):
+    """
+    Vectorize `documents/properties` into a fresh store at `location` with
+    a latency- and error-free fake, and return a retriever that embeds
+    queries with `embed_client` (reading texts lazily with `lazy_text`).
+    """
+    from core.database.embedder import Embedder
+    from core.database.vectorstore.prop_chroma import ChromaOperator
+    from core.database.vectorstore.prop_retriever import PropertyRetriever
+    from core.database.vectorstore.prop_vectorization import vectorize_directory
+
+    chroma = ChromaOperator(location=location, collection_name=LOAD_COLLECTION_NAME)
+    vectorize_directory(
+        PROPERTIES_DIR,
+        embedder=Embedder("gemini-embedding-001", client=make_fake_client()),
+        chroma=chroma,
+    )
+    return PropertyRetriever(
+        location=location,
+        collection_name=LOAD_COLLECTION_NAME,
+        embedder=Embedder("gemini-embedding-001", client=embed_client),
+        chroma=chroma,
+        lazy_text=lazy_text,
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Concurrent load test for the Must agent (fake Gemini).")
+    parser.add_argument("--users", default="8", help="Concurrent users; a comma list runs several levels.")
+    parser.add_argument("--conversations", type=int, default=2, help="Conversations per user.")
+    parser.add_argument("--duration", type=float, default=None, help="Run each level for N seconds instead.")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between questions (s).")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="Spread user starts over N seconds.")
+    parser.add_argument("--questions", default=None, help="Conversation corpus (.json or blank-line separated .txt).")
+    parser.add_argument("--generate-latency", default="lognormal:0.8:0.4", help="kind:scale[:sigma]")
+    parser.add_argument("--embed-latency", default="lognormal:0.15:0.3", help="kind:scale[:sigma]")
+    parser.add_argument("--generate-error-rate", type=float, default=0.0)
+    parser.add_argument("--embed-error-rate", type=float, default=0.0)
+    parser.add_argument("--max-in-flight", type=int, default=None, help="Cap concurrent generate calls (API quota).")
+    parser.add_argument("--lazy-text", action="store_true", help="Read listing texts from the document store.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default=None, help="Write the reports to this file.")
+    args = parser.parse_args(argv)
+
+    conversations = load_conversations(args.questions) if args.questions else DEFAULT_CONVERSATIONS
+    client = make_fake_client(
+        generate_latency=LatencyDistribution.parse(args.generate_latency, seed=args.seed),
+        embed_latency=LatencyDistribution.parse(args.embed_latency, seed=args.seed + 1),
+        generate_error_rate=args.generate_error_rate,
+        embed_error_rate=args.embed_error_rate,
+        seed=args.seed,
+    )
+    limiter = None
+    agent_client: Any = client
+    if args.max_in_flight:
+        from core.llm.concurrency import ConcurrencyLimitedClient
+
+        limiter = agent_client = ConcurrencyLimitedClient(client, args.max_in_flight)
+
+    reports: List[LoadReport] = []
+    with tempfile.TemporaryDirectory(prefix="load_chroma_", ignore_cleanup_errors=True) as location:
+        retriever = build_retriever(location, client, lazy_text=args.lazy_text)
+        agent_config = MustAgentConfig(model="gemini-2.5-flash", rag_top_k=3)
+        test = LoadTest(
+            lambda: MustAgent(agent_client, retriever=retriever, config=agent_config),
+            conversations,
+            fake_client=client,
+            limiter=limiter,
+        )
+        for users in (int(u) for u in args.users.split(",")):
+            report = test.run(
+                LoadConfig(
+                    users=users,
+                    conversations_per_user=args.conversations,
+                    duration_s=args.duration,
+                    think_time_s=args.think_time,
+                    ramp_up_s=args.ramp_up,
+                    seed=args.seed,
+                )
+            )
+            report.extra = {
+                "generate_latency": args.generate_latency,
+                "embed_latency": args.embed_latency,
+                "max_in_flight": args.max_in_flight,
+            }
+            report.print()
+            reports.append(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump([asdict(r) for r in reports], f, indent=2)
+        print(f"[LoadTest] Reports written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
+
+# TO RUN:
+# python -m exec.load_test_must_agent --users 1,8,32
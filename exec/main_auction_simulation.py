@@ -0,0 +1,54 @@
+"""
+Monte Carlo auction simulation over all property listings.
+
+Runs rule-based (NumPy) versions of the buyer strategies instead of LLM
+calls, so tens of thousands of auctions finish in seconds:
+
+    python -m exec.main_auction_simulation --n 10000
+    python -m exec.main_auction_simulation --n 2000 --per-listing --output sim.json
+"""
+
+import argparse
+import json
+import os
+
+from agents.auction_system.simulation import AuctionSimulator
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PROPERTIES_DIR = os.path.join(PROJECT_ROOT, "documents", "properties")
+
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be >= 1, got {number}")
+    return number
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate auctions with rule-based buyers.")
+    parser.add_argument("--n", type=positive_int, default=10_000, help="Auctions per listing.")
+    parser.add_argument("--dir", default=DEFAULT_PROPERTIES_DIR, help="Directory with listing .txt files.")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--max-rounds", type=positive_int, default=10)
+    parser.add_argument("--per-listing", action="store_true", help="Include per-listing stats.")
+    parser.add_argument("--output", default=None, help="Write the JSON report here instead of stdout.")
+    args = parser.parse_args(argv)
+
+    simulator = AuctionSimulator.from_directory(args.dir, max_rounds=args.max_rounds)
+    result = simulator.run(args.n, seed=args.seed)
+    report = json.dumps(result.report(per_listing=args.per_listing), indent=2)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+        print(f"{result.n_auctions} auctions in {result.elapsed_s:.2f}s -> {args.output}")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
+
+# TO RUN:
+# python -m exec.main_auction_simulation --n 10000
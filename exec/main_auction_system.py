@@ -1,13 +1,166 @@
 """
 The interaction with the Auction system can be done here.
 
+Runs one auction per property listing, concurrently, and streams each result
+as soon as its auction closes:
+
+    python -m exec.main_auction_system                       # all listings
+    python -m exec.main_auction_system p1.txt p4.txt --workers 2
+    python -m exec.main_auction_system --fake-latency 0.5 --sequential-baseline
+    python -m exec.main_auction_system --round-mode sealed_bid --buyer-timeout 20
+    python -m exec.main_auction_system --checkpoint-dir checkpoints/   # rerun to resume
+    python -m exec.main_auction_system --llm-deadline 20 --hedge
+    python -m exec.main_auction_system --events     # live bids as JSON lines
+    python -m exec.main_auction_system --auction-token-budget 20000 --tokens-per-minute 200000
+
+`--fake-latency` runs against the benchmark fake client instead of Gemini
+(no API key needed), which is handy for checking the concurrency setup.
 """
 
-from ./agents/auction_system/auction_system_def.py import AuctionDefinition
+import argparse
+import json
+import os
+import sys
+import threading
+from dataclasses import replace
+
+from dotenv import load_dotenv
+
+from agents.auction_system.agent_configs.conf_buy1 import BUYER1_CONFIG
+from agents.auction_system.agent_configs.conf_buy2 import BUYER2_CONFIG
+from agents.auction_system.agent_configs.conf_orch import ORCHESTRATOR_CONFIG
+from agents.auction_system.batch_runner import (
+    BatchAuctionRunner,
+    LotResult,
+    load_lots,
+    make_system_factory,
+)
+from agents.auction_system.buyer_agent import CONTEXT_MODES as BUYER_CONTEXT_MODES
+from agents.auction_system.events import EventBus
+from agents.auction_system.orchestrator_agent import ROUND_MODES
+from core.llm import accounting
+from core.llm.call_policy import CallPolicy, CallPolicyClient
+from core.llm.concurrency import ConcurrencyLimitedClient
+from core.telemetry import profiling
+from core.telemetry.tracing import trace_client, tracing_mode
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PROPERTIES_DIR = os.path.join(PROJECT_ROOT, "documents", "properties")
+
+
+def build_client(fake_latency=None):
+    if fake_latency is not None:
+        from core.testing.fakes import AuctionResponder, make_fake_client
+
+        return make_fake_client(generate_latency_s=fake_latency, responder=AuctionResponder())
+
+    from core.resources.registry import get_registry
+
+    load_dotenv()
+    client = get_registry().genai_client()
+    if tracing_mode() == "sampled":
+        client = trace_client(client)
+    return client
+
+
+# Results (from the runner's workers) and events (from the printer thread)
+# share stdout; each JSON line is written whole under this lock.
+_OUTPUT_LOCK = threading.Lock()
+
+
+def print_line(line: str) -> None:
+    with _OUTPUT_LOCK:
+        sys.stdout.write(line + "\n")
+        sys.stdout.flush()
 
 
-def main():
-    # Call the Auction agent system definition here
+def print_result(result: LotResult) -> None:
+    print_line(json.dumps(result.to_dict()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run auctions for property listings in parallel.")
+    parser.add_argument("lots", nargs="*", help="Listing file names (default: all in --dir).")
+    parser.add_argument("--dir", default=DEFAULT_PROPERTIES_DIR)
+    parser.add_argument("--workers", type=int, default=8, help="Auctions running concurrently.")
+    parser.add_argument("--max-in-flight", type=int, default=4, help="Global cap on concurrent LLM calls.")
+    parser.add_argument("--round-mode", choices=ROUND_MODES, default=ORCHESTRATOR_CONFIG.round_mode)
+    parser.add_argument("--buyer-timeout", type=float, default=ORCHESTRATOR_CONFIG.buyer_timeout_s, help="Sealed-bid only: seconds before a buyer counts as PASS.")
+    parser.add_argument("--checkpoint-dir", default=None, help="Checkpoint every round; existing checkpoints are resumed.")
+    parser.add_argument("--llm-deadline", type=float, default=None, help="Seconds per LLM call, retries included; a buyer that misses it PASSes (default: TELEHELPER_LLM_DEADLINE or 60).")
+    parser.add_argument("--hedge", action="store_true", help="Duplicate LLM calls that run past the observed p95.")
+    parser.add_argument("--context-mode", choices=BUYER_CONTEXT_MODES, default="digest", help="What buyers see of the listing: its digest or the full text.")
+    parser.add_argument("--fake-latency", type=float, default=None, help="Use the fake client with this latency (s).")
+    parser.add_argument("--events", action="store_true", help="Print auction events (starts, bids, rounds) as JSON lines as they happen.")
+    parser.add_argument("--auction-token-budget", type=int, default=None, help="Tokens per auction; buyers PASS once it is spent (default: TELEHELPER_BUDGET_AUCTION_TOKENS).")
+    parser.add_argument("--tokens-per-minute", type=int, default=None, help="Tokens per minute across all auctions (default: TELEHELPER_BUDGET_TPM).")
+    parser.add_argument("--sequential-baseline", action="store_true", help="Also run the lots sequentially and compare.")
+    profiling.add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+    profiling.configure_from_args(args)
+
+    budget = accounting.BudgetConfig.from_env()
+    if args.auction_token_budget is not None:
+        budget.auction_tokens = args.auction_token_budget if args.auction_token_budget > 0 else None
+    if args.tokens_per_minute is not None:
+        budget.tokens_per_minute = args.tokens_per_minute if args.tokens_per_minute > 0 else None
+    ledger = accounting.configure(budget)
+
+    lots = load_lots(args.dir)
+    if args.lots:
+        wanted = set(args.lots)
+        lots = [lot for lot in lots if lot.property_id in wanted]
+
+    limiter = ConcurrencyLimitedClient(build_client(args.fake_latency), args.max_in_flight)
+    # Outside the limiter, so time queued for a slot counts towards the
+    # deadline and hedged duplicates also respect --max-in-flight.
+    policy = CallPolicy.from_env()
+    if args.llm_deadline is not None:
+        policy.deadline_s = args.llm_deadline if args.llm_deadline > 0 else None
+    policy.hedge = policy.hedge or args.hedge
+    client = CallPolicyClient(limiter, policy)
+    orchestrator_config = replace(
+        ORCHESTRATOR_CONFIG, round_mode=args.round_mode, buyer_timeout_s=args.buyer_timeout
+    )
+    buyer_configs = [
+        replace(config, context_mode=args.context_mode) for config in (BUYER1_CONFIG, BUYER2_CONFIG)
+    ]
+    events = EventBus() if args.events else None
+    printer = None
+    if events is not None:
+        subscription = events.subscribe(maxsize=1024)
+
+        def print_events() -> None:
+            for event in subscription:
+                print_line(json.dumps({"event": event.to_dict()}, ensure_ascii=False))
+
+        printer = threading.Thread(target=print_events, name="auction-events", daemon=True)
+        printer.start()
+    factory = make_system_factory(client, buyer_configs, orchestrator_config, events=events)
+
+    runner = BatchAuctionRunner(
+        factory, max_workers=args.workers, limiter=limiter, checkpoint_dir=args.checkpoint_dir
+    )
+    report = runner.run(lots, on_result=print_result)
+
+    if args.sequential_baseline:
+        sequential = BatchAuctionRunner(factory, max_workers=1, limiter=limiter).run(lots)
+        report.measured_sequential_s = sequential.wall_clock_s
+
+    if events is not None:
+        events.close()
+        printer.join()
+        if subscription.dropped:
+            print(f"[Auction] {subscription.dropped} event(s) dropped by the event printer.")
+
+    print(json.dumps(report.summary(), indent=2))
+    print(json.dumps({"llm_calls": client.stats()}))
+    print(json.dumps({"tokens": ledger.report()}))
+    client.close()
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
+
+# TO RUN:
+# python -m exec.main_auction_system
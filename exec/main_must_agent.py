@@ -1,65 +1,276 @@
+import argparse
+import json
 import os, sys
+from concurrent.futures import Future, ThreadPoolExecutor
 from dotenv import load_dotenv
-from google import genai
-from langsmith import wrappers
 
 from agents.must.must_agent import MustAgent, MustAgentConfig
-from core.database.vectorstore.prop_vectorization import (
+from core.database.vectorstore.chroma_config import (
     CHROMA_LOCATION,
     CHROMA_COLLECTION_NAME,
+    LAZY_TEXT,
+    SHARD_BY_REGION,
+    SIDECAR_DTYPE,
 )
-from core.database.vectorstore.prop_retriever import PropertyRetriever
+from core.llm import accounting
+from core.resources.registry import close_registry, get_registry
+from core.telemetry import metrics, profiling
 
 PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))
+DEFAULT_PROPERTIES_DIR = os.path.join(PROJECT_ROOT, "documents", "properties")
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
-def main():
-    load_dotenv()
-    gemini_key = os.getenv("GOOGLE_API_KEY")
-
-    # genai.Client() reads GOOGLE_API_KEY / GEMINI_API_KEY from the environment
-    gemini_client = genai.Client(api_key=gemini_key)
-
-    # Wrap the Gemini client to enable LangSmith tracing
-    client = wrappers.wrap_gemini(
-        gemini_client,
-        tracing_extra={
-            "tags": ["gemini", "python"],
-            "metadata": {
-                "integration": "google-genai",
+
+def build_client():
+    """
+    Create the Gemini client, traced according to `TELEHELPER_TRACING`:
+
+    - "langsmith" (default): wrapped with `langsmith.wrappers.wrap_gemini`,
+      which traces every call on the calling thread
+    - "sampled": wrapped with `core.telemetry.tracing.TracingClient`
+      (sampled calls, ring buffer, background export)
+    - "off": the plain client
+
+    `google.genai` and `langsmith` are imported here (and in the registry)
+    rather than at module load, so the prompt can appear before these heavy
+    modules are ready.
+    """
+    from core.telemetry.tracing import trace_client, tracing_mode
+
+    registry = get_registry()
+    mode = tracing_mode()
+
+    if mode == "sampled":
+        return trace_client(registry.genai_client())
+    if mode == "off":
+        return registry.genai_client()
+
+    from langsmith import wrappers
+
+    # Wrap the Gemini client to enable LangSmith tracing. wrap_gemini patches
+    # the client in place, so it gets a dedicated (non-pooled) client, built
+    # once per process.
+    return registry.shared(
+        "gemini-langsmith",
+        lambda: wrappers.wrap_gemini(
+            registry.genai_client(pooled=False),
+            tracing_extra={
+                "tags": ["gemini", "python"],
+                "metadata": {
+                    "integration": "google-genai",
+                },
             },
-        },
+        ),
     )
 
+
+def build_agent() -> MustAgent:
+    """
+    Build the client, retriever and agent, and open the Chroma collection so
+    the first question doesn't pay for it.
+    """
+    from agents.must.answer_cache import AnswerCacheConfig, SemanticAnswerCache, answer_cache_enabled
+    from core.database.vectorstore.prop_retriever import PropertyRetriever
+    from core.database.vectorstore.watcher import read_live_collection
+    from core.llm.call_policy import with_call_policy
+
+    # Deadline / retries / hedging from TELEHELPER_LLM_* (see call_policy.py).
+    client = with_call_policy(build_client())
+
+    # After a live re-index (`--watch`) the newest generation is live.
     retriever = PropertyRetriever(
         location=CHROMA_LOCATION,
-        collection_name=CHROMA_COLLECTION_NAME,
+        collection_name=read_live_collection(CHROMA_LOCATION, CHROMA_COLLECTION_NAME),
+        lazy_text=LAZY_TEXT,
     )
+    retriever.chroma.collection  # opens the PersistentClient + collection
+
+    if SHARD_BY_REGION:
+        retriever.shards = retriever.chroma.shards()
+        print(f"[MustAgent] Region shards: {', '.join(retriever.shards) or 'none'}")
+        if len(retriever.shards) == 1:
+            print("[MustAgent] Only one region: sharding does not narrow any query.")
+    elif SIDECAR_DTYPE:
+        from core.database.vectorstore.quantized_index import QuantizedIndex
+
+        retriever.sidecar = QuantizedIndex.from_chroma(retriever.chroma, SIDECAR_DTYPE)
 
-    agent = MustAgent(
+    # Opt-in (TELEHELPER_ANSWER_CACHE=1): see answer_cache.py on the threshold.
+    answer_cache = None
+    if answer_cache_enabled():
+        answer_cache = SemanticAnswerCache(AnswerCacheConfig.from_env())
+
+    return MustAgent(
         client,
         retriever=retriever,
+        answer_cache=answer_cache,
         config=MustAgentConfig(
             model="gemini-2.5-flash",
             max_state_messages=6,
             use_rag=True,
             rag_top_k=3,
+            # "full" sends whole listings instead of ingest-time digests.
+            context_mode=os.getenv("TELEHELPER_CONTEXT_MODE", "digest"),
         ),
     )
 
+
+def start_watcher(agent: MustAgent, directory: str):
+    """
+    Re-index `directory` in the background whenever it changes and swap the
+    agent's retriever to the new collection. Cached answers are dropped on
+    each swap.
+    """
+    from core.database.vectorstore.watcher import PropertyWatcher
+
+    if agent.retriever.shards:
+        print("[Watcher] Not available with region shards; restart to pick up changes.")
+        return None
+
+    def on_swap(name: str, embedded: int) -> None:
+        if agent.answer_cache is not None:
+            agent.answer_cache.invalidate()
+
+    return PropertyWatcher(directory, agent.retriever, on_swap=on_swap).start()
+
+
+def run_batch_mode(args) -> int:
+    """
+    `--batch`: answer a JSONL file of questions (see `exec.batch_must_agent`).
+    """
+    from exec.batch_must_agent import run_batch
+
+    template = build_agent()
+
+    def agent_factory() -> MustAgent:
+        return MustAgent(
+            template.client,
+            retriever=template.retriever,
+            config=template.config,
+            answer_cache=template.answer_cache,
+        )
+
+    output = args.output or os.path.splitext(args.batch)[0] + ".answers.jsonl"
+    try:
+        report = run_batch(
+            agent_factory,
+            args.batch,
+            output,
+            workers=args.workers,
+            embed_batch=args.embed_batch,
+        )
+    finally:
+        template.retriever.close()
+        close_registry()
+    print(f"[Batch] Tokens: {json.dumps(accounting.get_ledger().report())}")
+    return 1 if report.errors or report.interrupted else 0
+
+
+def start_warmup() -> "Future[MustAgent]":
+    """
+    Build the agent on a background thread while the user types.
+    """
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="warmup")
+    future = executor.submit(build_agent)
+    executor.shutdown(wait=False)
+    return future
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TeleHelper Must agent CLI.")
+    parser.add_argument(
+        "--no-warmup",
+        action="store_true",
+        help="Build the agent before showing the prompt instead of in the background.",
+    )
+    parser.add_argument(
+        "--watch",
+        nargs="?",
+        const=DEFAULT_PROPERTIES_DIR,
+        default=None,
+        metavar="DIR",
+        help="Re-index DIR (default: documents/properties) in the background when files change.",
+    )
+    batch = parser.add_argument_group("batch mode")
+    batch.add_argument("--batch", metavar="IN", default=None, help="Answer the questions in IN (JSONL) instead of the REPL.")
+    batch.add_argument("--output", metavar="OUT", default=None, help="Answers JSONL (default: IN with .answers.jsonl); resumed if it exists.")
+    batch.add_argument("--workers", type=int, default=8, help="Conversations answered concurrently.")
+    batch.add_argument("--embed-batch", type=int, default=100, help="Questions embedded per call.")
+    profiling.add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    profiling.configure_from_args(args)
+
+    if args.batch:
+        return run_batch_mode(args)
+
+    if args.no_warmup:
+        warmup: "Future[MustAgent]" = Future()
+        warmup.set_result(build_agent())
+    else:
+        warmup = start_warmup()
+
+    watchers = []
+    if args.watch:
+
+        def watch_when_ready(done: "Future[MustAgent]") -> None:
+            if done.exception() is None:
+                watchers.append(start_watcher(done.result(), args.watch))
+
+        warmup.add_done_callback(watch_when_ready)
+
     print("Agent ready. Enter a question (empty to exit).")
     while True:
         question = input("User > ").strip()
         if not question:
             break
+        # Blocks only if the user was faster than the warm-up; re-raises
+        # any error (missing key, bad Chroma path) from the warm-up thread.
+        agent = warmup.result()
         answer = agent.ask(question)
         print("Agent > " + answer)
         print()
 
+    if warmup.done() and not warmup.exception():
+        agent = warmup.result()
+        if agent.reuse_rate is not None:
+            print(
+                f"Context reuse: {agent.reuses}/{agent.reuses + agent.retrievals} "
+                f"turns ({agent.reuse_rate:.0%}) answered without a new retrieval."
+            )
+        cache = agent.answer_cache
+        if cache is not None and cache.hit_rate is not None:
+            print(
+                f"Answer cache: {cache.hits}/{cache.hits + cache.misses} "
+                f"questions ({cache.hit_rate:.0%}) answered from the cache."
+            )
+        usage = agent.end_session()
+        if usage.calls:
+            print(
+                f"Tokens: {usage.total_tokens:,} in {usage.calls} model call(s) "
+                f"({usage.prompt_tokens:,} prompt, {usage.output_tokens:,} output)."
+            )
+
+    # TELEHELPER_METRICS=1 enables spans; TELEHELPER_METRICS_FILE=metrics.json
+    # (or .prom for Prometheus text) keeps the per-stage timings and tokens.
+    metrics_file = os.getenv("TELEHELPER_METRICS_FILE")
+    if metrics.is_enabled() and metrics_file:
+        metrics.dump(metrics_file)
+        print(f"Metrics written to {metrics_file}")
+
+    for watcher in watchers:
+        if watcher is not None:
+            watcher.stop(timeout=30)
+    if warmup.done() and not warmup.exception():
+        warmup.result().retriever.close()
+    close_registry()
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
 
-# TO RUN: 
-# python -m exec.main_must_agent
\ No newline at end of file
+# TO RUN:
+# python -m exec.main_must_agent
+# python -m exec.main_must_agent --batch questions.jsonl --output answers.jsonl
@@ -0,0 +1,89 @@
+"""
+Shared fixtures: fake Gemini clients (`core.testing.fakes`), auction systems
+built on them, and a temporary Chroma store with the sample listings.
+
+Run from the project root:
+
+    python -m pytest -q exec/tests
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, Optional
+
+import pytest
+
+from agents.auction_system.agent_configs.conf_buy1 import BUYER1_CONFIG
+from agents.auction_system.agent_configs.conf_buy2 import BUYER2_CONFIG
+from agents.auction_system.auction_system_def import AuctionSystem
+from agents.auction_system.buyer_agent import BuyerAgent
+from agents.auction_system.events import EventBus
+from agents.auction_system.orchestrator_agent import OrchestratorAgent, OrchestratorConfig
+from core.llm import accounting
+from core.testing.fakes import AuctionResponder, make_fake_client
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+PROPERTIES_DIR = os.path.join(PROJECT_ROOT, "documents", "properties")
+
+
+@pytest.fixture(autouse=True)
+def ledger() -> accounting.TokenLedger:
+    """
+    A fresh shared token ledger without budgets for every test.
+    """
+    return accounting.configure(accounting.BudgetConfig())
+
+
+@pytest.fixture
+def listing_text() -> str:
+    with open(os.path.join(PROPERTIES_DIR, "p1.txt"), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def make_auction_system(
+    client: Any,
+    *,
+    checkpoint_path: Optional[str] = None,
+    events: Optional[EventBus] = None,
+    **orchestrator: Any,
+) -> AuctionSystem:
+    """
+    Orchestrator plus the two configured buyers, all on `client`.
+    """
+    return AuctionSystem(
+        orchestrator=OrchestratorAgent(client, config=OrchestratorConfig(**orchestrator)),
+        buyers={cfg.name: BuyerAgent(client, cfg) for cfg in (BUYER1_CONFIG, BUYER2_CONFIG)},
+        checkpoint_path=checkpoint_path,
+        events=events,
+    )
+
+
+@pytest.fixture
+def auction_client():
+    return make_fake_client(responder=AuctionResponder())
+
+
+@pytest.fixture
+def property_store(tmp_path) -> Dict[str, Any]:
+    """
+    The sample listings vectorized with the fake embedder into a temporary
+    Chroma store: `{"retriever", "client", "location"}`.
+    """
+    from core.database.embedder import Embedder
+    from core.database.vectorstore.prop_chroma import ChromaOperator
+    from core.database.vectorstore.prop_retriever import PropertyRetriever
+    from core.database.vectorstore.prop_vectorization import vectorize_directory
+
+    location = str(tmp_path / "chroma")
+    client = make_fake_client()
+    embedder = Embedder("gemini-embedding-001", client=client)
+    chroma = ChromaOperator(location=location, collection_name="properties")
+    vectorize_directory(PROPERTIES_DIR, embedder=embedder, chroma=chroma, shard_by_region=False)
+    retriever = PropertyRetriever(
+        location=location,
+        collection_name="properties",
+        embedder=embedder,
+        chroma=chroma,
+    )
+    return {"retriever": retriever, "client": client, "location": location}
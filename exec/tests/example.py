@@ -1,5 +0,0 @@
-"""
-This folder will contain all the tests for the agents.
-There can be CI/CD and so on. 
-(FUTURE DEVELOPMENT FOUNDATION) 
-"""
\ No newline at end of file
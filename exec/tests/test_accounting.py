@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from agents.must.must_agent import MustAgent, MustAgentConfig
+from core.llm import accounting
+from core.llm.accounting import BudgetConfig, BudgetExceeded, TokenLedger
+from core.llm.call_policy import CallPolicy, CallPolicyClient
+from core.testing.fakes import FakeGenerateResponse, FakeUsageMetadata, make_fake_client
+
+
+def response(prompt: int, output: int) -> FakeGenerateResponse:
+    return FakeGenerateResponse(
+        text="ok",
+        usage_metadata=FakeUsageMetadata(
+            prompt_token_count=prompt,
+            candidates_token_count=output,
+            total_token_count=prompt + output,
+        ),
+    )
+
+
+PROMPT = "x" * 1800  # about 450 tokens
+
+
+def test_calls_in_flight_reserve_their_estimate():
+    ledger = TokenLedger(BudgetConfig(auction_tokens=1000, output_allowance=200))
+
+    first = ledger.admit(PROMPT, agent="buyer:a", model="m", auction="a1")
+    with first:
+        with pytest.raises(BudgetExceeded) as raised:
+            ledger.admit(PROMPT, agent="buyer:b", model="m", auction="a1")
+        assert raised.value.scope == "auction"
+        first.settle(response(450, 50))
+
+    # The reservation is released and only the real usage stays charged.
+    with ledger.admit(PROMPT, agent="buyer:b", model="m", auction="a1") as second:
+        second.settle(response(450, 50))
+    assert ledger.usage(auction="a1").total_tokens == 1000
+    assert ledger.rejected == 1
+
+
+def test_calls_near_the_limit_are_degraded():
+    ledger = TokenLedger(
+        BudgetConfig(session_tokens=1000, degrade_at=0.5, degraded_model="small")
+    )
+
+    with ledger.admit(PROMPT, agent="must", model="big", session="s") as admission:
+        assert admission.degraded and admission.model == "small"
+        assert admission.kwargs["config"]["max_output_tokens"] == 256
+
+
+def test_release_returns_and_forgets_the_totals():
+    ledger = TokenLedger()
+    with ledger.admit("hi", agent="must", model="m", session="s") as admission:
+        admission.settle(response(10, 5))
+
+    assert ledger.release(session="s").total_tokens == 15
+    assert ledger.report()["open_sessions"] == 0
+    assert ledger.usage(agent="must").total_tokens == 15
+
+
+def test_every_attempt_is_charged_to_the_admission(ledger):
+    client = CallPolicyClient(
+        make_fake_client(generate_latency_s=0.05),
+        CallPolicy(hedge=True, hedge_after_s=0.01, max_hedges=1),
+    )
+    with ledger.admit("question", agent="must", model="m", session="s") as admission:
+        response = client.generate_content(model=admission.model, contents="question")
+        admission.settle(response)
+    time.sleep(0.1)  # let the abandoned hedge finish and charge
+
+    assert ledger.usage(session="s").calls == client.wrapped.generate_calls == 2
+
+
+def test_rejected_call_is_not_sent():
+    accounting.configure(accounting.BudgetConfig(session_tokens=10))
+    client = make_fake_client(responder=lambda prompt: "never")
+    agent = MustAgent(client, config=MustAgentConfig(use_rag=False))
+
+    assert agent.ask("Which is cheapest?") == agent.config.budget_reply
+    assert client.generate_calls == 0 and agent.rejections == 1
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import numpy as np
+
+from agents.must.answer_cache import (
+    AnswerCacheConfig,
+    SemanticAnswerCache,
+    answer_cache_enabled,
+    document_signature,
+)
+from core.database.vectorstore.prop_retriever import RetrievedProperty
+
+
+def hit(name: str, content_hash: str = "h") -> RetrievedProperty:
+    return RetrievedProperty(
+        text=name, metadata={"filename": name, "content_hash": content_hash}, score=0.1
+    )
+
+
+def unit(*values: float) -> np.ndarray:
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_similar_question_over_the_same_documents_hits():
+    cache = SemanticAnswerCache(AnswerCacheConfig(similarity_threshold=0.9))
+    retrieved = [hit("p1.txt"), hit("p2.txt")]
+    signature = document_signature(retrieved)
+    cache.store("cheapest flat?", unit(1, 0, 0), retrieved, "p2", signature)
+
+    found = cache.lookup(unit(1, 0.1, 0), signature)
+
+    assert found is not None and found.answer == "p2"
+    assert cache.lookup(unit(0, 1, 0), signature) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_changed_listing_no_longer_matches():
+    cache = SemanticAnswerCache()
+    cache.store("q", unit(1, 0), [hit("p1.txt", "old")], "answer")
+
+    assert cache.lookup(unit(1, 0), document_signature([hit("p1.txt", "new")])) is None
+    assert cache.lookup(unit(1, 0), document_signature([hit("p1.txt", "old")])) is not None
+
+
+def test_entries_expire_and_are_invalidated():
+    clock = Clock()
+    cache = SemanticAnswerCache(AnswerCacheConfig(ttl_s=10), clock=clock)
+    signature = document_signature([hit("p1.txt")])
+    cache.store("a", unit(1, 0), [hit("p1.txt")], "answer", signature)
+    cache.store("b", unit(0, 1), [hit("p2.txt")], "other")
+
+    assert cache.invalidate(["p2.txt"]) == 1
+    clock.now = 11
+    assert cache.lookup(unit(1, 0), signature) is None
+    assert cache.expirations == 1 and len(cache) == 0
+
+
+def test_cache_is_opt_in(monkeypatch):
+    monkeypatch.delenv("TELEHELPER_ANSWER_CACHE", raising=False)
+    assert not answer_cache_enabled()
+    monkeypatch.setenv("TELEHELPER_ANSWER_CACHE", "1")
+    assert answer_cache_enabled()
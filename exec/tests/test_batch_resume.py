@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import json
+
+from agents.must.must_agent import MustAgent, MustAgentConfig
+from core.testing.fakes import make_fake_client
+from exec.batch_must_agent import run_batch
+
+QUESTIONS = [
+    "Two-bedroom apartment in Lozenets with parking",
+    "Does it have a balcony?",
+    "What floor is it on?",
+]
+
+
+def write_questions(path) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for i, question in enumerate(QUESTIONS):
+            f.write(json.dumps({"id": f"q{i}", "question": question, "conversation_id": "c"}) + "\n")
+
+
+def read_answers(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_resumed_conversation_reuses_the_same_context(tmp_path, property_store):
+    retriever = property_store["retriever"]
+
+    def agent_factory() -> MustAgent:
+        return MustAgent(property_store["client"], retriever=retriever, config=MustAgentConfig())
+
+    questions = tmp_path / "questions.jsonl"
+    write_questions(questions)
+    full = tmp_path / "full.jsonl"
+    run_batch(agent_factory, str(questions), str(full), workers=1)
+    expected = [record["context"] for record in read_answers(full)]
+    assert expected == ["retrieved", "reused", "reused"]
+
+    # Interrupted after the first turn, then run again.
+    partial = tmp_path / "partial.jsonl"
+    with open(partial, "w", encoding="utf-8") as f:
+        f.write(json.dumps(read_answers(full)[0]) + "\n")
+    report = run_batch(agent_factory, str(questions), str(partial), workers=1)
+
+    assert (report.skipped, report.answered, report.errors) == (1, 2, 0)
+    assert [record["context"] for record in read_answers(partial)] == expected
+
+
+def test_details_reply_is_an_error_and_asked_again(tmp_path, property_store):
+    retriever = property_store["retriever"]
+    client = make_fake_client(responder=lambda prompt: "NEED_DETAILS 1")
+
+    def agent_factory() -> MustAgent:
+        return MustAgent(client, retriever=retriever, config=MustAgentConfig())
+
+    questions = tmp_path / "questions.jsonl"
+    write_questions(questions)
+    answers = tmp_path / "answers.jsonl"
+    report = run_batch(agent_factory, str(questions), str(answers), workers=1)
+
+    assert report.errors == len(QUESTIONS)
+    assert all(record["error"].startswith("NeedDetails") for record in read_answers(answers))
+    assert run_batch(agent_factory, str(questions), str(answers), workers=1).skipped == 0
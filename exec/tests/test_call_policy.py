@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from core.llm.call_policy import CallPolicy, CallPolicyClient, CallTimeout
+from core.llm.concurrency import ConcurrencyLimitedClient
+from core.testing.fakes import FakeAPIError, make_fake_client
+
+
+class Flaky:
+    """
+    Fails the first `failures` calls with `error`, then answers "ok".
+    """
+
+    def __init__(self, failures: int, error: Exception) -> None:
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    def __call__(self) -> str:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+        return "ok"
+
+
+def policy_client(**policy) -> CallPolicyClient:
+    return CallPolicyClient(make_fake_client(), CallPolicy(**policy))
+
+
+def test_retryable_errors_are_retried():
+    client = policy_client(max_retries=2, backoff_s=0.001)
+    fn = Flaky(2, FakeAPIError("503 UNAVAILABLE"))
+
+    assert client.run(fn) == "ok"
+    assert fn.calls == 3 and client.retries == 2
+
+
+def test_other_errors_are_not_retried():
+    client = policy_client(max_retries=2, backoff_s=0.001)
+    fn = Flaky(1, ValueError("bad request"))
+
+    with pytest.raises(ValueError):
+        client.run(fn)
+    assert fn.calls == 1 and client.retries == 0
+
+
+def test_no_retry_is_sent_after_the_deadline():
+    client = policy_client(deadline_s=0.2, max_retries=3, backoff_s=1.0)
+    fn = Flaky(10, ConnectionError("reset"))
+
+    started = time.monotonic()
+    with pytest.raises(CallTimeout) as raised:
+        client.run(fn)
+
+    assert time.monotonic() - started < 0.2
+    assert fn.calls == 1 and raised.value.attempts == 1
+
+
+def test_slow_attempt_is_hedged_and_the_first_answer_wins():
+    client = policy_client(hedge=True, hedge_after_s=0.02, max_retries=0)
+    release = threading.Event()
+    calls = []
+
+    def fn() -> str:
+        calls.append(1)
+        if len(calls) == 1:
+            release.wait(2)
+            return "slow"
+        return "fast"
+
+    try:
+        assert client.run(fn) == "fast"
+    finally:
+        release.set()
+    assert (client.hedges, client.hedge_wins) == (1, 1)
+
+
+def test_slot_wait_is_charged_to_the_caller_across_the_policy_pool():
+    limiter = ConcurrencyLimitedClient(make_fake_client(generate_latency_s=0.1), max_in_flight=1)
+    client = CallPolicyClient(limiter, CallPolicy())
+    holding = threading.Thread(
+        target=limiter.generate_content, kwargs={"model": "m", "contents": "first"}
+    )
+    holding.start()
+    while not limiter.wrapped.in_flight.get("generate"):
+        time.sleep(0.001)
+
+    # The attempt runs on a policy thread, but queues for the caller.
+    limiter.reset_wait()
+    client.generate_content(model="m", contents="second")
+    holding.join()
+
+    assert limiter.wait_s > 0.05
+    assert limiter.reset_wait() > 0.05
+    assert limiter.wait_s == 0.0
+    client.close()
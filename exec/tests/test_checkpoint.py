@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import pytest
+
+from core.testing.fakes import AuctionResponder, make_fake_client
+
+from conftest import make_auction_system
+
+
+class Crash(Exception):
+    pass
+
+
+def crash_in_round(system, crash_round: int) -> None:
+    run_round = system._run_round
+
+    def flaky() -> None:
+        if system.state.round == crash_round:
+            raise Crash()
+        run_round()
+
+    system._run_round = flaky
+
+
+def test_resume_continues_like_an_uninterrupted_run(tmp_path, listing_text):
+    expected = make_auction_system(make_fake_client(responder=AuctionResponder()))
+    expected.run_single_auction("p1.txt", listing_text)
+    assert expected.state.round > 3
+
+    path = str(tmp_path / "p1.jsonl")
+    client = make_fake_client(responder=AuctionResponder())
+    crashed = make_auction_system(client, checkpoint_path=path)
+    crash_in_round(crashed, 3)
+    with pytest.raises(Crash):
+        crashed.run_single_auction("p1.txt", listing_text)
+
+    resumed = make_auction_system(client)
+    state = resumed.resume(path)
+
+    assert state.status == "closed"
+    assert state.round == expected.state.round
+    assert state.current_highest_bid == expected.state.current_highest_bid
+    assert state.current_highest_bidder == expected.state.current_highest_bidder
+    assert state.history == expected.state.history
+    for name, buyer_state in state.buyer_states.items():
+        assert buyer_state.get_state()["messages"] == (
+            expected.state.buyer_states[name].get_state()["messages"]
+        )
+
+
+def test_resuming_a_closed_auction_returns_it(tmp_path, auction_client, listing_text):
+    path = str(tmp_path / "p1.jsonl")
+    finished = make_auction_system(auction_client, checkpoint_path=path)
+    finished.run_single_auction("p1.txt", listing_text)
+    calls = auction_client.generate_calls
+
+    state = make_auction_system(auction_client).resume(path)
+
+    assert auction_client.generate_calls == calls
+    assert state.history == finished.state.history
+    assert state.current_highest_bidder == finished.state.current_highest_bidder
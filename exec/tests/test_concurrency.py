@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+import threading
+
+from core.llm.concurrency import ConcurrencyLimitedClient
+from core.testing.fakes import make_fake_client
+
+
+def test_in_flight_calls_never_exceed_the_cap():
+    fake = make_fake_client(generate_latency_s=0.02)
+    limiter = ConcurrencyLimitedClient(fake, max_in_flight=2)
+    threads = [
+        threading.Thread(target=limiter.generate_content, kwargs={"model": "m", "contents": "q"})
+        for _ in range(6)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert fake.generate_calls == 6
+    assert fake.max_in_flight["generate"] == 2
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from core.database.dedup import find_near_duplicates
+
+from conftest import PROPERTIES_DIR
+
+
+def read(name: str) -> str:
+    with open(f"{PROPERTIES_DIR}/{name}", "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def test_near_duplicate_links_to_the_earlier_listing():
+    original = read("p1.txt")
+    relisted = original.replace("fourth floor", "fifth floor")
+    groups = find_near_duplicates([original, read("p2.txt"), relisted])
+
+    assert groups.canonical == [0, 1, 0]
+    assert groups.duplicate_count == 1
+    assert groups.similarity[2] >= 0.85
+
+
+def test_distinct_listings_stay_separate():
+    texts = [read(f"p{i}.txt") for i in range(1, 11)]
+    groups = find_near_duplicates(texts)
+
+    assert groups.canonical == list(range(10))
+    assert groups.similarity == {}
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from core.database.vectorstore.doc_store import open_document_store, write_document_store
+from core.database.vectorstore.prop_retriever import PropertyRetriever
+
+QUERY = "Two-bedroom apartment in Lozenets with parking"
+
+
+def test_lazy_hits_read_text_only_when_asked(property_store):
+    eager = property_store["retriever"]
+    lazy = PropertyRetriever(
+        location=eager.chroma.location,
+        collection_name=eager.chroma.collection_name,
+        embedder=eager.embedder,
+        chroma=eager.chroma,
+        lazy_text=True,
+    )
+    hit = lazy.retrieve(QUERY, n_results=1)[0]
+
+    repr(hit)
+    assert hit == lazy.retrieve(QUERY, n_results=1)[0]
+    assert not hit.loaded
+    assert hit.text == eager.retrieve(QUERY, n_results=1)[0].text
+    assert hit.loaded
+
+
+def test_ids_missing_from_the_store_are_read_from_chroma(property_store):
+    eager = property_store["retriever"]
+    chroma = eager.chroma
+    expected = eager.retrieve(QUERY, n_results=5)
+    kept = expected[0]
+    write_document_store(
+        chroma.location, chroma.collection_name, [kept.doc_id], [kept.text], replace=True
+    )
+    lazy = PropertyRetriever(
+        location=chroma.location,
+        collection_name=chroma.collection_name,
+        embedder=eager.embedder,
+        chroma=chroma,
+        lazy_text=True,
+    )
+
+    hits = lazy.retrieve(QUERY, n_results=5)
+
+    assert not hits[0].loaded
+    assert [h.text for h in hits] == [h.text for h in expected]
+    assert all(h.text for h in hits)
+
+
+def test_open_document_store_follows_a_rewrite(tmp_path):
+    location = str(tmp_path)
+    write_document_store(location, "docs", ["a", "b"], ["alpha", "beta"])
+    store = open_document_store(location, "docs")
+    assert store.get("a") == "alpha"
+
+    write_document_store(location, "docs", ["a", "c"], ["ALPHA", "gamma"], replace=True)
+
+    assert store.get("a") == "ALPHA"
+    assert store.get("b") is None
+    assert store.get("c") == "gamma"
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from agents.auction_system.events import (
+    AuctionClosed,
+    AuctionStarted,
+    BuyerAction,
+    EventBus,
+    RoundClosed,
+)
+
+from conftest import make_auction_system
+
+
+def started(property_id: str = "p1.txt") -> AuctionStarted:
+    return AuctionStarted(property_id=property_id, round=0, resumed=False)
+
+
+def test_every_subscriber_gets_every_event():
+    bus = EventBus()
+    first, second = bus.subscribe(), bus.subscribe()
+    bus.publish(started("a"))
+    bus.publish(started("b"))
+    bus.close()
+
+    assert [e.property_id for e in first] == ["a", "b"]
+    assert [e.property_id for e in second] == ["a", "b"]
+
+
+def test_slow_subscriber_drops_the_oldest_events():
+    bus = EventBus()
+    subscription = bus.subscribe(maxsize=2)
+    for name in "abc":
+        bus.publish(started(name))
+    bus.close()
+
+    assert [e.property_id for e in subscription] == ["b", "c"]
+    assert subscription.dropped == 1
+
+
+def test_late_subscriber_can_replay_history():
+    bus = EventBus(history=1)
+    bus.publish(started("a"))
+    bus.publish(started("b"))
+
+    subscription = bus.subscribe(replay=True)
+    assert subscription.get(timeout=0).property_id == "b"
+    subscription.close()
+    assert bus.subscribers == 0
+
+
+def test_stream_auction_yields_the_auction_in_order(auction_client, listing_text):
+    system = make_auction_system(auction_client)
+    events = list(system.stream_auction("p1.txt", listing_text))
+
+    assert isinstance(events[0], AuctionStarted)
+    assert isinstance(events[-1], AuctionClosed)
+    assert events[-1].winner == system.state.current_highest_bidder
+    rounds = [e for e in events if isinstance(e, RoundClosed)]
+    actions = [e for e in events if isinstance(e, BuyerAction)]
+    assert len(rounds) == system.state.round
+    assert len(actions) == len(system.state.history)
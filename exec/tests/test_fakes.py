@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import pytest
+
+from core.testing.fakes import FakeAPIError, make_fake_client
+
+
+def test_embeddings_are_deterministic_and_truncated():
+    client = make_fake_client()
+    first = client.models.embed_content(model="m", contents=["a", "b"])
+    again = client.models.embed_content(
+        model="m", contents="a", config={"output_dimensionality": 768}
+    )
+
+    assert len(first.embeddings[0].values) == 3072
+    assert again.embeddings[0].values == first.embeddings[0].values[:768]
+    assert first.embeddings[0].values != first.embeddings[1].values
+    assert (client.embed_calls, client.embedded_texts) == (2, 3)
+
+
+def test_generate_reports_usage():
+    client = make_fake_client(responder=lambda prompt: "ok")
+    response = client.models.generate_content(model="m", contents="x" * 400)
+
+    usage = response.usage_metadata
+    assert response.text == "ok"
+    assert usage.total_token_count == usage.prompt_token_count + usage.candidates_token_count
+    assert client.generate_calls == 1
+
+
+def test_error_rate_raises_api_errors():
+    client = make_fake_client(generate_error_rate=1.0, seed=1)
+
+    with pytest.raises(FakeAPIError):
+        client.models.generate_content(model="m", contents="q")
+    assert client.errors == {"generate": 1}
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from typing import Any, List, Optional
+
+from agents.must.must_agent import MustAgent, MustAgentConfig
+from core.database.vectorstore.prop_retriever import RetrievedProperty
+from core.testing.fakes import make_fake_client
+
+
+class FixedRetriever:
+    """
+    Three summarized listings, whatever the question.
+    """
+
+    def retrieve(self, query: str, n_results: int, query_vector: Optional[Any] = None):
+        return [
+            RetrievedProperty(
+                text=f"Full listing {i}",
+                metadata={"filename": f"p{i}.txt", "digest": f"Summary {i}"},
+                score=0.1 * i,
+            )
+            for i in range(1, 4)
+        ]
+
+    def embed_query(self, query: str) -> None:
+        return None
+
+
+class Scripted:
+    def __init__(self, *replies: str) -> None:
+        self.replies = list(replies)
+        self.prompts: List[str] = []
+
+    def __call__(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        return self.replies[min(len(self.prompts), len(self.replies)) - 1]
+
+
+def agent_for(responder, **config) -> MustAgent:
+    return MustAgent(
+        make_fake_client(responder=responder),
+        retriever=FixedRetriever(),
+        config=MustAgentConfig(**config),
+    )
+
+
+def test_requested_listings_are_sent_in_full():
+    script = Scripted("NEED_DETAILS 2", "It has a balcony.")
+    agent = agent_for(script)
+
+    assert agent.ask("Does the second one have a balcony?") == "It has a balcony."
+    assert "Full listing 2" in script.prompts[1]
+    assert "Full listing 1" not in script.prompts[1]
+    assert agent.expansions == 1
+
+
+def test_second_details_request_sends_every_listing():
+    script = Scripted("NEED_DETAILS 2", "NEED_DETAILS 1", "Answer.")
+    agent = agent_for(script)
+
+    assert agent.ask("Which is quietest?") == "Answer."
+    assert all(f"Full listing {i}" in script.prompts[2] for i in (1, 2, 3))
+
+
+def test_details_request_is_never_returned_or_recorded():
+    agent = agent_for(Scripted("NEED_DETAILS 1, 2, 3"))
+
+    assert agent.ask("Which is quietest?") == agent.config.details_reply
+    assert agent.state.get_state()["messages"] == []
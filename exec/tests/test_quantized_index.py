@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import pytest
+
+from core.database.vectorstore.chroma_config import IndexConfig
+from core.database.vectorstore.prop_retriever import PropertyRetriever
+from core.database.vectorstore.quantized_index import QuantizedIndex
+
+QUERY = "Two-bedroom apartment in Lozenets with parking"
+
+
+@pytest.mark.parametrize("space", ["cosine", "l2", "ip"])
+def test_sidecar_scores_match_the_collection(property_store, space):
+    source = property_store["retriever"]
+    found = source.chroma.collection.get(include=["embeddings", "metadatas"])
+    chroma = source.chroma.sibling(f"properties_{space}", index_config=IndexConfig(space=space))
+    chroma.upsert_vectors(
+        ids=found["ids"], embeddings=found["embeddings"], metadatas=found["metadatas"]
+    )
+    retriever = PropertyRetriever(
+        location=chroma.location,
+        collection_name=chroma.collection_name,
+        embedder=source.embedder,
+        chroma=chroma,
+    )
+    plain = retriever.retrieve(QUERY, n_results=5)
+
+    retriever.sidecar = QuantizedIndex.from_chroma(chroma, "int8")
+    rescored = retriever.retrieve(QUERY, n_results=5)
+
+    assert [h.metadata["filename"] for h in rescored] == [h.metadata["filename"] for h in plain]
+    assert [h.score for h in rescored] == pytest.approx([h.score for h in plain], abs=1e-4)
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import threading
+
+from core.testing.fakes import AuctionResponder, make_fake_client
+
+from conftest import make_auction_system
+
+
+class SlowBuyer:
+    """
+    `AuctionResponder`, except that `name` answers only once `release` is set.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.release = threading.Event()
+        self.responder = AuctionResponder()
+
+    def __call__(self, prompt: str) -> str:
+        if f"your name is {self.name}" in prompt:
+            self.release.wait(5)
+        return self.responder(prompt)
+
+
+def test_late_reply_never_reaches_the_buyer_memory(listing_text):
+    slow = SlowBuyer("Highie")
+    system = make_auction_system(
+        make_fake_client(responder=slow), round_mode="sealed_bid", buyer_timeout_s=0.05
+    )
+    try:
+        state = system.run_single_auction("p1.txt", listing_text)
+    finally:
+        slow.release.set()
+
+    highie = [h for h in state.history if h["buyer"] == "Highie"]
+    assert highie[0]["reason"] == "No decision within 0.05s."
+    assert all(h["action"] == "PASS" for h in highie)
+    assert "still pending" in highie[1]["reason"]
+    assert state.current_highest_bidder == "Lowie"
+
+    system._pending["Highie"].result(timeout=5)
+    assert state.buyer_states["Highie"].get_state()["messages"] == []
+    assert state.buyer_states["Lowie"].get_state()["messages"]
+
+
+def test_sealed_bid_round_resolves_like_sequential_bids(auction_client, listing_text):
+    state = make_auction_system(auction_client, round_mode="sealed_bid").run_single_auction(
+        "p1.txt", listing_text
+    )
+
+    assert state.status == "closed"
+    bids = [h for h in state.history if h["action"] == "BID"]
+    assert bids and state.current_highest_bid == max(h["amount"] for h in bids)
+    # The leader sits out the next round.
+    for previous, current in zip(range(1, state.round), range(2, state.round + 1)):
+        leader = max(
+            (h for h in state.history if h["round"] <= previous and h["action"] == "BID"),
+            key=lambda h: h["amount"],
+        )["buyer"]
+        sat_out = [h for h in state.history if h["round"] == current and h["buyer"] == leader]
+        assert sat_out[0]["reason"] == "Already the highest bidder."
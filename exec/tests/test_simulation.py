@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from agents.auction_system.simulation import AuctionSimulator
+from exec.main_auction_simulation import main
+
+from conftest import PROPERTIES_DIR
+
+
+@pytest.fixture(scope="module")
+def simulator() -> AuctionSimulator:
+    return AuctionSimulator.from_directory(PROPERTIES_DIR, max_rounds=10)
+
+
+def test_outcomes_follow_the_auction_rules(simulator):
+    result = simulator.run(200, seed=7)
+    sold = result.winner >= 0
+
+    assert result.n_auctions == 200 * len(simulator.listings)
+    assert np.all(result.rounds >= 1) and np.all(result.rounds <= 10)
+    assert np.all(np.isnan(result.price[~sold]))
+    budgets = np.array([b.config.budget for b in simulator.buyers])
+    assert np.all(result.price[sold] <= budgets[result.winner[sold]])
+
+
+def test_same_seed_same_result(simulator):
+    first, second = simulator.run(50, seed=3), simulator.run(50, seed=3)
+
+    assert np.array_equal(first.winner, second.winner)
+    assert np.array_equal(first.price, second.price, equal_nan=True)
+
+
+def test_zero_auctions_are_rejected(simulator):
+    with pytest.raises(ValueError):
+        simulator.run(0)
+    with pytest.raises(SystemExit):
+        main(["--n", "0"])
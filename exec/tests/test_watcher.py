@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import os
+import shutil
+
+from core.database.embedder import Embedder
+from core.database.vectorstore.chroma_config import IndexConfig
+from core.database.vectorstore.prop_chroma import ChromaOperator
+from core.database.vectorstore.prop_retriever import PropertyRetriever
+from core.database.vectorstore import prop_vectorization
+from core.database.vectorstore.prop_vectorization import vectorize_directory
+from core.database.vectorstore.watcher import (
+    PropertyWatcher,
+    read_live_collection,
+    write_live_collection,
+)
+from core.testing.fakes import make_fake_client
+
+from conftest import PROPERTIES_DIR
+
+
+def test_rebuild_swaps_to_a_new_generation_with_the_live_settings(tmp_path):
+    listings = tmp_path / "listings"
+    listings.mkdir()
+    for name in ("p1.txt", "p2.txt", "p3.txt"):
+        shutil.copy(os.path.join(PROPERTIES_DIR, name), listings / name)
+    location = str(tmp_path / "chroma")
+
+    client = make_fake_client()
+    embedder = Embedder("gemini-embedding-001", client=client)
+    live = ChromaOperator(
+        location=location, collection_name="props", index_config=IndexConfig(space="l2")
+    )
+    vectorize_directory(str(listings), embedder=embedder, chroma=live, shard_by_region=False)
+    retriever = PropertyRetriever(
+        location=location, collection_name="props", embedder=embedder, chroma=live
+    )
+    swaps = []
+    watcher = PropertyWatcher(
+        str(listings), retriever, on_swap=lambda name, embedded: swaps.append((name, embedded))
+    )
+
+    with open(listings / "p2.txt", "a", encoding="utf-8") as f:
+        f.write("\nPrice reduced.\n")
+    embedded_before = client.embedded_texts
+    name = watcher.rebuild()
+
+    assert name == "props-gen1"
+    assert swaps == [("props-gen1", 1)]
+    assert client.embedded_texts - embedded_before == 1
+    assert retriever.chroma.collection_name == "props-gen1"
+    assert retriever.chroma.index_settings()["space"] == "l2"
+    assert retriever.chroma.collection.count() == 3
+    assert read_live_collection(location, "props") == "props-gen1"
+    hits = retriever.retrieve("Price reduced", n_results=3)
+    assert {h.metadata["filename"] for h in hits} == {"p1.txt", "p2.txt", "p3.txt"}
+
+
+def test_commands_use_the_live_generation(tmp_path, monkeypatch):
+    location = str(tmp_path / "chroma")
+    monkeypatch.setattr(prop_vectorization, "CHROMA_LOCATION", location)
+    monkeypatch.setattr(prop_vectorization, "CHROMA_COLLECTION_NAME", "props")
+    assert prop_vectorization.live_chroma().collection_name == "props"
+
+    write_live_collection(location, "props-gen2")
+
+    assert prop_vectorization.live_chroma().collection_name == "props-gen2"